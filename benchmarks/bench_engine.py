@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Engine benchmark: per-rule loop vs shared-condition network.
+
+Scales the canonical rule pack to growing rule counts (clones keep the
+canonical conditions, so tests are shared across rules the way real packs
+share paths such as deletion_protection or lifecycle.prevent_destroy) and
+times each evaluator over the same synthetic resource inventory.
+
+Usage:
+    python benchmarks/bench_engine.py [--resources N] [--rules 25,100,400]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "sis-core" / "src"))
+
+# Keep benchmark runs out of the persistent selectivity statistics
+os.environ.setdefault("SIS_CACHE_DIR", "")
+
+from sis.engine import validate_resources, validate_resources_network  # noqa: E402
+
+KINDS = [
+    "aws_db_instance", "aws_rds_cluster", "aws_s3_bucket", "aws_iam_role",
+    "aws_iam_policy", "aws_route53_record", "aws_autoscaling_group",
+    "aws_kms_key", "google_service_account", "google_storage_bucket",
+    "google_compute_instance", "aws_instance",
+]
+
+VALUES = {
+    "deletion_protection": [True, False, "true", None],
+    "lifecycle": [{"prevent_destroy": True}, {"prevent_destroy": False}, None],
+    "account_id": ["svc@proj.iam.gserviceaccount.com", "svc-account", None],
+    "ttl": ["0", "300", "3600", "100000000"],
+    "min_size": [0, 1, 3, "var.min"],
+    "policy": ['{"Effect": "Allow", "Action": "*"}', '{"Effect": "Deny"}', None],
+    "rotation_period": ["0s", "7776000s", None],
+    "versioning": [{"enabled": True}, {"enabled": False}, None],
+    "routing_mode": ["GLOBAL", "REGIONAL", None],
+    "assume_role_policy": ["{}", None],
+    "managed_policy_arns": [["arn:aws:iam::aws:policy/ReadOnlyAccess"], None],
+}
+
+
+def load_canonical_rules():
+    with open(ROOT / "rules" / "canonical" / "rules.json") as f:
+        return json.load(f)
+
+
+def scale_rules(base_rules, count, rng):
+    """Clone rules up to `count`, retargeting clones at random kinds."""
+    rules = []
+    for i in range(count):
+        rule = copy.deepcopy(base_rules[i % len(base_rules)])
+        if i >= len(base_rules):
+            rule["rule_id"] = "%s-X%d" % (rule["rule_id"], i)
+            if rule["applies_to"].get("resource_kinds") != ["*"]:
+                rule["applies_to"]["resource_kinds"] = rng.sample(KINDS, 2)
+        rules.append(rule)
+    return rules
+
+
+def make_resources(count, rng):
+    resources = []
+    for i in range(count):
+        attributes = {}
+        for key, choices in VALUES.items():
+            value = rng.choice(choices)
+            if value is not None:
+                attributes[key] = value
+        resources.append({
+            "kind": rng.choice(KINDS),
+            "name": "r%d" % i,
+            "attributes": attributes,
+            "line": i + 1,
+        })
+    return resources
+
+
+def best_of(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SIS engine benchmark")
+    parser.add_argument("--resources", type=int, default=20000)
+    parser.add_argument("--rules", default="25,100,200,400")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    base_rules = load_canonical_rules()
+    resources = make_resources(args.resources, rng)
+
+    print("SIS engine benchmark: %d resources" % len(resources))
+    print("%8s %12s %12s %9s %11s" % ("rules", "loop (s)", "network (s)", "speedup", "violations"))
+    for count in [int(c) for c in args.rules.split(",")]:
+        rules = scale_rules(base_rules, count, rng)
+        # Warm up compilation so only evaluation is timed
+        validate_resources(resources[:1], rules)
+        validate_resources_network(resources[:1], rules, "terraform")
+
+        loop_time, expected = best_of(lambda: validate_resources(resources, rules, "terraform"), args.repeat)
+        network_time, actual = best_of(lambda: validate_resources_network(resources, rules, "terraform"), args.repeat)
+        if actual != expected:
+            print("❌ network evaluator disagrees with validate_resources at %d rules" % count)
+            return 1
+        print("%8d %12.3f %12.3f %8.2fx %11d" % (
+            count, loop_time, network_time, loop_time / network_time, len(expected)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
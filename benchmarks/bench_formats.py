@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Parser throughput across formats: Terraform HCL, Terraform JSON syntax
+(.tf.json), ARM templates and docker-compose files.
+
+Generates an equivalent corpus in each format (the same storage accounts,
+SQL servers with nested databases and firewall rules, and containers) and
+reports MB/s and resources/s for parse_terraform_simple,
+sis.parsers.terraform_json.parse_terraform_json, sis.parsers.arm.parse_arm
+and sis.parsers.docker_compose.parse_docker_compose, each also restricted
+to a projection that keeps one kind and two attributes.
+
+Usage:
+    python benchmarks/bench_formats.py [--resources 1000,10000] [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "sis-core" / "src"))
+
+# Keep benchmark runs out of the persistent caches
+os.environ.setdefault("SIS_CACHE_DIR", "")
+
+from sis.parsers.arm import parse_arm  # noqa: E402
+from sis.parsers.docker_compose import parse_docker_compose  # noqa: E402
+from sis.parsers.terraform_json import parse_terraform_json  # noqa: E402
+from sis.parsers.terraform_simple import parse_terraform_simple  # noqa: E402
+from sis.parsers.yaml_loader import LIBYAML_AVAILABLE  # noqa: E402
+from sis.paths import Projection  # noqa: E402
+
+TERRAFORM = """resource "azurerm_storage_account" "store{i}" {{
+  name                     = "store{i}"
+  account_tier             = "Standard"
+  account_replication_type = "LRS"
+  allow_blob_public_access = {public}
+  tags = {{
+    env   = "prod"
+    owner = "team-{i}"
+  }}
+}}
+
+resource "azurerm_mssql_server" "sql{i}" {{
+  name                          = "sql{i}"
+  version                       = "12.0"
+  public_network_access_enabled = true
+}}
+
+resource "azurerm_mssql_database" "db{i}" {{
+  name      = "db{i}"
+  server_id = azurerm_mssql_server.sql{i}.id
+  sku_name  = "S0"
+}}
+
+"""
+
+COMPOSE_SERVICE = """  app{i}:
+    image: "registry.example.com/app:1.{i}"
+    privileged: {public}
+    ports: ["80{d}:8080"]
+    environment:
+      LOG_LEVEL: info
+      OWNER: team-{i}
+    volumes:
+      - data{i}:/var/lib/app
+    deploy:
+      resources:
+        limits: {{cpus: "0.5", memory: 256M}}
+"""
+
+
+def terraform_json(count):
+    resources = {"azurerm_storage_account": {}, "azurerm_mssql_server": {}, "azurerm_mssql_database": {}}
+    for i in range(count // 3):
+        resources["azurerm_storage_account"]["store%d" % i] = {
+            "name": "store%d" % i,
+            "account_tier": "Standard",
+            "account_replication_type": "LRS",
+            "allow_blob_public_access": i % 2 == 1,
+            "tags": {"env": "prod", "owner": "team-%d" % i},
+        }
+        resources["azurerm_mssql_server"]["sql%d" % i] = {
+            "name": "sql%d" % i, "version": "12.0", "public_network_access_enabled": True}
+        resources["azurerm_mssql_database"]["db%d" % i] = {
+            "name": "db%d" % i, "server_id": "${azurerm_mssql_server.sql%d.id}" % i, "sku_name": "S0"}
+    return json.dumps({"resource": resources}, indent=2)
+
+
+def arm_template(count):
+    resources = []
+    for i in range(count // 3):
+        resources.append({
+            "type": "Microsoft.Storage/storageAccounts",
+            "apiVersion": "2022-09-01",
+            "name": "store%d" % i,
+            "sku": {"name": "Standard_LRS"},
+            "properties": {"allowBlobPublicAccess": i % 2 == 0, "minimumTlsVersion": "TLS1_2"},
+            "tags": {"env": "prod", "owner": "team-%d" % i},
+        })
+        resources.append({
+            "type": "Microsoft.Sql/servers",
+            "apiVersion": "2021-11-01",
+            "name": "sql%d" % i,
+            "properties": {"version": "12.0", "publicNetworkAccess": "Enabled"},
+            "resources": [{"type": "databases", "apiVersion": "2021-11-01", "name": "db%d" % i,
+                           "sku": {"name": "S0"}, "dependsOn": ["sql%d" % i]}],
+        })
+    return json.dumps({"$schema": "deploymentTemplate.json#", "contentVersion": "1.0.0.0",
+                       "resources": resources}, indent=2)
+
+
+def compose_file(count):
+    services = "".join(COMPOSE_SERVICE.format(i=i, d=i % 10, public="true" if i % 2 else "false")
+                       for i in range(count))
+    volumes = "".join("  data%d: {}\n" % i for i in range(count))
+    return "services:\n" + services + "volumes:\n" + volumes
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SIS multi-format parser benchmark")
+    parser.add_argument("--resources", default="1000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    formats = [
+        ("terraform", lambda n: "".join(TERRAFORM.format(i=i, public="true" if i % 2 else "false")
+                                        for i in range(n // 3)),
+         parse_terraform_simple, Projection(frozenset({"azurerm_storage_account"}),
+                                            frozenset({"allow_blob_public_access", "account_tier"}))),
+        ("tf.json", terraform_json, parse_terraform_json,
+         Projection(frozenset({"azurerm_storage_account"}),
+                    frozenset({"allow_blob_public_access", "account_tier"}))),
+        ("arm", arm_template, parse_arm,
+         Projection(frozenset({"Microsoft.Storage/storageAccounts"}), frozenset({"properties", "sku"}))),
+        ("compose", lambda n: compose_file(n // 2), parse_docker_compose,
+         Projection(frozenset({"service"}), frozenset({"privileged", "volumes"}))),
+    ]
+
+    print("Multi-format parser benchmark (libyaml: %s)" % ("yes" if LIBYAML_AVAILABLE else "no"))
+    print("%10s %10s %8s %10s %12s %15s %17s" % (
+        "format", "resources", "MB", "MB/s", "resources/s", "projected MB/s", "projected res/s"))
+    for count in [int(n) for n in args.resources.split(",")]:
+        for name, build, parse, projection in formats:
+            source = build(count)
+            megabytes = len(source.encode("utf-8")) / (1024.0 * 1024.0)
+            full_time, resources = best_of(lambda: parse(source), args.repeat)
+            projected_time, projected = best_of(lambda: parse(source, projection=projection), args.repeat)
+            if len(projected) != len(resources):
+                print("❌ %s: projected parse lost resources: %d vs %d" % (name, len(projected), len(resources)))
+                return 1
+            print("%10s %10d %8.1f %10.1f %12.0f %15.1f %17.0f" % (
+                name, len(resources), megabytes, megabytes / full_time, len(resources) / full_time,
+                megabytes / projected_time, len(projected) / projected_time))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
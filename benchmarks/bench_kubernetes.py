@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Kubernetes manifest parser throughput and memory.
+
+Builds Helm-style rendered output (ServiceAccounts, Deployments, Services
+and ConfigMaps, one YAML document each) and reports documents per second
+for yaml.load_all with the pure-Python SafeLoader (baseline, reading
+timestamps as strings like the SIS loader),
+sis.parsers.kubernetes.iter_kubernetes_file, and the same restricted to the
+projection of the canonical rule pack. Peak traced memory compares
+parse_kubernetes (whole file in a string, every resource in a list) with
+iter_kubernetes_file consumed one resource at a time.
+
+Usage:
+    python benchmarks/bench_kubernetes.py [--documents 1000,10000] [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "sis-core" / "src"))
+
+# Keep benchmark runs out of the persistent caches
+os.environ.setdefault("SIS_CACHE_DIR", "")
+
+import yaml  # noqa: E402
+
+from sis.compiler import compile_rules  # noqa: E402
+from sis.parsers.kubernetes import iter_kubernetes_file, parse_kubernetes  # noqa: E402
+from sis.parsers.yaml_loader import LIBYAML_AVAILABLE  # noqa: E402
+
+
+class BaselineLoader(yaml.SafeLoader):
+    """Pure-Python safe loader with the timestamp handling of sis.parsers.yaml_loader.SafeLoader."""
+
+
+BaselineLoader.add_constructor("tag:yaml.org,2002:timestamp", BaselineLoader.construct_yaml_str)
+
+TEMPLATE = """---
+# Source: app/templates/serviceaccount.yaml
+apiVersion: v1
+kind: ServiceAccount
+metadata:
+  name: app-{i}
+  namespace: {namespace}
+  labels: {{app.kubernetes.io/name: app-{i}, helm.sh/chart: app-1.2.3}}
+automountServiceAccountToken: {automount}
+---
+# Source: app/templates/deployment.yaml
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: app-{i}
+  namespace: {namespace}
+  annotations:
+    deployment.kubernetes.io/revision: "3"
+spec:
+  replicas: 2
+  selector:
+    matchLabels: {{app: app-{i}}}
+  template:
+    metadata:
+      labels: {{app: app-{i}}}
+    spec:
+      serviceAccountName: app-{i}
+      containers:
+        - name: app
+          image: "registry.example.com/app:1.{i}"
+          ports: [{{containerPort: 8080, protocol: TCP}}]
+          env:
+            - {{name: LOG_LEVEL, value: info}}
+            - {{name: CREATED, value: 2024-01-0{day}}}
+          resources:
+            limits: {{cpu: 500m, memory: 256Mi}}
+---
+apiVersion: v1
+kind: Service
+metadata: {{name: app-{i}, namespace: {namespace}}}
+spec:
+  type: ClusterIP
+  ports: [{{port: 80, targetPort: 8080}}]
+---
+apiVersion: v1
+kind: ConfigMap
+metadata: {{name: app-{i}-config, namespace: {namespace}}}
+data:
+  config.yaml: |
+    server:
+      port: 8080
+      workers: 4
+"""
+
+
+def build_manifest(documents):
+    """Rendered chart output with about `documents` YAML documents."""
+    parts = []
+    for i in range((documents + 3) // 4):
+        parts.append(TEMPLATE.format(i=i, namespace="kube-system" if i % 10 == 0 else "apps",
+                                     automount="true" if i % 3 == 0 else "false", day=i % 9 + 1))
+    return "".join(parts)
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak_memory(func):
+    """Peak traced allocation (MB) while running func."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / (1024.0 * 1024.0)
+    finally:
+        tracemalloc.stop()
+
+
+def consume(iterator):
+    count = 0
+    for _ in iterator:
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SIS Kubernetes parser benchmark")
+    parser.add_argument("--documents", default="1000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(ROOT / "rules" / "canonical" / "rules.json") as f:
+        projection = compile_rules(json.load(f)).projection("kubernetes")
+
+    print("Kubernetes parser benchmark (libyaml: %s)" % ("yes" if LIBYAML_AVAILABLE else "no"))
+    print("%10s %8s %14s %14s %15s %13s %13s" % (
+        "documents", "MB", "baseline doc/s", "stream doc/s", "projected doc/s", "list peak MB",
+        "stream peak MB"))
+    for documents in [int(n) for n in args.documents.split(",")]:
+        manifest = build_manifest(documents)
+        fd, path = tempfile.mkstemp(suffix=".yaml")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(manifest)
+            baseline_time, baseline = best_of(
+                lambda: [d for d in yaml.load_all(manifest, Loader=BaselineLoader) if d], args.repeat)
+            stream_time, resources = best_of(lambda: list(iter_kubernetes_file(path)), args.repeat)
+            projected_time, projected = best_of(lambda: list(iter_kubernetes_file(path, projection)), args.repeat)
+            list_peak = peak_memory(lambda: parse_kubernetes(Path(path).read_text()))
+            stream_peak = peak_memory(lambda: consume(iter_kubernetes_file(path, projection)))
+        finally:
+            os.unlink(path)
+        if len(resources) != len(baseline) or len(projected) != len(resources):
+            print("❌ parsers disagree on document count: %d / %d / %d" % (
+                len(baseline), len(resources), len(projected)))
+            return 1
+        if [r["attributes"] for r in resources] != baseline:
+            print("❌ parsed documents differ from yaml.load_all")
+            return 1
+        print("%10d %8.1f %14.0f %14.0f %15.0f %13.2f %13.2f" % (
+            len(resources), len(manifest) / (1024.0 * 1024.0), len(baseline) / baseline_time,
+            len(resources) / stream_time, len(projected) / projected_time, list_peak, stream_peak))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Terraform parser throughput: legacy line parser vs single-pass HCL parser.
+
+Builds a corpus from the Terraform files in the repository (renaming
+resources so every copy is distinct), repeated up to the requested size,
+and reports parse throughput in MB/s for the original line parser (kept
+below as parse_lines) and parse_terraform_simple (sis.parsers.hcl), plus parse_content on a
+memory-mapped copy of the corpus, tokenized as bytes as the scanner does
+for large files, and parse_terraform_simple restricted to the projection of the canonical rule
+pack (only the kinds and attributes the rules reference are parsed).
+
+Usage:
+    python benchmarks/bench_parser.py [--size-mb 1,4,16] [--repeat N]
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "sis-core" / "src"))
+
+# Keep benchmark runs out of the persistent caches
+os.environ.setdefault("SIS_CACHE_DIR", "")
+
+from sis.compiler import compile_rules  # noqa: E402
+from sis.parsers import parse_content  # noqa: E402
+from sis.parsers.terraform_simple import parse_terraform_simple, parse_value  # noqa: E402
+
+SOURCES = [
+    "real-world-example.tf",
+    "terraform-examples/main.tf",
+    "terraform-examples/database.tf",
+    "test_infra/vulnerable.tf",
+    "test_canonical_irr_dec_01.tf",
+]
+
+RESOURCE_RE = re.compile(r'^(resource\s+"[^"]+"\s+")([^"]+)(")', re.MULTILINE)
+
+
+ATTRIBUTE_RE = re.compile(r"([a-zA-Z_][a-zA-Z0-9_-]*)\s*=\s*(.+)$")
+BLOCK_RE = re.compile(r"([a-zA-Z_][a-zA-Z0-9_-]*)\s*{")
+
+
+def _block_lines(lines, start):
+    """Lines of the block opened on lines[start - 1], found by counting braces per line."""
+    brace_count = 1
+    j = start
+    block = []
+    while j < len(lines) and brace_count > 0:
+        block.append(lines[j])
+        if "{" in lines[j]:
+            brace_count += 1
+        if "}" in lines[j]:
+            brace_count -= 1
+        j += 1
+    # The last line holds the closing brace
+    return block[:-1], j
+
+
+def _parse_attributes(content):
+    """Attribute assignments of a nested block (nested blocks of its own are ignored)."""
+    attributes = {}
+    for line in content.strip().split("\n"):
+        line = line.strip()
+        match = ATTRIBUTE_RE.match(line) if line and not line.startswith("#") else None
+        if match:
+            attributes[match.group(1)] = parse_value(match.group(2).strip())
+    return attributes
+
+
+def _parse_body(content):
+    """Attributes and one level of nested blocks of a resource body."""
+    attributes = {}
+    lines = content.strip().split("\n")
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if not line or line.startswith("#"):
+            i += 1
+            continue
+        match = BLOCK_RE.match(line)
+        if match:
+            block, j = _block_lines(lines, i + 1)
+            value = _parse_attributes("\n".join(block))
+            name = match.group(1)
+            if name not in attributes:
+                attributes[name] = value
+            elif isinstance(attributes[name], list):
+                attributes[name].append(value)
+            else:
+                attributes[name] = [attributes[name], value]
+            i = j - 1
+        else:
+            match = ATTRIBUTE_RE.match(line)
+            if match:
+                attributes[match.group(1)] = parse_value(match.group(2).strip())
+        i += 1
+    return attributes
+
+
+def parse_lines(content):
+    """The original line-based parser: blocks found by counting braces per line."""
+    resources = []
+    lines = content.split("\n")
+    i = 0
+    while i < len(lines):
+        match = re.match(r'resource\s+"([^"]+)"\s+"([^"]+)"\s*{', lines[i].strip())
+        if match:
+            block, j = _block_lines(lines, i + 1)
+            resources.append({
+                "kind": match.group(1),
+                "name": match.group(2),
+                "attributes": _parse_body("\n".join(block)),
+                "line": i + 1,
+            })
+            i = j - 1
+        i += 1
+    return resources
+
+
+def parse_mapped(path):
+    """Parse a file through a read-only memory map, as Scanner does above MMAP_THRESHOLD."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_content(mapped, "terraform_simple", use_cache=False)
+
+
+def build_corpus(size_bytes):
+    """Concatenate renamed copies of the repository's .tf files."""
+    base = "\n".join((ROOT / name).read_text() for name in SOURCES)
+    parts = []
+    total = 0
+    copy = 0
+    while total < size_bytes:
+        chunk = RESOURCE_RE.sub(lambda m: "%s%s_%d%s" % (m.group(1), m.group(2), copy, m.group(3)), base)
+        parts.append(chunk)
+        total += len(chunk.encode("utf-8"))
+        copy += 1
+    return "\n".join(parts)
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SIS Terraform parser benchmark")
+    parser.add_argument("--size-mb", default="1,4,16")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(ROOT / "rules" / "canonical" / "rules.json") as f:
+        projection = compile_rules(json.load(f)).projection("terraform")
+
+    print("Parser benchmark: legacy line parser vs single-pass HCL parser")
+    print("%8s %10s %14s %14s %14s %15s %9s" % (
+        "MB", "resources", "legacy MB/s", "hcl MB/s", "mmap MB/s", "projected MB/s", "speedup"))
+    for size in [float(s) for s in args.size_mb.split(",")]:
+        corpus = build_corpus(int(size * 1024 * 1024))
+        megabytes = len(corpus.encode("utf-8")) / (1024.0 * 1024.0)
+        fd, path = tempfile.mkstemp(suffix=".tf")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(corpus)
+            legacy_time, legacy = best_of(lambda: parse_lines(corpus), args.repeat)
+            hcl_time, resources = best_of(lambda: parse_terraform_simple(corpus), args.repeat)
+            mmap_time, mapped = best_of(lambda: parse_mapped(path), args.repeat)
+            projected_time, projected = best_of(lambda: parse_terraform_simple(corpus, projection), args.repeat)
+        finally:
+            os.unlink(path)
+        if len(legacy) != len(resources):
+            print("❌ parsers disagree on resource count: %d vs %d" % (len(legacy), len(resources)))
+            return 1
+        if mapped != resources:
+            print("❌ mmap parse differs from str parse")
+            return 1
+        if len(projected) != len(resources):
+            print("❌ projected parse lost resources: %d vs %d" % (len(projected), len(resources)))
+            return 1
+        print("%8.1f %10d %14.1f %14.1f %14.1f %15.1f %8.2fx" % (
+            megabytes, len(resources), megabytes / legacy_time, megabytes / hcl_time, megabytes / mmap_time,
+            megabytes / projected_time, legacy_time / hcl_time))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
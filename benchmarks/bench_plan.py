@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Terraform plan JSON parsing: streaming vs loading the whole document.
+
+Generates a `terraform show -json` plan (planned_values with nested child
+modules, plus resource_changes and prior_state as real plans carry them)
+and reports time and peak traced memory for
+sis.parsers.terraform_plan.iter_terraform_plan_file against json.load of
+the same file followed by a walk of planned_values.
+
+Usage:
+    python benchmarks/bench_plan.py [--resources 10000,100000] [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "sis-core" / "src"))
+
+# Keep benchmark runs out of the persistent caches
+os.environ.setdefault("SIS_CACHE_DIR", "")
+
+from sis.parsers.terraform_plan import iter_terraform_plan_file  # noqa: E402
+
+
+def plan_resource(module, i):
+    address = "aws_s3_bucket.b%d" % i
+    if module:
+        address = module + "." + address
+    return {
+        "address": address,
+        "mode": "managed",
+        "type": "aws_s3_bucket",
+        "name": "b%d" % i,
+        "provider_name": "registry.terraform.io/hashicorp/aws",
+        "schema_version": 0,
+        "values": {
+            "bucket": "bucket-%d" % i,
+            "acl": "public-read" if i % 2 else "private",
+            "force_destroy": False,
+            "tags": {"env": "prod", "owner": "team-%d" % i},
+            "versioning": [{"enabled": True, "mfa_delete": False}],
+        },
+        "sensitive_values": {"tags": {}, "versioning": [{}]},
+    }
+
+
+def plan_document(count, modules=10):
+    per_module = count // (modules + 1)
+    root = {"resources": [plan_resource("", i) for i in range(per_module)], "child_modules": []}
+    for m in range(modules):
+        name = "module.m%d" % m
+        root["child_modules"].append({
+            "address": name,
+            "resources": [plan_resource(name, i) for i in range(per_module)],
+        })
+    resources = [r for module in [root] + root["child_modules"] for r in module["resources"]]
+    changes = [{"address": r["address"], "type": r["type"], "name": r["name"],
+                "change": {"actions": ["create"], "before": None, "after": r["values"]}}
+               for r in resources]
+    return {
+        "format_version": "1.2",
+        "terraform_version": "1.6.0",
+        "planned_values": {"root_module": root},
+        "resource_changes": changes,
+        "prior_state": {"values": {"root_module": root}},
+    }, len(resources)
+
+
+def walk_loaded(path):
+    with open(path, "rb") as f:
+        document = json.load(f)
+    found = []
+    modules = [document["planned_values"]["root_module"]]
+    while modules:
+        module = modules.pop()
+        found.extend(r for r in module.get("resources", ()) if r.get("mode") == "managed")
+        modules.extend(reversed(module.get("child_modules", ())))
+    return found
+
+
+def measure(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SIS Terraform plan parser benchmark")
+    parser.add_argument("--resources", default="10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("Terraform plan benchmark")
+    print("%10s %8s %10s %12s %12s %14s" % (
+        "resources", "MB", "load (s)", "load MB", "stream (s)", "stream MB"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in [int(n) for n in args.resources.split(",")]:
+            document, expected = plan_document(count)
+            path = os.path.join(tmp, "plan.json")
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+            del document
+            megabytes = os.path.getsize(path) / (1024.0 * 1024.0)
+
+            load_time, load_peak, loaded = measure(lambda: walk_loaded(path), args.repeat)
+            stream_time, stream_peak, streamed = measure(
+                lambda: list(iter_terraform_plan_file(path)), args.repeat)
+            if len(loaded) != expected or len(streamed) != expected:
+                print("❌ resource count mismatch: load %d, stream %d, expected %d"
+                      % (len(loaded), len(streamed), expected))
+                return 1
+            if [r["address"] for r in loaded] != [r["address"] for r in streamed]:
+                print("❌ streamed resources differ from json.load")
+                return 1
+            print("%10d %8.1f %10.2f %12.1f %12.2f %14.1f" % (
+                expected, megabytes, load_time, load_peak / 1048576.0, stream_time, stream_peak / 1048576.0))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
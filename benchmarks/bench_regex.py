@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Regex microbenchmark: per-pattern re.match vs a merged RegexSet.
+
+Simulates several identity and naming rules testing the same attribute
+path (account_id / name) and times matching a value corpus against every
+pattern separately versus once through sis.regexset.RegexSet. The engine
+only merges paths with at least regexset.MERGE_THRESHOLD patterns, the
+break-even point measured here.
+
+Usage:
+    python benchmarks/bench_regex.py [--values N] [--patterns 2,4,8,16]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "sis-core" / "src"))
+
+from sis.regexset import RegexSet  # noqa: E402
+
+PATTERNS = [
+    r".*@.*\.iam\.gserviceaccount\.com",
+    r"^[a-z][a-z0-9-]{5,29}$",
+    r"(prod|production)-",
+    r"(stg|staging)-",
+    r".*-admin$",
+    r"^svc-[a-z]+-[0-9]+$",
+    r".*root.*",
+    r"^[0-9]{12}$",
+    r"arn:aws:iam::[0-9]{12}:role/.*",
+    r".*-(break-glass|emergency)$",
+    r"^terraform-",
+    r".*@[a-z-]+\.iam\.gserviceaccount\.com$",
+    r"^(dev|test)-",
+    r".*[A-Z].*",
+    r"^ci-[a-z0-9]{8}$",
+    r".*-sa$",
+]
+
+VALUES = [
+    "svc@project-1.iam.gserviceaccount.com", "prod-api-gateway", "stg-worker",
+    "billing-admin", "svc-ingest-42", "root-account", "123456789012",
+    "arn:aws:iam::123456789012:role/deployer", "ops-break-glass",
+    "terraform-runner", "dev-sandbox", "MixedCase", "ci-1a2b3c4d", "etl-sa",
+    "plain", "x" * 40,
+]
+
+
+def time_separate(patterns, values):
+    matchers = [re.compile(p).match for p in patterns]
+    start = time.perf_counter()
+    hits = 0
+    for value in values:
+        text = str(value)
+        for matcher in matchers:
+            if matcher(text) is not None:
+                hits += 1
+    return time.perf_counter() - start, hits
+
+
+def time_merged(patterns, values):
+    regex_set = RegexSet(patterns)
+    slots = regex_set.slots
+    start = time.perf_counter()
+    hits = 0
+    for value in values:
+        row = regex_set.scan_value(value)
+        for slot in slots:
+            if row[slot] is not None:
+                hits += 1
+    return time.perf_counter() - start, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SIS multi-pattern regex benchmark")
+    parser.add_argument("--values", type=int, default=100000)
+    parser.add_argument("--patterns", default="2,4,8,16")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    values = [rng.choice(VALUES) for _ in range(args.values)]
+
+    print("Regex benchmark: %d values" % len(values))
+    print("%9s %14s %12s %9s" % ("patterns", "separate (s)", "merged (s)", "speedup"))
+    for count in [int(c) for c in args.patterns.split(",")]:
+        patterns = PATTERNS[:count]
+        separate_time, separate_hits = time_separate(patterns, values)
+        merged_time, merged_hits = time_merged(patterns, values)
+        if separate_hits != merged_hits:
+            print("❌ merged matcher disagrees with re.match at %d patterns" % count)
+            return 1
+        print("%9d %14.3f %12.3f %8.2fx" % (count, separate_time, merged_time, separate_time / merged_time))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
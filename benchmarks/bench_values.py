@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Value conversion benchmark: parse_value fast paths vs trial conversion.
+
+The corpus is every attribute value in terraform-examples/ and
+real-world-example.tf, both as the HCL parser hands them to parse_value
+and as the legacy line parser does (right-hand side of the line, trailing
+comments included). Each value is converted with
+sis.parsers.terraform_simple.parse_value and with parse_value_generic (the
+json.loads / int / float trial sequence it replaces); results must be
+identical.
+
+Usage:
+    python benchmarks/bench_values.py [--copies N] [--repeat N]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "sis-core" / "src"))
+
+from sis.parsers.hcl import ATTR, tokenize  # noqa: E402
+from sis.parsers.terraform_simple import parse_value, parse_value_generic  # noqa: E402
+
+ASSIGNMENT_RE = re.compile(r'^\s*[A-Za-z_][A-Za-z0-9_-]*\s*=\s*(.+?)\s*$', re.MULTILINE)
+
+
+def value_corpus():
+    """Attribute value strings from the repository's example configurations."""
+    paths = sorted((ROOT / "terraform-examples").glob("*.tf")) + [ROOT / "real-world-example.tf"]
+    values = []
+    for path in paths:
+        text = path.read_text()
+        tokens, _ = tokenize(text)
+        values.extend(token[4] for token in tokens if token[0] == ATTR)
+        values.extend(ASSIGNMENT_RE.findall(text))
+    return values
+
+
+def classify(value):
+    """First-character class of a value, for the per-class breakdown."""
+    first = value[:1]
+    if first == '"':
+        return "string"
+    if first.isdigit() or first == "-":
+        return "number"
+    if first.isalpha() or first == "_":
+        return "identifier"
+    return "other"
+
+
+def timed(func, values, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def same(a, b):
+    return type(a) is type(b) and repr(a) == repr(b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SIS parse_value benchmark")
+    parser.add_argument("--copies", type=int, default=2000, help="Repetitions of the corpus per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = value_corpus()
+    for value in corpus:
+        if not same(parse_value(value), parse_value_generic(value)):
+            print("❌ results differ for %r" % value)
+            return 1
+
+    classes = {}
+    for value in corpus:
+        classes.setdefault(classify(value), []).append(value)
+    classes["all"] = corpus
+
+    print("Value conversion benchmark (%d distinct inputs x %d)" % (len(corpus), args.copies))
+    print("%12s %8s %14s %14s %9s" % ("class", "values", "generic us", "parse_value us", "speedup"))
+    for name in ("identifier", "string", "number", "other", "all"):
+        values = classes.get(name, []) * args.copies
+        if not values:
+            continue
+        generic_time = timed(parse_value_generic, values, args.repeat)
+        fast_time = timed(parse_value, values, args.repeat)
+        print("%12s %8d %14.3f %14.3f %8.2fx" % (
+            name, len(values), generic_time / len(values) * 1e6, fast_time / len(values) * 1e6,
+            generic_time / fast_time))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+On-disk cache locations for SIS
+"""
+import hashlib
+import marshal
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Suffix of DiskCache entry files
+ENTRY_SUFFIX = '.bin'
+
+# After an eviction pass a DiskCache holds at most this share of max_bytes
+EVICT_TARGET = 0.8
+
+# Permissions of files written by atomic_write (mkstemp creates them 0600),
+# so a cache directory can be shared with other users and CI runners
+FILE_MODE = 0o644
+
+# Read size used when hashing files
+DIGEST_CHUNK = 1024 * 1024
+
+
+def get_cache_dir(*parts: str, cache_dir: Any = None, use_cache: bool = True) -> Optional[Path]:
+    """
+    Return (and create) a cache directory for SIS artifacts.
+
+    The root is cache_dir if given, else taken from the SIS_CACHE_DIR
+    environment variable, falling back to ~/.cache/sis. Setting
+    SIS_CACHE_DIR to an empty string disables on-disk caching.
+
+    Args:
+        *parts: Sub-directory components below the cache root
+        cache_dir: Cache root, overriding SIS_CACHE_DIR
+        use_cache: False disables on-disk caching
+
+    Returns:
+        The directory path, or None if caching is disabled or unavailable
+    """
+    if not use_cache:
+        return None
+    root = cache_dir if cache_dir is not None else os.environ.get('SIS_CACHE_DIR')
+    if root is None:
+        root = os.path.join(os.path.expanduser('~'), '.cache', 'sis')
+    if not root:
+        return None
+
+    path = Path(root).joinpath(*parts)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def atomic_write(path: Path, data: bytes) -> bool:
+    """
+    Write bytes to path atomically (temp file + rename).
+
+    Concurrent writers never leave a partially written file behind; the
+    last rename wins. The file is created with FILE_MODE permissions.
+
+    Returns:
+        True if the file was written
+    """
+    # Imported on first write: scans served from the cache never need it
+    import tempfile
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix='.tmp-')
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, str(path))
+        return True
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+def cache_key(*parts: Any) -> str:
+    """Hex digest identifying a cache entry by its key components."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        elif not isinstance(part, (bytes, bytearray, memoryview, mmap.mmap)):
+            part = str(part).encode('utf-8')
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+def file_digest(path: Any) -> Optional[str]:
+    """
+    Hex SHA-256 of a file's content, read in DIGEST_CHUNK blocks.
+
+    Returns:
+        The digest, or None if the file cannot be read
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(DIGEST_CHUNK), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    A size-bounded, content-addressed store of marshalled values.
+
+    Each entry is one file named by its key and written atomically, so a
+    directory can be shared by concurrent processes (or copied between
+    machines). Reads refresh an entry's mtime; once the directory grows
+    beyond max_bytes, the least recently used entries are deleted.
+
+    Attributes:
+        directory: Directory holding the entries
+        max_bytes: Size bound of the directory
+        stats: Counters: hits, misses, writes, evictions
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        # Total entry size, computed on the first write
+        self._size: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the value stored under key, or None on a miss.
+
+        Unreadable or corrupt entries count as misses and are removed.
+        """
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            value = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            self.stats['misses'] += 1
+            self._remove(path)
+            return None
+
+        try:
+            # Mark as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats['hits'] += 1
+        return value
+
+    def put(self, key: str, value: Any) -> bool:
+        """
+        Store a value (anything marshal supports) under key.
+
+        Returns:
+            True if the entry was written
+        """
+        try:
+            data = marshal.dumps(value)
+        except ValueError:
+            return False
+        if not atomic_write(self._path(key), data):
+            return False
+
+        self.stats['writes'] += 1
+        if self._size is None:
+            self._size = self._disk_usage()
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+        return True
+
+    def _entries(self):
+        """(mtime, size, path) of every entry."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(ENTRY_SUFFIX):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            pass
+        return entries
+
+    def _disk_usage(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _remove(self, path: Any) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except OSError:
+            # Already removed by a concurrent process
+            return False
+
+    def evict(self) -> None:
+        """Delete least recently used entries down to EVICT_TARGET * max_bytes."""
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            if self._remove(path):
+                self.stats['evictions'] += 1
+            size -= entry_size
+        self._size = size
+
@@ -9,94 +9,132 @@ from pathlib import Path
 
 # Direct imports - no dynamic paths
 try:
-    from .scanner import Scanner
+    from .scanner import STREAM_THRESHOLD, Scanner
     from .rules import load_rules
 except ImportError:
     # Fallback for direct execution
-    from scanner import Scanner
+    from scanner import STREAM_THRESHOLD, Scanner
     from rules import load_rules
 
 def run_scan(args):
     """Scan Terraform files for irreversible patterns."""
-    scanner = Scanner()
+    # On-disk caches live under --cache-dir, else SIS_CACHE_DIR ('' disables them)
+    scanner = Scanner(stream_threshold=args.stream_threshold, cache_dir=args.cache_dir,
+                      use_cache=not args.no_cache)
     rules = load_rules()
     
-    all_findings = []
+    # Findings are streamed straight to the output, never accumulated
+    errors = []
+    findings = iter_findings(scanner, rules, args.files, errors)
     
-    for file_path in args.files:
+    # Output formatting
+    if args.format == 'json':
+        total = write_json_output(findings, len(args.files), sys.stdout)
+    else:
+        total = format_text_output(findings)
+    
+    # Selectivity statistics are saved only with an explicit --cache-dir
+    scanner.flush()
+    
+    if args.cache_stats:
+        print_cache_stats(scanner)
+    
+    return 1 if total or errors else 0
+
+def print_cache_stats(scanner):
+    """Report the scanner's result and parse cache hits and misses on stderr."""
+    for name, cache in (("Result", scanner.result_cache), ("Parse", scanner.parse_cache)):
+        if cache is None:
+            print(f"📦 {name} cache: disabled", file=sys.stderr)
+            continue
+        stats = cache.stats
+        print(f"📦 {name} cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+              f"{stats['evictions']} eviction(s) in {cache.directory}", file=sys.stderr)
+
+def iter_findings(scanner, rules, files, errors=None):
+    """
+    Yield findings file by file; unreadable files are reported and skipped.
+    
+    Paths whose scan raised are appended to errors (if given).
+    """
+    for file_path in files:
         if not Path(file_path).exists():
             print(f"Error: File not found: {file_path}", file=sys.stderr)
             continue
             
         try:
-            findings = scanner.scan(file_path, rules)
-            all_findings.extend(findings)
+            if Path(file_path).is_dir():
+                # A root module: resolved with its variables, locals and modules
+                yield from scanner.iter_scan_workspace(file_path, rules)
+            else:
+                yield from scanner.iter_scan(file_path, rules)
         except Exception as e:
             print(f"Error scanning {file_path}: {e}", file=sys.stderr)
+            if errors is not None:
+                errors.append(file_path)
             continue
+
+def format_violation(f):
+    """Format one finding as a JSON violation record."""
+    record = {
+        "rule_id": f.get("rule_id", "UNKNOWN"),
+        "message": f.get("message", ""),
+        "severity": f.get("severity", "MEDIUM"),
+        "file": f.get("file_path", ""),
+        "resource": {
+            "type": f.get("resource_type", ""),
+            "name": f.get("resource_name", "")
+        },
+        "line": f.get("line", 1)
+    }
+    if f.get("resource_address"):
+        record["resource"]["address"] = f["resource_address"]
+    return record
+
+def write_json_output(findings, files_scanned, out):
+    """
+    Stream findings as structured JSON, returning the number written.
     
-    # Output formatting
-    if args.format == 'json':
-        output = format_json_output(all_findings, len(args.files))
-        print(json.dumps(output, indent=2))
-    else:
-        format_text_output(all_findings)
-    
-    return 1 if all_findings else 0
-
-def format_json_output(findings, files_scanned):
-    """Format findings as structured JSON."""
-    if findings:
-        violations = []
-        for f in findings:
-            violations.append({
-                "rule_id": f.get("rule_id", "UNKNOWN"),
-                "message": f.get("message", ""),
-                "severity": f.get("severity", "MEDIUM"),
-                "file": f.get("file_path", ""),
-                "resource": {
-                    "type": f.get("resource_type", ""),
-                    "name": f.get("resource_name", "")
-                },
-                "line": f.get("line", 1)
-            })
-        
-        return {
-            "summary": {
-                "total_violations": len(findings),
-                "rules_fired": sorted(list(set([v["rule_id"] for v in findings if v.get("rule_id")]))),
-                "files_scanned": files_scanned
-            },
-            "violations": violations
-        }
-    else:
-        return {
-            "summary": {
-                "total_violations": 0,
-                "rules_fired": [],
-                "files_scanned": files_scanned
-            },
-            "violations": []
-        }
+    The document holds a "violations" array (see format_violation) and a
+    "summary" object (total_violations, rules_fired, files_scanned), which
+    follows the violations since it is only known at the end.
+    """
+    total = 0
+    rules_fired = set()
+    out.write('{\n  "violations": [')
+    for f in findings:
+        record = json.dumps(format_violation(f), indent=2).replace('\n', '\n    ')
+        out.write((',\n    ' if total else '\n    ') + record)
+        total += 1
+        if f.get("rule_id"):
+            rules_fired.add(f["rule_id"])
+    out.write('\n  ],\n' if total else '],\n')
+    summary = {
+        "total_violations": total,
+        "rules_fired": sorted(rules_fired),
+        "files_scanned": files_scanned
+    }
+    out.write('  "summary": ' + json.dumps(summary, indent=2).replace('\n', '\n  ') + '\n}\n')
+    return total
 
 def format_text_output(findings):
-    """Format findings as human-readable text."""
-    if not findings:
-        print("✅ No violations found.")
-        return
-    
-    # Group by file
-    by_file = {}
+    """Print findings as human-readable text, returning the number printed."""
+    total = 0
+    current_file = None
     for finding in findings:
         file_path = finding.get("file_path", "unknown")
-        by_file.setdefault(file_path, []).append(finding)
+        if total == 0 or file_path != current_file:
+            # Findings arrive grouped by file
+            current_file = file_path
+            print(f"\n{file_path}:")
+        rule_id = finding.get("rule_id", "UNKNOWN")
+        message = finding.get("message", "")
+        print(f"  ❌ {rule_id}: {message}")
+        total += 1
     
-    for file_path, file_findings in by_file.items():
-        print(f"\n{file_path}:")
-        for finding in file_findings:
-            rule_id = finding.get("rule_id", "UNKNOWN")
-            message = finding.get("message", "")
-            print(f"  ❌ {rule_id}: {message}")
+    if not total:
+        print("✅ No violations found.")
+    return total
 
 
 
@@ -159,9 +197,18 @@ def main():
     
     # Scan command
     scan_parser = subparsers.add_parser('scan', help='Scan Terraform files')
-    scan_parser.add_argument('files', nargs='+', help='Terraform files to scan')
+    scan_parser.add_argument('files', nargs='+', help='Terraform files or root module directories to scan')
     scan_parser.add_argument('--format', choices=['text', 'json'], 
                            default='text', help='Output format')
+    scan_parser.add_argument('--stream-threshold', type=int, default=STREAM_THRESHOLD,
+                           metavar='BYTES',
+                           help='Parse files larger than this incrementally')
+    scan_parser.add_argument('--cache-dir', metavar='DIR',
+                           help='Directory for on-disk caches (default: $SIS_CACHE_DIR or ~/.cache/sis)')
+    scan_parser.add_argument('--no-cache', action='store_true',
+                           help='Disable on-disk caches')
+    scan_parser.add_argument('--cache-stats', action='store_true',
+                           help='Print result and parse cache statistics to stderr')
     scan_parser.set_defaults(func=run_scan)
     
     # Explain command
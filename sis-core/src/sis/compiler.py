@@ -0,0 +1,579 @@
+"""
+Rule compiler for SIS
+
+Turns a loaded rule set into generated Python source, one function per
+rule, so the engine does not re-interpret condition dicts for every
+(rule, resource, condition) triple. Regexes are compiled once, comparison
+values are normalized once and match_logic is inlined as short-circuiting
+and/or expressions. Compiled bytecode is cached per rule-set hash.
+
+REGEX and CONTAINS results are memoized per (test id, string value) in a
+bounded LRU shared by the rule set, since large inventories repeat the same
+attribute values across many resources.
+"""
+import hashlib
+import importlib.util
+import json
+import marshal
+import re
+import sys
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .cache import get_cache_dir, atomic_write
+from .paths import (Fanout, PathMemo, Projection, compile_path, memo_class, is_simple_path, parse_path,
+                    top_level_key)
+from .regexset import MERGE_THRESHOLD, RegexSet, RegexSetAccessor, compile_pattern
+from .planner import SelectivityStats, plan_conditions, condition_key
+
+# Bump whenever the generated source changes shape
+COMPILER_VERSION = 5
+
+# Maximum number of (test id, value) results kept by a rule set's value cache
+VALUE_CACHE_SIZE = 65536
+
+# One resource in this many has every applicable condition evaluated to
+# refresh selectivity statistics
+SAMPLE_INTERVAL = 64
+
+# In-process caches: (rule-set hash, statistics file) -> compiled rule set,
+# code key -> code object
+_COMPILED: Dict[Tuple[str, Optional[Path]], 'CompiledRuleSet'] = {}
+_CODE_CACHE: Dict[str, Any] = {}
+
+# Selectivity statistics shared by the rule sets compiled in this process,
+# by statistics file (None: in memory only)
+_SELECTIVITY: Dict[Optional[Path], SelectivityStats] = {}
+
+
+def rule_set_hash(rules: List[Dict[str, Any]]) -> str:
+    """
+    Compute a canonical hash of a rule set.
+
+    Args:
+        rules: List of rule dictionaries
+
+    Returns:
+        Hex SHA256 digest of the canonical JSON encoding of the rules
+    """
+    canonical_json = json.dumps(rules, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical_json.encode('utf-8')).hexdigest()
+
+
+def normalize_equals(value: Any) -> str:
+    """
+    Normalize a value for EQUALS comparison.
+
+    Boolean strings ("true"/"TRUE"/"false") compare equal to Python booleans,
+    everything else is compared by its string form.
+    """
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered == 'true':
+            return 'True'
+        if lowered == 'false':
+            return 'False'
+    return str(value)
+
+
+def greater_than(attr_value: Any, threshold: float) -> bool:
+    """GREATER_THAN test; non-numeric attribute values never match."""
+    try:
+        return float(attr_value) > threshold
+    except (TypeError, ValueError):
+        return False
+
+
+def is_evaluable(rule: Any) -> bool:
+    """Whether a rule can ever produce violations in the engine."""
+    return isinstance(rule, dict) and 'applies_to' in rule and 'detection' in rule
+
+
+# Operators whose test reads the attribute value more than once
+_REUSES_VALUE = frozenset(['REGEX', 'CONTAINS'])
+
+
+class _RuleSourceGenerator:
+    """Emits Python source for a rule set and collects its constants."""
+
+    def __init__(self, regex_groups: Optional[Dict[str, List[str]]] = None):
+        self.constants: Dict[str, Any] = {
+            '_normalize': normalize_equals,
+            '_gt': greater_than,
+            '_Fanout': Fanout,
+        }
+        self.lines: List[str] = []
+        # Accessors for paths read through the per-resource PathMemo `m`
+        self.accessors: List[Any] = []
+        self._path_ids: Dict[str, int] = {}
+        # path -> patterns matched together by one RegexSet, and its memo id
+        self.regex_groups = regex_groups or {}
+        self._regex_set_ids: Dict[str, int] = {}
+        # rule index -> (condition expressions, evaluation order, match_logic)
+        self.plans: Dict[int, Tuple[List[str], List[int], str]] = {}
+        # Memoized string tests: test id -> function of the string value
+        self.value_tests: List[Any] = []
+        self._value_test_ids: Dict[Tuple[str, str], int] = {}
+        tests = self.value_tests
+
+        def run_value_test(test_id: int, text: str) -> Any:
+            return tests[test_id](text)
+
+        self.value_cache = lru_cache(maxsize=VALUE_CACHE_SIZE)(run_value_test)
+        self.constants['_cached'] = self.value_cache
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        name = '_%s%d' % (prefix, self._counter)
+        self._counter += 1
+        return name
+
+    def _constant(self, prefix: str, value: Any) -> str:
+        name = self._name(prefix)
+        self.constants[name] = value
+        return name
+
+    def _path_id(self, path: Any) -> int:
+        key = str(path)
+        path_id = self._path_ids.get(key)
+        if path_id is None:
+            path_id = self._path_ids[key] = len(self.accessors)
+            self.accessors.append(compile_path(key))
+        return path_id
+
+    def _value_test_id(self, kind: str, value: str, test: Any) -> int:
+        """Register a memoized string test; identical tests share an id."""
+        key = (kind, value)
+        test_id = self._value_test_ids.get(key)
+        if test_id is None:
+            test_id = self._value_test_ids[key] = len(self.value_tests)
+            self.value_tests.append(test)
+        return test_id
+
+    def _regex_set_id(self, path: str) -> int:
+        memo_id = self._regex_set_ids.get(path)
+        if memo_id is None:
+            memo_id = self._regex_set_ids[path] = len(self.accessors)
+            regex_set = RegexSet(self.regex_groups[path])
+            test_id = self._value_test_id('REGEX_SET', path, regex_set.scan)
+            self.accessors.append(RegexSetAccessor(regex_set, compile_path(path).get,
+                                                   partial(self.value_cache, test_id)))
+        return memo_id
+
+    def _test(self, operator: Any, value: Any, first: str, rest: str) -> str:
+        """
+        Return a test expression for one operator.
+
+        `first` is the expression for the first read of the attribute
+        value, `rest` the expression for any later read.
+        """
+        if operator == 'EXISTS':
+            return '(%s is not None)' % first
+
+        if operator == 'REGEX':
+            try:
+                matcher = re.compile(str(value)).match
+            except re.error as e:
+                print(f"⚠️  Invalid REGEX {value!r} in rule condition: {e}", file=sys.stderr)
+                return 'False'
+            test_id = self._value_test_id('REGEX', str(value), lambda text: matcher(text) is not None)
+            return '(%s is not None and _cached(%d, str(%s)))' % (first, test_id, rest)
+
+        if operator == 'EQUALS':
+            expected = self._constant('C', normalize_equals(value))
+            return '(_normalize(%s) == %s)' % (first, expected)
+
+        if operator == 'CONTAINS':
+            needle = str(value)
+            test_id = self._value_test_id('CONTAINS', needle, lambda text: needle in text)
+            return '(bool(%s) and _cached(%d, str(%s)))' % (first, test_id, rest)
+
+        if operator == 'GREATER_THAN':
+            try:
+                threshold = float(value)
+            except (TypeError, ValueError):
+                return 'False'
+            return '_gt(%s, %s)' % (first, self._constant('C', threshold))
+
+        # Unknown operator
+        return 'False'
+
+    def condition_expr(self, condition: Dict[str, Any]) -> str:
+        """
+        Return a Python expression evaluating one condition.
+
+        The expression reads attributes from `a` and memoized path lookups
+        from `m` (a PathMemo over `a`).
+        """
+        operator = condition.get('operator')
+        value = condition.get('value')
+        path = condition.get('path')
+        var = self._name('v')
+        all_candidates = str(condition.get('quantifier', 'ANY')).upper() == 'ALL'
+
+        patterns = self.regex_groups.get(str(path)) if operator == 'REGEX' else None
+        if patterns and str(value) in patterns:
+            # Matched together with the other patterns on this path, once per resource
+            memo_id = self._regex_set_id(str(path))
+            slot = self.accessors[memo_id].regex_set.slots[patterns.index(str(value))]
+            return '(m[%d][%d][%d] is not None)' % (memo_id, 1 if all_candidates else 0, slot)
+
+        if is_simple_path(path):
+            read = 'a.get(%r)' % parse_path(path)[0]
+            if operator in _REUSES_VALUE:
+                return self._test(operator, value, '(%s := %s)' % (var, read), var)
+            return self._test(operator, value, read, read)
+
+        test = self._test(operator, value, var, var)
+        if test == 'False':
+            return test
+
+        # The path may cross lists: test every candidate with ANY/ALL semantics
+        item_test = self._name('t')
+        self.lines.append('def %s(v):' % item_test)
+        self.lines.append('    return %s' % self._test(operator, value, 'v', 'v'))
+        self.lines.append('')
+        quantifier = 'all' if all_candidates else 'any'
+        return '(%s(map(%s, %s)) if (%s := m[%d]).__class__ is _Fanout else %s)' % (
+            quantifier, item_test, var, var, self._path_id(path), test)
+
+    def add_rule(self, index: int, rule: Dict[str, Any],
+                 selectivity: Optional[SelectivityStats] = None) -> None:
+        detection = rule.get('detection') or {}
+        conditions = detection.get('conditions', []) or []
+        match_logic = detection.get('match_logic', 'ALL')
+
+        exprs = [self.condition_expr(c) for c in conditions]
+
+        # Standalone per-condition functions, used to sample selectivity
+        for position, expr in enumerate(exprs):
+            self.lines.append('def cond_%d_%d(a, m):' % (index, position))
+            self.lines.append('    return %s' % expr)
+            self.lines.append('')
+
+        order = [position for position, _ in plan_conditions(conditions, match_logic, selectivity)]
+        self.plans[index] = (exprs, order, match_logic)
+
+        ordered = [exprs[position] for position in order]
+        if match_logic == 'ANY':
+            body = ' or '.join(ordered) if ordered else 'False'
+        else:
+            body = ' and '.join(ordered) if ordered else 'True'
+
+        self.lines.append('def rule_%d(a, m):' % index)
+        self.lines.append('    # %s' % str(rule.get('rule_id')).replace('\n', ' '))
+        self.lines.append('    return %s' % body)
+        self.lines.append('')
+
+    def source(self, digest: str) -> str:
+        header = '# Generated by sis.compiler v%d for rule set %s\n' % (COMPILER_VERSION, digest)
+        return header + '\n'.join(self.lines) + '\n'
+
+
+def _code_key(source: str) -> str:
+    """Cache key for compiled bytecode: generated source and interpreter."""
+    material = '%s:%s' % (importlib.util.MAGIC_NUMBER.hex(), source)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def _load_code(source: str, digest: str, cache_dir: Any = None, use_cache: bool = True):
+    """
+    Return the code object for generated source, using the bytecode cache
+    ('compiled' under the cache root; see get_cache_dir for the arguments).
+    """
+    key = _code_key(source)
+    code = _CODE_CACHE.get(key)
+    if code is not None:
+        return code
+
+    directory = get_cache_dir('compiled', cache_dir=cache_dir, use_cache=use_cache)
+    cache_file = directory / ('%s.bin' % key) if directory else None
+
+    if cache_file is not None and cache_file.exists():
+        try:
+            code = marshal.loads(cache_file.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            code = None
+
+    if code is None:
+        code = compile(source, '<sis-rules-%s>' % digest[:12], 'exec')
+        if cache_file is not None:
+            atomic_write(cache_file, marshal.dumps(code))
+
+    _CODE_CACHE[key] = code
+    return code
+
+
+def _regex_groups(rules: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Collect the distinct valid REGEX patterns per path, keeping only paths
+    tested by enough patterns for a merged scan to pay off.
+    """
+    groups: Dict[str, List[str]] = {}
+    for rule in rules:
+        for condition in (rule.get('detection') or {}).get('conditions', []) or []:
+            if condition.get('operator') != 'REGEX':
+                continue
+            pattern = compile_pattern(condition.get('value'))
+            if pattern is None:
+                continue
+            patterns = groups.setdefault(str(condition.get('path')), [])
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return {path: patterns for path, patterns in groups.items() if len(patterns) >= MERGE_THRESHOLD}
+
+
+# Parser file types that share a rule namespace
+FILE_TYPE_ALIASES = {
+    'terraform_simple': 'terraform',
+    'terraform_json': 'terraform',
+    'terraform_plan': 'terraform',
+}
+
+
+def normalize_file_type(file_type: Optional[str]) -> Optional[str]:
+    """Map parser-specific file types onto the names used in applies_to."""
+    if file_type is None:
+        return None
+    return FILE_TYPE_ALIASES.get(file_type, file_type)
+
+
+class CompiledRule:
+    """A single compiled rule and its applicability filters."""
+
+    __slots__ = ('index', 'rule', 'check', 'conditions', 'exprs', 'order', 'match_logic',
+                 'kinds', 'file_types')
+
+    def __init__(self, index: int, rule: Dict[str, Any], check: Any,
+                 conditions: List[Tuple[str, Any]], plan: Tuple[List[str], List[int], str]):
+        self.index = index
+        self.rule = rule
+        self.check = check
+        # (condition key, predicate) pairs in rule order, for sampling
+        self.conditions = conditions
+        # Generated condition expressions, planned evaluation order, match_logic
+        self.exprs, self.order, self.match_logic = plan
+
+        applies_to = rule['applies_to'] if isinstance(rule['applies_to'], dict) else {}
+        resource_kinds = applies_to.get('resource_kinds', [])
+        if isinstance(resource_kinds, str):
+            resource_kinds = [resource_kinds]
+        # None means the rule applies to every kind
+        self.kinds = None if not resource_kinds or resource_kinds == ['*'] else frozenset(resource_kinds)
+
+        file_types = applies_to.get('file_types')
+        if isinstance(file_types, str):
+            file_types = [file_types]
+        self.file_types = frozenset(file_types) if file_types else None
+
+
+class CompiledRuleSet:
+    """
+    A rule set compiled to Python functions.
+
+    Rules are indexed by resource kind so each resource only visits rules
+    that can match it: kind-specific rules plus wildcard rules, further
+    filtered by applies_to.file_types when the file type is known.
+
+    Attributes:
+        digest: Canonical hash of the source rule set
+        source: Generated Python source
+        rules: Compiled rules in rule-set order
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], digest: Optional[str] = None,
+                 selectivity: Optional[SelectivityStats] = None, cache_dir: Any = None,
+                 use_cache: bool = True):
+        self.digest = digest or rule_set_hash(rules)
+        self.selectivity = selectivity
+        self._sample_countdown = SAMPLE_INTERVAL
+
+        evaluable = [rule for rule in rules if is_evaluable(rule)]
+        generator = _RuleSourceGenerator(_regex_groups(evaluable))
+        for index, rule in enumerate(evaluable):
+            generator.add_rule(index, rule, selectivity)
+
+        self.source = generator.source(self.digest)
+        namespace = dict(generator.constants)
+        exec(_load_code(self.source, self.digest, cache_dir, use_cache), namespace)
+        # Kept so derived evaluators can compile code against the same constants
+        self.namespace = namespace
+        # Per-resource PathMemo type, bound to the getters indexed by path id
+        self.accessors = [accessor.get for accessor in generator.accessors]
+        self._memo_class = memo_class(self.accessors)
+        self._value_cache = generator.value_cache
+
+        self.rules: List[CompiledRule] = []
+        for index, rule in enumerate(evaluable):
+            conditions = (rule.get('detection') or {}).get('conditions', []) or []
+            self.rules.append(CompiledRule(index, rule, namespace['rule_%d' % index], [
+                (condition_key(condition), namespace['cond_%d_%d' % (index, position)])
+                for position, condition in enumerate(conditions)
+            ], generator.plans[index]))
+
+        # Dispatch index: kind -> rules targeting it, plus wildcard rules
+        self._by_kind: Dict[str, List[CompiledRule]] = {}
+        self._wildcard: List[CompiledRule] = []
+        for compiled_rule in self.rules:
+            if compiled_rule.kinds is None:
+                self._wildcard.append(compiled_rule)
+            else:
+                for kind in compiled_rule.kinds:
+                    self._by_kind.setdefault(kind, []).append(compiled_rule)
+
+        self._dispatch: Dict[Tuple[Any, Optional[str]], List[CompiledRule]] = {}
+
+    def rules_for(self, kind: Any, file_type: Optional[str] = None) -> List[CompiledRule]:
+        """
+        Return the rules applicable to a resource kind, in rule-set order.
+
+        Args:
+            kind: Resource kind
+            file_type: Source file type; None disables file-type filtering
+
+        Returns:
+            List of compiled rules (shared, do not mutate)
+        """
+        key = (kind, file_type)
+        try:
+            return self._dispatch[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable kind can only match wildcard rules
+            key = None
+
+        candidates = self._wildcard
+        specific = self._by_kind.get(kind) if key is not None else None
+        if specific:
+            candidates = sorted(self._wildcard + specific, key=lambda r: r.index)
+
+        rule_file_type = normalize_file_type(file_type)
+        if rule_file_type is not None:
+            candidates = [
+                r for r in candidates
+                if r.file_types is None or rule_file_type in r.file_types
+            ]
+
+        if key is not None:
+            self._dispatch[key] = candidates
+        return candidates
+
+    def projection(self, file_type: Optional[str] = None) -> Projection:
+        """
+        The resource kinds and top-level attributes the rules can observe.
+
+        Parsers given this projection may leave everything else unparsed.
+        Wildcard rules keep every kind; a condition path starting with a
+        list segment keeps every attribute.
+
+        Args:
+            file_type: Source file type; None considers every rule
+
+        Returns:
+            Projection covering the rules applicable to the file type
+        """
+        rule_file_type = normalize_file_type(file_type)
+        kinds: Optional[set] = set()
+        attributes: Optional[set] = set()
+        for compiled_rule in self.rules:
+            if (rule_file_type is not None and compiled_rule.file_types is not None
+                    and rule_file_type not in compiled_rule.file_types):
+                continue
+            if compiled_rule.kinds is None:
+                kinds = None
+            elif kinds is not None:
+                kinds.update(compiled_rule.kinds)
+            conditions = (compiled_rule.rule.get('detection') or {}).get('conditions', []) or []
+            for condition in conditions:
+                name = top_level_key(condition.get('path'))
+                if name is None:
+                    attributes = None
+                elif attributes is not None:
+                    attributes.add(name)
+        return Projection(
+            None if kinds is None else frozenset(kinds),
+            None if attributes is None else frozenset(attributes))
+
+    def should_sample(self) -> bool:
+        """Whether the next resource should be sampled for selectivity."""
+        if self.selectivity is None:
+            return False
+        self._sample_countdown -= 1
+        if self._sample_countdown > 0:
+            return False
+        self._sample_countdown = SAMPLE_INTERVAL
+        return True
+
+    def value_cache_counters(self) -> Tuple[int, int]:
+        """Return (hits, misses) of the memoized REGEX/CONTAINS tests so far."""
+        info = self._value_cache.cache_info()
+        return info.hits, info.misses
+
+    def new_memo(self, attributes: Dict[str, Any]) -> PathMemo:
+        """Create the per-resource path lookup memo passed to predicates."""
+        memo = self._memo_class()
+        memo.attributes = attributes
+        return memo
+
+    def sample(self, applicable: List[CompiledRule], attributes: Dict[str, Any],
+               memo: PathMemo) -> None:
+        """Evaluate every condition of the given rules and record the outcomes."""
+        for compiled_rule in applicable:
+            for key, predicate in compiled_rule.conditions:
+                self.selectivity.record(key, bool(predicate(attributes, memo)))
+
+
+def default_selectivity(cache_dir: Any = None, persist: bool = False) -> SelectivityStats:
+    """
+    Selectivity statistics shared by the rule sets compiled in this process.
+
+    By default they are only kept in memory. With persist, they are loaded
+    once per process from the SIS cache directory (see
+    SelectivityStats.load_default), and the caller saves its observations
+    back with save() (the scanner does in Scanner.flush).
+
+    Args:
+        cache_dir: Cache root of persisted statistics, overriding SIS_CACHE_DIR
+        persist: Load (and allow saving) the statistics on disk
+    """
+    path = SelectivityStats.default_path(cache_dir) if persist else None
+    stats = _SELECTIVITY.get(path)
+    if stats is None:
+        stats = _SELECTIVITY[path] = SelectivityStats.load(path)
+    return stats
+
+
+def compile_rules(rules: List[Dict[str, Any]], cache_dir: Any = None, use_cache: bool = True,
+                  selectivity: Optional[SelectivityStats] = None) -> CompiledRuleSet:
+    """
+    Compile a rule set, reusing a previous compilation of identical rules.
+
+    Conditions are ordered by the planner (see sis.planner) using the
+    given selectivity statistics, by default the in-memory statistics of
+    this process.
+
+    Args:
+        rules: List of rule dictionaries, or a rule set already compiled
+            (returned as is)
+        cache_dir: Root of the on-disk bytecode cache, overriding
+            SIS_CACHE_DIR (see get_cache_dir)
+        use_cache: False compiles without the on-disk bytecode cache
+        selectivity: Statistics to plan with and record samples into (see
+            default_selectivity)
+
+    Returns:
+        The compiled rule set
+    """
+    if isinstance(rules, CompiledRuleSet):
+        return rules
+    if selectivity is None:
+        selectivity = default_selectivity()
+    digest = rule_set_hash(rules)
+    key = (digest, selectivity.path)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        compiled = CompiledRuleSet(rules, digest, selectivity, cache_dir, use_cache)
+        _COMPILED[key] = compiled
+    return compiled
@@ -1,138 +1,252 @@
 """
 Rule engine for SIS
 """
-import re
-import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from .compiler import compile_rules
+from .paths import compile_path
 
 def get_nested_value(obj: Dict[str, Any], path: str) -> Any:
     """
     Get a nested value from a dictionary using dot notation.
     
+    Paths may contain list segments ('ingress[*].from_port', 'rules[0]')
+    and traverse repeated blocks implicitly (see sis.paths).
+    
     Args:
         obj: Dictionary to search
         path: Dot-separated path (e.g., 'lifecycle.prevent_destroy')
     
     Returns:
-        The value at the path, or None if not found
+        The value at the path, or None if not found. Paths that cross a
+        list return a Fanout list of every value reached.
     """
-    parts = path.split('.')
-    current = obj
-    
-    for part in parts:
-        if isinstance(current, dict) and part in current:
-            current = current[part]
-        else:
-            return None
-    
-    return current
+    return compile_path(path).get(obj)
+
+def build_violation(rule: Dict[str, Any], resource: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Create the violation record for a rule matching a resource.
+    """
+    rule_id = rule.get('rule_id')
+    violation = {
+        'rule_id': rule_id,
+        'title': rule.get('title', rule_id),
+        'severity': rule.get('severity', 'MEDIUM'),
+        'message': rule.get('message', ''),
+        'resource_type': resource.get('kind', ''),
+        'resource_name': resource.get('name', ''),
+        'file_path': resource.get('file_path', ''),
+        'line': resource.get('line', 0),
+        'resource_line': resource.get('line', 0)
+    }
+    if 'address' in resource:
+        # Module instances (sis.workspace) and plan resources
+        violation['resource_address'] = resource['address']
+    if 'instances' in resource:
+        # Every instance the resource stands for (see sis.workspace.expand_violations)
+        violation['resource_instances'] = resource['instances']
+    return violation
 
-def validate_resources(resources: List[Dict[str, Any]], rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def resource_attributes(resource: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the attribute dictionary of a resource ({} if missing or malformed).
+    """
+    attributes = resource.get('attributes')
+    return attributes if isinstance(attributes, dict) else {}
+
+def validate_resources(resources: List[Dict[str, Any]], rules: List[Dict[str, Any]],
+                       file_type: Optional[str] = None, columnar: bool = False,
+                       stats: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
     """
     Validate resources against rules and return violations.
     
+    The rule set is compiled once (see sis.compiler) and reused for every
+    call with an identical rule set. Each resource is only checked against
+    the rules indexed for its kind (plus wildcard rules).
+    
     Args:
         resources: List of resources to validate
         rules: List of rules to check against
+        file_type: File type of the resources (e.g. 'terraform'); rules
+            whose applies_to.file_types exclude it are skipped. Falls back
+            to each resource's 'file_type' key; no filtering if neither is set.
+        columnar: Use the columnar batch evaluator (sis.batch), which is
+            faster for large inventories of a few resource kinds
+        stats: Optional dict of run counters, updated in place
+            (resources, rules_evaluated, violations, value_cache_hits,
+            value_cache_misses)
     
     Returns:
-        List of violations found
+        List of violations found, ordered by resource then rule
     """
-    violations = []
+    if columnar:
+        from .batch import validate_resources_batch
+        return validate_resources_batch(resources, rules, file_type)
     
-    for rule in rules:
-        rule_id = rule.get('rule_id')
-        
-        # Check which resources this rule applies to
-        if 'applies_to' not in rule:
-            continue
-            
-        resource_kinds = rule['applies_to'].get('resource_kinds', [])
-        
+    return list(iter_violations(resources, rules, file_type, stats))
+
+def iter_violations(resources: Iterable[Dict[str, Any]], rules: List[Dict[str, Any]],
+                    file_type: Optional[str] = None,
+                    stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Validate resources against rules, yielding violations as they are found.
+    
+    Resources are consumed lazily and nothing is accumulated, so memory
+    stays constant regardless of the number of resources or violations.
+    
+    Args:
+        resources: Iterable of resources to validate (may be a generator)
+        rules: List of rules to check against, or a rule set compiled by
+            sis.compiler.compile_rules
+        file_type: File type of the resources (see validate_resources)
+        stats: Optional dict of run counters (see validate_resources),
+            updated once the iterator is exhausted or closed
+    
+    Yields:
+        Violations, ordered by resource then rule
+    """
+    compiled = compile_rules(rules)
+    resource_count = 0
+    rules_evaluated = 0
+    violation_count = 0
+    cache_hits, cache_misses = compiled.value_cache_counters()
+    
+    try:
         for resource in resources:
-            # Check if rule applies to this resource kind
-            if resource_kinds and resource_kinds != ['*'] and resource.get('kind') not in resource_kinds:
-                continue
-            
-            # Check detection conditions
-            if 'detection' not in rule:
+            resource_count += 1
+            applicable = compiled.rules_for(resource.get('kind'), file_type or resource.get('file_type'))
+            if not applicable:
                 continue
-                
-            detection = rule['detection']
-            conditions = detection.get('conditions', [])
-            match_logic = detection.get('match_logic', 'ALL')
-            
-            condition_results = []
             
-            for condition in conditions:
-                path = condition.get('path')
-                operator = condition.get('operator')
-                value = condition.get('value')
-                
-                # Get attribute value using nested lookup
-                attr_value = get_nested_value(resource.get('attributes', {}), path)
-                
-                # Apply operator
-                if operator == 'REGEX':
-                    if attr_value is None:
-                        result = False
-                    else:
-                        result = bool(re.match(str(value), str(attr_value)))
-                
-                elif operator == 'EQUALS':
-                    # Handle boolean string "true" vs Python True
-                    if isinstance(attr_value, str) and attr_value.lower() == 'true':
-                        attr_value = True
-                    elif isinstance(attr_value, str) and attr_value.lower() == 'false':
-                        attr_value = False
-                    
-                    if isinstance(value, str) and value.lower() == 'true':
-                        value = True
-                    elif isinstance(value, str) and value.lower() == 'false':
-                        value = False
-                    
-                    result = str(attr_value) == str(value)
-                
-                elif operator == 'EXISTS':
-                    # Check if path exists (not None)
-                    result = attr_value is not None
-                
-                elif operator == 'CONTAINS':
-                    result = str(value) in str(attr_value) if attr_value else False
-                
-                elif operator == 'GREATER_THAN':
-                    try:
-                        result = float(attr_value) > float(value)
-                    except:
-                        result = False
-                
-                else:
-                    # Unknown operator
-                    result = False
-                
-                condition_results.append(result)
+            attributes = resource_attributes(resource)
+            memo = compiled.new_memo(attributes)
+            if compiled.should_sample():
+                compiled.sample(applicable, attributes, memo)
             
-            # Apply match logic
-            if match_logic == 'ALL':
-                rule_matches = all(condition_results)
-            elif match_logic == 'ANY':
-                rule_matches = any(condition_results)
+            rules_evaluated += len(applicable)
+            for compiled_rule in applicable:
+                if compiled_rule.check(attributes, memo):
+                    violation_count += 1
+                    yield build_violation(compiled_rule.rule, resource)
+    finally:
+        if stats is not None:
+            stats['resources'] = stats.get('resources', 0) + resource_count
+            stats['rules_evaluated'] = stats.get('rules_evaluated', 0) + rules_evaluated
+            stats['violations'] = stats.get('violations', 0) + violation_count
+            hits, misses = compiled.value_cache_counters()
+            stats['value_cache_hits'] = stats.get('value_cache_hits', 0) + hits - cache_hits
+            stats['value_cache_misses'] = stats.get('value_cache_misses', 0) + misses - cache_misses
+
+# Sentinel for network nodes not evaluated yet for the current resource
+_UNSET = object()
+
+class ConditionNetwork:
+    """
+    Shared-condition discrimination network (Rete-style alpha network).
+    
+    Every distinct (path, operator, value) test across the rule set is one
+    node. For each (resource kind, file type) the applicable rules are
+    compiled into a single function in which a shared node is evaluated at
+    most once per resource, on first use, and its result is fanned out to
+    every rule that tests it. Rules still short-circuit in planned order.
+    """
+    
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.compiled = compile_rules(rules)
+        # condition key -> (node id, generated expression)
+        self.nodes: Dict[str, Any] = {}
+        self._networks: Dict[Any, Any] = {}
+    
+    def _node(self, compiled_rule, position: int):
+        key = compiled_rule.conditions[position][0]
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = (len(self.nodes), compiled_rule.exprs[position])
+        return node
+    
+    def _build(self, applicable):
+        """Generate the network function for one list of applicable rules."""
+        usage: Dict[int, int] = {}
+        for compiled_rule in applicable:
+            for position in compiled_rule.order:
+                node_id = self._node(compiled_rule, position)[0]
+                usage[node_id] = usage.get(node_id, 0) + 1
+        shared = sorted(node_id for node_id, count in usage.items() if count > 1)
+        
+        lines = ['def network(a, m):']
+        if shared:
+            lines.append('    %s = _UNSET' % ' = '.join('_n%d' % node_id for node_id in shared))
+        lines.append('    matched = []')
+        for slot, compiled_rule in enumerate(applicable):
+            terms = []
+            for position in compiled_rule.order:
+                node_id, expr = self._node(compiled_rule, position)
+                if usage[node_id] > 1:
+                    expr = '(_n%d if _n%d is not _UNSET else (_n%d := %s))' % (node_id, node_id, node_id, expr)
+                terms.append(expr)
+            if compiled_rule.match_logic == 'ANY':
+                test = ' or '.join(terms) if terms else 'False'
             else:
-                rule_matches = all(condition_results)
-            
-            if rule_matches:
-                # Create violation
-                violation = {
-                    'rule_id': rule_id,
-                    'title': rule.get('title', rule_id),
-                    'severity': rule.get('severity', 'MEDIUM'),
-                    'message': rule.get('message', ''),
-                    'resource_type': resource.get('kind', ''),
-                    'resource_name': resource.get('name', ''),
-                    'file_path': resource.get('file_path', ''),
-                    'line': resource.get('line', 0),
-                    'resource_line': resource.get('line', 0)
-                }
-                violations.append(violation)
-    
-    return violations
+                test = ' and '.join(terms) if terms else 'True'
+            lines.append('    if %s:' % test)
+            lines.append('        matched.append(%d)' % slot)
+        lines.append('    return matched')
+        
+        namespace = dict(self.compiled.namespace)
+        namespace['_UNSET'] = _UNSET
+        exec(compile('\n'.join(lines) + '\n', '<sis-network-%s>' % self.compiled.digest[:12], 'exec'), namespace)
+        return namespace['network']
+    
+    def network_for(self, kind: Any, file_type: Optional[str] = None):
+        """
+        Return (applicable rules, network function) for a resource kind.
+        """
+        try:
+            hash(kind)
+        except TypeError:
+            # Unhashable kinds can only match wildcard rules
+            kind = None
+        key = (kind, file_type)
+        entry = self._networks.get(key)
+        if entry is None:
+            applicable = self.compiled.rules_for(kind, file_type)
+            entry = self._networks[key] = (applicable, self._build(applicable) if applicable else None)
+        return entry
+    
+    def evaluate(self, resources: List[Dict[str, Any]], file_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Validate resources through the network and return violations.
+        """
+        violations = []
+        for resource in resources:
+            applicable, network = self.network_for(resource.get('kind'), file_type or resource.get('file_type'))
+            if network is None:
+                continue
+            attributes = resource_attributes(resource)
+            for slot in network(attributes, self.compiled.new_memo(attributes)):
+                violations.append(build_violation(applicable[slot].rule, resource))
+        return violations
+
+_NETWORKS: Dict[str, ConditionNetwork] = {}
+
+def validate_resources_network(resources: List[Dict[str, Any]], rules: List[Dict[str, Any]],
+                               file_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Validate resources with the shared-condition network.
+    
+    Returns the same violations, in the same order, as validate_resources;
+    faster when many rules repeat the same tests.
+    
+    Args:
+        resources: List of resources to validate
+        rules: List of rules to check against
+        file_type: File type of the resources (see validate_resources)
+    
+    Returns:
+        List of violations found, ordered by resource then rule
+    """
+    compiled = compile_rules(rules)
+    network = _NETWORKS.get(compiled.digest)
+    if network is None:
+        network = _NETWORKS[compiled.digest] = ConditionNetwork(rules)
+    return network.evaluate(resources, file_type)
@@ -2,81 +2,129 @@
 Parser module for SIS - Static Irreversibility Scanner
 """
 
+import marshal
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from ..cache import DiskCache, cache_key, get_cache_dir
+from .registry import available_file_types, get_parser, register_parser, sniff_file_type
 
-def parse_content(content: str, file_type: str, **kwargs) -> List[Dict[str, Any]]:
+# Bump whenever the output of any parser changes; cached parses made by
+# other versions are then never looked up again (and age out of the cache)
+PARSER_VERSION = 4
+
+# Size bound of the on-disk parse cache
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_PARSE_CACHES: Dict[Path, DiskCache] = {}
+
+
+def get_parse_cache(cache_dir: Any = None, use_cache: bool = True) -> Optional[DiskCache]:
+    """
+    Return the on-disk parse cache ('parsed' under the SIS cache directory).
+    
+    Args:
+        cache_dir: Cache root, overriding SIS_CACHE_DIR (see get_cache_dir)
+        use_cache: False disables the cache
+    
+    Returns:
+        The cache, or None if on-disk caching is disabled
+    """
+    directory = get_cache_dir('parsed', cache_dir=cache_dir, use_cache=use_cache)
+    if directory is None:
+        return None
+    cache = _PARSE_CACHES.get(directory)
+    if cache is None:
+        cache = _PARSE_CACHES[directory] = DiskCache(directory, PARSE_CACHE_MAX_BYTES)
+    return cache
+
+
+def _canonical(value: Any) -> Any:
+    """Order-independent form of parser arguments, for cache keys."""
+    if isinstance(value, dict):
+        return sorted(((str(k), _canonical(v)) for k, v in value.items()), key=repr)
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(v) for v in value), key=repr)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def parse_content(content: str, file_type: str, cache_dir: Any = None, use_cache: bool = True,
+                  **kwargs) -> List[Dict[str, Any]]:
     """
     Parse content based on file type and return normalized resources.
     
+    Results are cached on disk (see get_parse_cache), keyed by the SHA-256
+    of the content, the file type, PARSER_VERSION and the parser arguments,
+    so unchanged content is loaded instead of parsed again.
+    
     Args:
-        content: The file content to parse
-        file_type: Type of file (terraform, kubernetes, docker_compose, etc.)
+        content: The file content to parse (str; the Terraform parsers also
+            accept UTF-8 bytes or an mmap)
+        file_type: Type of file (terraform, kubernetes, docker_compose, etc.;
+            see available_file_types())
+        cache_dir: Cache root, overriding SIS_CACHE_DIR (see get_cache_dir)
+        use_cache: False parses without the on-disk cache
         **kwargs: Additional arguments for parsers
     
     Returns:
         List of extracted resources with their configurations
     """
-    if file_type == 'terraform':
-        from .terraform import parse_terraform
-        return parse_terraform(content, **kwargs)
-    elif file_type == 'kubernetes':
-        from .kubernetes import parse_kubernetes
-        return parse_kubernetes(content, **kwargs)
-    elif file_type == 'docker_compose':
-        from .docker_compose import parse_docker_compose
-        return parse_docker_compose(content, **kwargs)
-    elif file_type == 'cloudformation':
-        from .cloudformation import parse_cloudformation
-        return parse_cloudformation(content, **kwargs)
-    elif file_type == 'arm':
-        from .arm import parse_arm
-        return parse_arm(content, **kwargs)
-    elif file_type == 'terraform_simple':
-        from .terraform_simple import parse_terraform_simple
-        return parse_terraform_simple(content, **kwargs)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
-
-
-# Try to import the parser functions for direct access
-# These will be available if the modules exist
-try:
-    from .terraform import parse_terraform
-except ImportError:
-    parse_terraform = None
-
-try:
-    from .kubernetes import parse_kubernetes
-except ImportError:
-    parse_kubernetes = None
-
-try:
-    from .docker_compose import parse_docker_compose
-except ImportError:
-    parse_docker_compose = None
-
-try:
-    from .cloudformation import parse_cloudformation
-except ImportError:
-    parse_cloudformation = None
-
-try:
-    from .arm import parse_arm
-except ImportError:
-    parse_arm = None
-
-try:
-    from .terraform_simple import parse_terraform_simple
-except ImportError:
-    parse_terraform_simple = None
+    cache = get_parse_cache(cache_dir, use_cache)
+    if cache is None:
+        return _parse(content, file_type, **kwargs)
+    
+    key = cache_key(content, file_type, PARSER_VERSION, marshal.version, repr(_canonical(kwargs)))
+    resources = cache.get(key)
+    if resources is None:
+        resources = _parse(content, file_type, **kwargs)
+        cache.put(key, resources)
+    return resources
+
+
+def _parse(content: str, file_type: str, **kwargs) -> List[Dict[str, Any]]:
+    """Dispatch to the parser for a file type."""
+    return get_parser(file_type)(content, **kwargs)
+
+
+# Parser functions, for direct access; each is imported (with its
+# dependencies) on first access, through the registry
+_LAZY_PARSERS = {
+    'parse_terraform': 'terraform',
+    'parse_kubernetes': 'kubernetes',
+    'parse_docker_compose': 'docker_compose',
+    'parse_cloudformation': 'cloudformation',
+    'parse_arm': 'arm',
+    'parse_terraform_simple': 'terraform_simple',
+    'parse_terraform_json': 'terraform_json',
+    'parse_terraform_plan': 'terraform_plan',
+}
+
+
+def __getattr__(name: str) -> Any:
+    file_type = _LAZY_PARSERS.get(name)
+    if file_type is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        return get_parser(file_type)
+    except ImportError:
+        return None
+
 
 __all__ = [
     'parse_content',
+    'get_parse_cache',
+    'get_parser',
+    'register_parser',
+    'available_file_types',
+    'sniff_file_type',
     'parse_terraform',
     'parse_kubernetes',
     'parse_docker_compose',
     'parse_cloudformation',
     'parse_arm',
-    'parse_terraform_simple'
+    'parse_terraform_simple',
+    'parse_terraform_json',
+    'parse_terraform_plan'
 ]
@@ -1,8 +1,130 @@
-def parse_arm(content, **kwargs):
+"""
+Azure Resource Manager template parser for SIS
+
+Every entry of a template's resources (an array, or the symbolic-name
+object of languageVersion 2.0 templates) becomes one resource:
+
+    {'kind': 'Microsoft.Sql/servers', 'name': <name>,
+     'attributes': <the resource object>, 'line': <line of its name>}
+
+so rule paths address the template directly ('properties.publicNetworkAccess',
+'sku.name'). Child resources nested in a parent's resources array are
+flattened into resources of their own, with the fully qualified type and
+name ARM derives for them ('Microsoft.Sql/servers/databases',
+'server/db'); the parent's attributes do not include them.
+"""
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .json_stream import DEFERRED, JSONStream
+
+# A type qualified by its resource provider namespace ('Microsoft.Sql/servers')
+_QUALIFIED_TYPE_RE = re.compile(r'^[A-Za-z0-9]+(?:\.[A-Za-z0-9]+)+/')
+
+# (definition without its resources, line of its name, children)
+_Entry = Tuple[Dict[str, Any], int, List[Any]]
+
+
+def _child_identity(parent_kind: str, parent_name: str, kind: str, name: str):
+    """Fully qualified type and name of a nested child resource."""
+    if _QUALIFIED_TYPE_RE.match(kind):
+        return kind, name
+    return '%s/%s' % (parent_kind, kind), '%s/%s' % (parent_name, name)
+
+
+def _read_entry(reader: JSONStream) -> _Entry:
+    """Decode the resource object at the reader's position; its children are read as entries."""
+    definition = {}
+    line = 0
+    children = None
+    for key, key_line, value in reader.iter_items(('resources',)):
+        if value is DEFERRED:
+            if reader.peek_type() is None:
+                definition[key] = reader.value()
+            else:
+                children = list(_read_entries(reader))
+            continue
+        if key == 'name':
+            # The line of this resource's own name, never of a nested one
+            line = key_line
+        definition[key] = value
+    return definition, line, children
+
+
+def _read_entries(reader: JSONStream) -> Iterator[_Entry]:
+    """Entries of the resources array (or symbolic-name object) at the reader's position."""
+    kind = reader.peek_type()
+    if kind is None:
+        reader.skip()
+        return
+    for _ in reader.iter_array() if kind is list else reader.iter_object():
+        if reader.peek_type() is dict:
+            yield _read_entry(reader)
+        else:
+            reader.skip()
+
+
+def _walk(entries: Iterator[_Entry], projection: Any,
+          parent: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Resources of a resources array and their children, in document order."""
+    for definition, line, children in entries:
+        kind = definition.get('type')
+        name = definition.get('name')
+        kind = kind if isinstance(kind, str) else ''
+        name = name if isinstance(name, str) else ''
+        if not name:
+            line = 0
+
+        if parent is not None:
+            kind, name = _child_identity(parent['kind'], parent['name'], kind, name)
+        if projection is not None and not projection.keeps_kind(kind):
+            attributes = {}
+        elif projection is not None and projection.attributes is not None:
+            attributes = {k: v for k, v in definition.items() if projection.keeps_attribute(k)}
+        else:
+            attributes = definition
+        resource = {'kind': kind, 'name': name, 'attributes': attributes, 'line': line}
+        yield resource
+        if children is not None:
+            yield from _walk(children, projection, resource)
+
+
+def iter_arm(content: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse an ARM template, yielding its resources (children flattened).
+
+    The template is read with sis.parsers.json_stream: sections other than
+    resources are skipped without being decoded, and each resource's line
+    is the position of its own name member as the reader passes it.
+
+    Args:
+        content: Template JSON (str, bytes, an mmap or an open file)
+        projection: Optional sis.paths.Projection; resources of types
+            outside it get empty attributes, and only projected top-level
+            keys are kept
+
+    Yields:
+        Normalized resources ({'kind', 'name', 'attributes', 'line'})
+    """
+    reader = JSONStream(content)
+    if reader.peek_type() is not dict:
+        return
+    for key in reader.iter_object():
+        if key == 'resources':
+            yield from _walk(_read_entries(reader), projection)
+        else:
+            reader.skip()
+
+
+def parse_arm(content, projection=None, **kwargs) -> List[Dict[str, Any]]:
     """
     Parse arm content and return normalized resources.
-    
-    For now, returns empty list as a placeholder.
+
+    Args:
+        content: ARM template JSON (str, bytes or an mmap)
+        projection: Optional projection, as for iter_arm
+
+    Returns:
+        List of resources, nested child resources flattened
     """
-    # TODO: Implement actual parsing
-    return []
+    return list(iter_arm(content, projection))
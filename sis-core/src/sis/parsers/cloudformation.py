@@ -1,8 +1,241 @@
-def parse_cloudformation(content, **kwargs):
+"""
+CloudFormation template parser for SIS
+
+Reads JSON and YAML templates. Every entry of the Resources map becomes
+one resource:
+
+    {'kind': 'AWS::S3::Bucket', 'name': <logical id>,
+     'attributes': <Properties>, 'line': <line of the logical id>}
+
+(in JSON templates, of the opening brace of its definition).
+
+The resource-level DeletionPolicy, UpdateReplacePolicy, Condition and
+DependsOn settings are added to the attributes (unless a property of the
+same name exists), since they decide what happens to the resource on stack
+deletion or replacement.
+
+Short-form intrinsic functions in YAML are constructed directly in their
+long form (!Ref X -> {'Ref': 'X'}, !GetAtt A.B -> {'Fn::GetAtt': ['A',
+'B']}, !Sub s -> {'Fn::Sub': s}), so rules see the same structure for JSON
+and YAML templates and no normalization pass copies the template.
+"""
+from typing import Any, Dict, Iterator, List
+
+from .json_source import as_text
+from .json_stream import JSONStream
+from .yaml_loader import YAML_AVAILABLE, EventBuilder, SafeLoader, require_yaml, yaml
+
+# Resource-level settings exposed as attributes
+RESOURCE_SETTINGS = ('DeletionPolicy', 'UpdateReplacePolicy', 'Condition', 'DependsOn')
+
+# Short-form tags whose long form is not 'Fn::' + tag
+_SHORT_FORMS = {'Ref': 'Ref', 'Condition': 'Condition'}
+
+if YAML_AVAILABLE:
+    class CloudFormationLoader(SafeLoader):
+        """SafeLoader constructing short-form intrinsic functions in their long form."""
+
+    def _construct_intrinsic(loader: Any, suffix: str, node: Any) -> Dict[str, Any]:
+        if isinstance(node, yaml.ScalarNode):
+            value = loader.construct_scalar(node)
+            if suffix == 'GetAtt':
+                # !GetAtt Resource.Attribute (the attribute name may contain dots)
+                value = value.split('.', 1)
+        elif isinstance(node, yaml.SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_mapping(node, deep=True)
+        return {_SHORT_FORMS.get(suffix, 'Fn::' + suffix): value}
+
+    CloudFormationLoader.add_multi_constructor('!', _construct_intrinsic)
+
+
+def _resource(kind: Any, name: Any, attributes: Any, line: int) -> Dict[str, Any]:
+    return {
+        'kind': kind if isinstance(kind, str) else '',
+        'name': str(name),
+        'attributes': attributes if isinstance(attributes, dict) else {},
+        'line': line,
+    }
+
+
+def _add_settings(attributes: Dict[str, Any], definition: Dict[str, Any], projection: Any) -> None:
+    """Copy the resource-level settings of a definition into its attributes."""
+    for setting in RESOURCE_SETTINGS:
+        if setting in definition and setting not in attributes and (
+                projection is None or projection.keeps_attribute(setting)):
+            attributes[setting] = definition[setting]
+
+
+def _definition(builder: Any, projection: Any):
+    """
+    Type and attributes of the resource definition at the builder's position.
+
+    Properties are only built for kept types (and, with a projection, only
+    projected properties); other members are skipped unless they are
+    resource-level settings. Returns None if the definition is not a
+    mapping.
+    """
+    event = builder.loader.peek_event()
+    if not isinstance(event, yaml.MappingStartEvent) or event.tag not in (None, '!', 'tag:yaml.org,2002:map'):
+        # Aliases and tagged definitions are built whole
+        definition = builder.value()
+        if not isinstance(definition, dict):
+            return None
+        kind = definition.get('Type')
+        return kind, _attributes(kind, definition.get('Properties'), definition, projection)
+
+    keeps = None if projection is None or projection.attributes is None else projection.keeps_attribute
+    kind = None
+    properties = None
+    settings = {}
+    for key, _ in builder.iter_mapping():
+        if key == 'Type':
+            kind = builder.value()
+        elif key == 'Properties' and (kind is None or projection is None or projection.keeps_kind(kind)):
+            properties = builder.value(keeps)
+        elif key in RESOURCE_SETTINGS:
+            settings[key] = builder.value()
+        else:
+            builder.skip()
+    return kind, _attributes(kind, properties, settings, projection)
+
+
+def _attributes(kind: Any, properties: Any, definition: Dict[str, Any], projection: Any) -> Dict[str, Any]:
+    """Attributes of a resource: its (projected) properties and settings."""
+    if projection is not None and not projection.keeps_kind(kind):
+        return {}
+    if not isinstance(properties, dict):
+        attributes = {}
+    elif projection is not None and projection.attributes is not None:
+        attributes = {k: v for k, v in properties.items() if projection.keeps_attribute(k)}
+    else:
+        # Copied: YAML anchors may share one properties mapping between resources
+        attributes = dict(properties)
+    _add_settings(attributes, definition, projection)
+    return attributes
+
+
+def _iter_yaml(content: Any, projection: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Resources of a YAML template.
+
+    Objects are built straight from the parse events (see
+    yaml_loader.EventBuilder), one entry of the Resources map at a time;
+    other sections are skipped without being built.
+    """
+    require_yaml()
+    loader = CloudFormationLoader(content)
+    try:
+        builder = EventBuilder(loader)
+        if not builder.start_document():
+            return
+        for section, _ in builder.iter_mapping():
+            if section != 'Resources':
+                builder.skip()
+                continue
+            for name, line in builder.iter_mapping():
+                resource = _definition(builder, projection)
+                if resource is not None:
+                    yield _resource(resource[0], name, resource[1], line)
+    finally:
+        loader.dispose()
+
+
+def _iter_json(reader: JSONStream, projection: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Resources of a JSON template, each definition decoded on its own as the
+    reader reaches it (other sections are skipped without being decoded).
+    """
+    for section in reader.iter_object():
+        if section != 'Resources' or reader.peek_type() is not dict:
+            reader.skip()
+            continue
+        for name, line, definition in reader.iter_items():
+            if not isinstance(definition, dict):
+                continue
+            kind = definition.get('Type')
+            yield _resource(kind, name, _attributes(kind, definition.get('Properties'), definition, projection),
+                            line)
+
+
+def _first_char(stream: Any) -> str:
+    """First non-blank character of a seekable file, which is then rewound."""
+    start = stream.tell()
+    try:
+        while True:
+            block = stream.read(4096)
+            if not block:
+                return ''
+            if isinstance(block, bytes):
+                block = block.decode('utf-8', 'ignore')
+            block = block.lstrip('\ufeff \t\r\n')
+            if block:
+                return block[0]
+    finally:
+        stream.seek(start)
+
+
+def iter_cloudformation(content: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a CloudFormation template, yielding one resource per entry of
+    its Resources map.
+
+    Templates are read incrementally, one resource definition at a time:
+    JSON with sis.parsers.json_stream, anything else (or JSON that fails
+    to decode before its first resource) as YAML events.
+
+    Args:
+        content: Template source (str, bytes, an mmap or a seekable file
+            opened for reading)
+        projection: Optional sis.paths.Projection; resources of types
+            outside it get empty attributes, and only projected properties
+            are kept (and, in YAML templates, built)
+
+    Yields:
+        Normalized resources ({'kind', 'name', 'attributes', 'line'})
+    """
+    if hasattr(content, 'read'):
+        start = content.tell()
+        is_json = _first_char(content) == '{'
+    else:
+        content = as_text(content)
+        is_json = content.lstrip()[:1] == '{'
+    if is_json:
+        resources = _iter_json(JSONStream(content), projection)
+        try:
+            first = next(resources, None)
+        except ValueError:
+            # Not JSON (e.g. a YAML flow mapping)
+            if hasattr(content, 'read'):
+                content.seek(start)
+        else:
+            if first is not None:
+                yield first
+                yield from resources
+            return
+    yield from _iter_yaml(content, projection)
+
+
+def iter_cloudformation_file(path: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a CloudFormation template file incrementally (see iter_cloudformation).
+
+    The file is read in blocks, never as a whole.
+    """
+    with open(path, 'rb') as f:
+        yield from iter_cloudformation(f, projection)
+
+
+def parse_cloudformation(content, projection=None, **kwargs) -> List[Dict[str, Any]]:
     """
     Parse cloudformation content and return normalized resources.
-    
-    For now, returns empty list as a placeholder.
+
+    Args:
+        content: JSON or YAML template (str, bytes or an mmap)
+        projection: Optional projection, as for iter_cloudformation
+
+    Returns:
+        List of resources, one per entry of the Resources map
     """
-    # TODO: Implement actual parsing
-    return []
+    return list(iter_cloudformation(content, projection))
@@ -1,8 +1,88 @@
-def parse_docker_compose(content, **kwargs):
+"""
+Docker Compose file parser for SIS
+
+Every entry of a compose file's services, volumes, networks, secrets and
+configs sections becomes one resource, of kind 'service', 'volume',
+'network', 'secret' or 'config':
+
+    {'kind': 'service', 'name': 'db', 'attributes': <the service mapping>,
+     'line': <line of the service name>}
+
+so rule paths address the definition directly ('privileged',
+'volumes[*]', 'deploy.resources.limits.memory'). Extension fields (x-*),
+anchors and merge keys inside entries are resolved as YAML loaders do;
+compose files are YAML, so JSON ones are read the same way.
+"""
+from typing import Any, Dict, Iterator, List
+
+from .yaml_loader import EventBuilder, SafeLoader, require_yaml
+
+# Top-level section -> resource kind
+SECTIONS = {
+    'services': 'service',
+    'volumes': 'volume',
+    'networks': 'network',
+    'secrets': 'secret',
+    'configs': 'config',
+}
+
+
+def iter_docker_compose(content: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a compose file, yielding one resource per section entry.
+
+    Objects are built straight from the YAML parse events one entry at a
+    time (see EventBuilder), so the file is never held as a node tree and
+    entries outside the projection are not built at all.
+
+    Args:
+        content: Compose YAML (str, bytes, an mmap or an open file)
+        projection: Optional sis.paths.Projection; entries of kinds
+            outside it get empty attributes, and only projected top-level
+            keys are built
+
+    Yields:
+        Normalized resources ({'kind', 'name', 'attributes', 'line'})
+    """
+    require_yaml()
+    loader = SafeLoader(content)
+    try:
+        builder = EventBuilder(loader)
+        if not builder.start_document():
+            return
+        keeps = None if projection is None or projection.attributes is None else projection.keeps_attribute
+        for section, _ in builder.iter_mapping():
+            kind = SECTIONS.get(section)
+            if kind is None:
+                builder.skip()
+                continue
+            kept = projection is None or projection.keeps_kind(kind)
+            for name, line in builder.iter_mapping():
+                if kept:
+                    # None for entries with default settings (volumes: {data: })
+                    attributes = builder.value(keeps)
+                else:
+                    builder.skip()
+                    attributes = None
+                yield {
+                    'kind': kind,
+                    'name': str(name),
+                    'attributes': attributes if isinstance(attributes, dict) else {},
+                    'line': line,
+                }
+    finally:
+        loader.dispose()
+
+
+def parse_docker_compose(content, projection=None, **kwargs) -> List[Dict[str, Any]]:
     """
     Parse docker_compose content and return normalized resources.
-    
-    For now, returns empty list as a placeholder.
+
+    Args:
+        content: Compose YAML (str, bytes or an mmap)
+        projection: Optional projection, as for iter_docker_compose
+
+    Returns:
+        List of resources, one per services/volumes/networks/secrets/configs entry
     """
-    # TODO: Implement actual parsing
-    return []
+    return list(iter_docker_compose(content, projection))
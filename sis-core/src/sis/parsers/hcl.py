@@ -0,0 +1,723 @@
+"""
+Single-pass HCL tokenizer and recursive-descent parser for SIS
+
+The original line parser (kept in benchmarks/bench_parser.py) finds each
+block by counting braces per line, re-joins its lines and splits them again
+for every nesting level, so it copies text once per level and is confused
+by braces inside strings, heredocs and multi-line expressions. Here the
+source is tokenized once, brackets are matched while tokenizing, and the
+parser walks the token list in one linear pass.
+
+Values follow the legacy conventions: literals and expressions are
+converted with parse_value() on their source text (so references and
+function calls stay strings), list and object constructors become lists
+and dicts, heredocs become strings. Nested blocks become dicts keyed by
+block type, one extra level per label (dynamic "ingress" {...} becomes
+{'dynamic': {'ingress': {...}}}), and repeated blocks become lists.
+
+The tokenizer also runs directly on UTF-8 bytes, e.g. a memory-mapped
+file (as the scanner passes large files); offsets are then byte offsets
+and only the text that ends up in the result is decoded. For very large inputs,
+iter_blocks_stream() first splits a stream of lines
+into top-level blocks and parses them one at a time, so memory is bounded
+by the largest block instead of the whole source.
+"""
+import re
+import textwrap
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .terraform_simple import parse_value
+
+# Token kinds; punctuation tokens use their own text as kind
+IDENT = 'ident'
+NUMBER = 'number'
+STRING = 'string'
+HEREDOC = 'heredoc'
+NEWLINE = 'nl'
+OTHER = 'other'
+# A parenthesised group (e.g. function call arguments), only ever kept as text
+GROUP = 'group'
+# A block header `type "label" ... {`; it opens the block body like '{'
+HEADER = 'header'
+# A whole `name = value` line whose value is a single token or a flat list
+# of JSON literals; carries the name and value text as token[3], token[4]
+ATTR = 'attr'
+
+Token = Tuple[Any, ...]
+
+# One token per match, with any preceding whitespace and comments folded in.
+# Traversals (var.a.b, aws_x.y.*) are single identifier tokens, and runs of
+# blank or comment-only lines collapse into one newline token (or into the
+# attr token they follow). The attr alternative only matches values whose
+# source text is exactly what the general path would hand to parse_value(),
+# so both paths produce the same value.
+_TOKEN_PATTERN = r'''
+    (?:[ \t\r\f]+|\#[^\n]*|//[^\n]*|/\*.*?\*/)*
+    (?:
+        (?P<nl>\n(?:[ \t\r\f]*(?:\#[^\n]*|//[^\n]*)?\n)*)
+      | (?P<attr>(?P<name>[A-Za-z_][A-Za-z0-9_-]*+)[ \t]*=(?![=>])[ \t]*(?P<value>
+            "[^"\\\n$%]*+(?:(?:\\.|[$%](?!\{))[^"\\\n$%]*+)*"
+          | -?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?
+          | [A-Za-z_][A-Za-z0-9_-]*+(?:\.(?:[A-Za-z_][A-Za-z0-9_-]*+|[0-9]+|\*))*
+          | \[[ \t]*(?:(?:"[^"\\\x00-\x1f$%]*"|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?)
+                (?:[ \t]*,[ \t]*(?:"[^"\\\x00-\x1f$%]*"|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?))*[ \t]*)?\]
+        )[ \t\r]*(?:(?:\#|//)[^\n]*)?(?:\n(?:[ \t\r\f]*(?:\#[^\n]*|//[^\n]*)?\n)*|(?=\}|\Z)))
+      | (?P<header>[A-Za-z_][A-Za-z0-9_-]*+(?:[ \t]*"[^"\\\n$%]*+(?:\\.[^"\\\n$%]*+)*"|[ \t]+[A-Za-z_][A-Za-z0-9_-]*+)*[ \t]*\{)
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_-]*+(?:\.(?:[A-Za-z_][A-Za-z0-9_-]*+|[0-9]+|\*))*)
+      | (?P<string>"[^"\\\n$%]*+(?:(?:\\.|[$%](?!\{))[^"\\\n$%]*+)*")
+      | (?P<template>")
+      | (?P<number>[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+      | (?P<heredoc><<-?(?P<marker>[A-Za-z_][A-Za-z0-9_-]*+)[ \t]*\r?\n)
+      | (?P<punct>==|!=|<=|>=|=>|[=,:{}\[\]()]|[!<>&|*/%+?.-]+)
+      | (?P<other>.)
+      | (?P<end>\Z)
+    )
+'''
+
+# Block type and labels within a (decoded) header token
+_HEADER_PART_RE = re.compile(r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"|[A-Za-z_][A-Za-z0-9_-]*')
+
+# Inside a quoted template: end quote, escapes, newline, interpolation start
+_TEMPLATE_STOP = r'(?P<quote>")|(?P<skip>\\.|\$\$\{|%%\{)|(?P<nl>\n)|(?P<interpolation>[$%]\{)'
+# Inside an interpolation: nested braces and strings
+_INTERPOLATION_STOP = r'(?P<open>\{)|(?P<close>\})|(?P<quote>")'
+# Inside a parenthesised group: nesting, strings, comments and heredocs
+_GROUP_STOP = r'(?P<open>\()|(?P<close>\))|(?P<quote>")|(?P<comment>/\*)|(?P<line>\#|//)|(?P<heredoc><<-?(?=[A-Za-z_]))'
+
+_HEREDOC_HEAD = r'<<(-?)([A-Za-z_][A-Za-z0-9_-]*)[ \t]*\r?\n'
+
+# Per-line scan for the streaming block splitter: strings, comments,
+# heredoc starts and brackets
+_SPLIT_RE = re.compile(r'"|\#|//|/\*|<<-?([A-Za-z_][A-Za-z0-9_-]*)[ \t]*\r?\n|[{\[(]|[}\])]')
+# Lines without any of these cannot change the splitter state
+_SPLIT_STATE_RE = re.compile(r'[{}\[\]()]|<<|/\*')
+
+# Opening token kind -> closing token kind
+_OPENERS = {'{': '}', '[': ']', HEADER: '}'}
+_CLOSERS = frozenset(_OPENERS.values())
+
+# Token kinds that end an expression at bracket depth 0, by context
+_LINE_STOPS = frozenset([NEWLINE, '}'])
+_LIST_STOPS = frozenset([','])
+_ITEM_STOPS = frozenset([',', NEWLINE])
+_KEY_STOPS = frozenset(['=', ':'])
+
+
+class _Syntax:
+    """
+    The tokenizer patterns compiled for one input type: str, or bytes for
+    bytes-like sources such as an mmap. All patterns are ASCII, so on
+    UTF-8 input they match the same constructs and report byte offsets.
+    """
+
+    def __init__(self, binary: bool):
+        self.binary = binary
+        self.newline = b'\n' if binary else '\n'
+        self.comment_end = b'*/' if binary else '*/'
+        self.token_re = self._compile(_TOKEN_PATTERN, re.VERBOSE | re.DOTALL)
+        self.template_stop_re = self._compile(_TEMPLATE_STOP, re.DOTALL)
+        self.interpolation_stop_re = self._compile(_INTERPOLATION_STOP)
+        self.group_stop_re = self._compile(_GROUP_STOP)
+        self.heredoc_head_re = self._compile(_HEREDOC_HEAD)
+        # Heredoc terminator patterns, by marker
+        self._heredoc_end_res: Dict[Any, Any] = {}
+
+    def _compile(self, pattern: str, flags: int = 0) -> Any:
+        return re.compile(pattern.encode('ascii') if self.binary else pattern, flags)
+
+    def heredoc_end_re(self, marker: Any) -> Any:
+        """Compiled pattern for the terminator line of a heredoc."""
+        end_re = self._heredoc_end_res.get(marker)
+        if end_re is None:
+            name = marker.decode('ascii') if self.binary else marker
+            end_re = self._heredoc_end_res[marker] = self._compile(
+                r'^[ \t]*%s[ \t]*\r?$' % re.escape(name), re.MULTILINE)
+        return end_re
+
+
+_STR_SYNTAX = _Syntax(binary=False)
+_BYTES_SYNTAX = _Syntax(binary=True)
+
+
+def _syntax(text: Any) -> _Syntax:
+    return _STR_SYNTAX if isinstance(text, str) else _BYTES_SYNTAX
+
+
+def _decode(source: bytes) -> str:
+    text = source.decode('utf-8')
+    # Match what reading the file in text mode would have produced
+    return text.replace('\r\n', '\n') if '\r' in text else text
+
+
+def _scan_template(text: Any, pos: int, syntax: _Syntax) -> int:
+    """End offset of the quoted template string whose opening quote is at pos."""
+    i = pos + 1
+    while True:
+        m = syntax.template_stop_re.search(text, i)
+        if m is None:
+            return len(text)
+        stop = m.lastgroup
+        if stop == 'quote':
+            return m.end()
+        if stop == 'nl':
+            # Unterminated string: stop at the end of the line
+            return m.start()
+        if stop == 'skip':
+            i = m.end()
+            continue
+        i = _scan_interpolation(text, m.end(), syntax)
+
+
+def _scan_interpolation(text: Any, pos: int, syntax: _Syntax) -> int:
+    """End offset of a ${...} / %{...} sequence whose body starts at pos."""
+    depth = 1
+    i = pos
+    while True:
+        m = syntax.interpolation_stop_re.search(text, i)
+        if m is None:
+            return len(text)
+        stop = m.lastgroup
+        if stop == 'quote':
+            i = _scan_template(text, m.start(), syntax)
+            continue
+        i = m.end()
+        if stop == 'open':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return i
+
+
+def _scan_group(text: Any, pos: int, syntax: _Syntax) -> int:
+    """End offset of a parenthesised group whose body starts at pos."""
+    depth = 1
+    i = pos
+    while True:
+        m = syntax.group_stop_re.search(text, i)
+        if m is None:
+            return len(text)
+        stop = m.lastgroup
+        i = m.end()
+        if stop == 'open':
+            depth += 1
+        elif stop == 'close':
+            depth -= 1
+            if depth == 0:
+                return i
+        elif stop == 'quote':
+            i = _scan_template(text, m.start(), syntax)
+        elif stop == 'comment':
+            close = text.find(syntax.comment_end, i)
+            i = len(text) if close < 0 else close + 2
+        elif stop == 'heredoc':
+            head = syntax.heredoc_head_re.match(text, m.start())
+            if head is not None:
+                i = _heredoc_end(text, head.group(2), head.end(), syntax)
+        else:
+            # Line comment
+            newline = text.find(syntax.newline, i)
+            i = len(text) if newline < 0 else newline
+
+
+def _heredoc_end(text: Any, marker: Any, pos: int, syntax: _Syntax) -> int:
+    """End offset of a heredoc whose body starts at pos."""
+    m = syntax.heredoc_end_re(marker).search(text, pos)
+    return m.end() if m is not None else len(text)
+
+
+def tokenize(text: Any) -> Tuple[List[Token], Dict[int, int]]:
+    """
+    Split HCL source into tokens in one pass.
+
+    Comments and horizontal whitespace are dropped; newlines are kept since
+    they terminate attributes. Quoted strings (including nested template
+    interpolations), heredocs and parenthesised groups are single tokens.
+
+    Args:
+        text: HCL source, as str or as UTF-8 bytes / a bytes-like object
+            (e.g. an mmap); nothing is decoded while tokenizing
+
+    Returns:
+        (tokens, closes): tokens as (kind, start offset, end offset, ...),
+        and the index of the matching closing token for every opener.
+        Offsets index into text (byte offsets for bytes input); attr
+        tokens carry name and value in the input's type.
+    """
+    syntax = _syntax(text)
+    binary = syntax.binary
+    tokens: List[Token] = []
+    closes: Dict[int, int] = {}
+    stack: List[int] = []
+    append = tokens.append
+    pos = 0
+
+    while True:
+        # Regular tokens come from one finditer run; strings with
+        # interpolations, heredocs and groups are scanned by hand, after
+        # which the run restarts
+        for m in syntax.token_re.finditer(text, pos):
+            kind = m.lastgroup
+            start, end = m.span(kind)
+            if kind == 'nl':
+                append((NEWLINE, start, end))
+            elif kind == 'attr':
+                append((ATTR, start, end, m.group('name'), m.group('value')))
+            elif kind == 'header':
+                stack.append(len(tokens))
+                append((HEADER, start, end))
+            elif kind == 'punct':
+                kind = m.group(kind)
+                if binary:
+                    kind = kind.decode('ascii')
+                if kind == '(':
+                    pos = _scan_group(text, end, syntax)
+                    append((GROUP, start, pos))
+                    break
+                if kind in _OPENERS:
+                    stack.append(len(tokens))
+                elif kind in _CLOSERS:
+                    # Stray closers are kept as tokens but match nothing
+                    if stack and _OPENERS[tokens[stack[-1]][0]] == kind:
+                        closes[stack.pop()] = len(tokens)
+                append((kind, start, end))
+            elif kind == 'template':
+                pos = _scan_template(text, start, syntax)
+                append((STRING, start, pos))
+                break
+            elif kind == 'heredoc' or kind == 'marker':
+                pos = _heredoc_end(text, m.group('marker'), end, syntax)
+                append((HEREDOC, start, pos))
+                break
+            elif kind == 'end':
+                return tokens, closes
+            else:
+                append((kind, start, end))
+        else:
+            return tokens, closes
+
+
+def heredoc_value(source: str) -> str:
+    """The string value of a heredoc token's source."""
+    head = _STR_SYNTAX.heredoc_head_re.match(source)
+    if head is None:
+        return source
+    body = source[head.end():]
+    # Drop the terminator line, keeping the newline that precedes it
+    body = body[:body.rfind('\n') + 1]
+    if head.group(1):
+        body = textwrap.dedent(body)
+    return body
+
+
+class Block(NamedTuple):
+    """
+    A top-level block: type, labels, parsed body, 1-based line and the
+    offset of its first character (a byte offset for bytes input).
+    """
+    type: str
+    labels: Tuple[str, ...]
+    body: Dict[str, Any]
+    line: int
+    offset: int
+
+
+def add_block(attributes: Dict[str, Any], name: str, labels: List[str], body: Dict[str, Any]) -> None:
+    """Store a nested block body under its type, nesting one dict per label."""
+    target, key = attributes, name
+    for label in labels:
+        child = target.get(key)
+        if not isinstance(child, dict):
+            child = target[key] = {}
+        target, key = child, label
+
+    if key in target:
+        # Convert to list if multiple blocks of same type
+        existing = target[key]
+        if isinstance(existing, list):
+            existing.append(body)
+        else:
+            target[key] = [existing, body]
+    else:
+        target[key] = body
+
+
+class _Parser:
+    """
+    Recursive-descent parser over the token list of one source text.
+
+    For bytes input only the text that ends up in the result (names,
+    labels and the source of values) is decoded.
+    """
+
+    def __init__(self, text: Any):
+        self.text = text
+        self.syntax = _syntax(text)
+        self.decode = _decode if self.syntax.binary else str
+        self.tokens, self.closes = tokenize(text)
+
+    def _source(self, i: int, j: int) -> str:
+        """Source text spanned by tokens [i, j)."""
+        return self.decode(self.text[self.tokens[i][1]:self.tokens[j - 1][2]])
+
+    def _newlines(self, start: int, end: int) -> int:
+        """Number of newlines in text[start:end]."""
+        text = self.text
+        if isinstance(text, (str, bytes)):
+            return text.count(self.syntax.newline, start, end)
+        # mmap and other buffers have no count()
+        return text[start:end].count(self.syntax.newline)
+
+    def _close(self, i: int, j: int) -> int:
+        """Index of the token closing opener i, bounded by j."""
+        close = self.closes.get(i, j)
+        return close if close < j else j
+
+    def _extent(self, i: int, j: int, stops: frozenset) -> int:
+        """Index of the first stop token at bracket depth 0 in [i, j), else j."""
+        tokens = self.tokens
+        while i < j:
+            kind = tokens[i][0]
+            if kind in stops:
+                return i
+            if kind in _OPENERS:
+                i = self._close(i, j) + 1
+            else:
+                i += 1
+        return j
+
+    def _trim(self, i: int, j: int) -> Tuple[int, int]:
+        """Strip newline tokens from both ends of [i, j)."""
+        tokens = self.tokens
+        while i < j and tokens[i][0] == NEWLINE:
+            i += 1
+        while j > i and tokens[j - 1][0] == NEWLINE:
+            j -= 1
+        return i, j
+
+    def header(self, i: int) -> Tuple[str, List[str]]:
+        """Block type and labels of a header token."""
+        parts = _HEADER_PART_RE.findall(self._source(i, i + 1))
+        labels = [
+            (part[1:-1] if '\\' not in part else str(parse_value(part))) if part[0] == '"' else part
+            for part in parts[1:]
+        ]
+        return parts[0], labels
+
+    def body(self, i: int, j: int, names: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        """
+        Parse the attributes and nested blocks in tokens [i, j).
+
+        If names is given, only attributes and blocks with those names are
+        parsed; the rest are skipped over without converting their values.
+        """
+        tokens = self.tokens
+        decode = self.decode
+        attributes: Dict[str, Any] = {}
+        raw_names = names
+        if names is not None and self.syntax.binary:
+            raw_names = frozenset(name.encode('utf-8') for name in names)
+
+        while i < j:
+            token = tokens[i]
+            kind = token[0]
+            if kind == NEWLINE:
+                i += 1
+            elif kind == ATTR:
+                if raw_names is None or token[3] in raw_names:
+                    attributes[decode(token[3])] = parse_value(decode(token[4]))
+                i += 1
+            elif kind == HEADER:
+                close = self._close(i, j)
+                name, labels = self.header(i)
+                if names is None or name in names:
+                    add_block(attributes, name, labels, self.body(i + 1, close))
+                i = close + 1
+            elif kind == IDENT and i + 1 < j and tokens[i + 1][0] == '=':
+                e = self._extent(i + 2, j, _LINE_STOPS)
+                if e > i + 2:
+                    name = self._source(i, i + 1)
+                    if names is None or name in names:
+                        attributes[name] = self.value(i + 2, e)
+                i = e
+            else:
+                # Neither an attribute nor a block: skip the rest of the line
+                i = max(self._extent(i, j, _LINE_STOPS), i + 1)
+
+        return attributes
+
+    def value(self, i: int, j: int) -> Any:
+        """Convert the expression in tokens [i, j) to a Python value."""
+        i, j = self._trim(i, j)
+        if i >= j:
+            return None
+        kind = self.tokens[i][0]
+
+        if kind == HEREDOC and j - i == 1:
+            return heredoc_value(self._source(i, j))
+
+        if (kind == '[' or kind == '{') and self.closes.get(i) == j - 1 and not self._is_for(i + 1, j - 1):
+            if kind == '[':
+                return self._list(i + 1, j - 1)
+            result = self._object(i + 1, j - 1)
+            if result is not None:
+                return result
+
+        return parse_value(self._source(i, j))
+
+    def _is_for(self, i: int, j: int) -> bool:
+        """Whether the collection body [i, j) is a for expression."""
+        i, j = self._trim(i, j)
+        return i < j and self.tokens[i][0] == IDENT and self._source(i, i + 1) == 'for'
+
+    def _list(self, i: int, j: int) -> List[Any]:
+        items = []
+        while i < j:
+            e = self._extent(i, j, _LIST_STOPS)
+            a, b = self._trim(i, e)
+            if a < b:
+                items.append(self.value(a, b))
+            i = e + 1
+        return items
+
+    def _object(self, i: int, j: int) -> Optional[Dict[str, Any]]:
+        """Parse an object constructor body; None if it is not key = value items."""
+        tokens = self.tokens
+        result: Dict[str, Any] = {}
+        while i < j:
+            token = tokens[i]
+            kind = token[0]
+            if kind == NEWLINE or kind == ',':
+                i += 1
+                continue
+            if kind == ATTR:
+                result[self.decode(token[3])] = parse_value(self.decode(token[4]))
+                i += 1
+                continue
+            e = self._extent(i, j, _ITEM_STOPS)
+            sep = self._extent(i, e, _KEY_STOPS)
+            if sep == i or sep >= e - 1:
+                return None
+            result[self._key(i, sep)] = self.value(sep + 1, e)
+            i = e
+        return result
+
+    def _key(self, i: int, j: int) -> str:
+        source = self._source(i, j)
+        if j - i == 1 and self.tokens[i][0] == IDENT:
+            return source
+        return str(parse_value(source))
+
+    def blocks(self, projection: Any = None, full: FrozenSet[str] = frozenset()) -> Iterator[Block]:
+        """
+        Yield the top-level blocks of the source.
+
+        With a projection (sis.paths.Projection), only resource blocks of
+        projected kinds are parsed, and only their projected attributes;
+        every other block is yielded with an empty body, except blocks of
+        the types in full, which are parsed whole.
+        """
+        tokens = self.tokens
+        j = len(tokens)
+        i = 0
+        line = 1
+        counted = 0
+
+        while i < j:
+            kind = tokens[i][0]
+            if kind == HEADER:
+                start = tokens[i][1]
+                line += self._newlines(counted, start)
+                counted = start
+                close = self._close(i, j)
+                name, labels = self.header(i)
+                if projection is None or name in full:
+                    body = self.body(i + 1, close)
+                elif name == 'resource' and len(labels) == 2 and projection.keeps_kind(labels[0]):
+                    body = self.body(i + 1, close, projection.attributes)
+                else:
+                    body = {}
+                yield Block(name, tuple(labels), body, line, start)
+                i = close + 1
+            elif kind == NEWLINE or kind == ATTR:
+                # Top-level attributes (e.g. in .tfvars) are not blocks
+                i += 1
+            else:
+                i = max(self._extent(i, j, _LINE_STOPS), i + 1)
+
+
+def iter_blocks(text: Any, projection: Any = None, full: FrozenSet[str] = frozenset()) -> Iterator[Block]:
+    """
+    Parse HCL source and yield its top-level blocks.
+
+    Args:
+        text: HCL source, as str or as UTF-8 bytes / a bytes-like object
+            such as an mmap
+        projection: Optional sis.paths.Projection; blocks and attributes
+            outside it are skipped without being converted
+        full: Block types parsed whole even under a projection (e.g.
+            'variable' and 'locals' for sis.workspace)
+
+    Yields:
+        Block tuples in source order
+    """
+    return _Parser(text).blocks(projection, full)
+
+
+def parse_body(text: Any) -> Dict[str, Any]:
+    """
+    Parse HCL source as a single body of attributes and blocks, e.g. a
+    .tfvars file.
+    """
+    parser = _Parser(text)
+    return parser.body(0, len(parser.tokens))
+
+
+def _resources(blocks: Iterable[Block]) -> Iterator[Dict[str, Any]]:
+    """Resource dicts for the `resource "kind" "name"` blocks among blocks."""
+    for block in blocks:
+        if block.type == 'resource' and len(block.labels) == 2:
+            yield {
+                'kind': block.labels[0],
+                'name': block.labels[1],
+                'attributes': block.body,
+                'line': block.line
+            }
+
+
+def iter_resources(text: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the resources declared in Terraform source.
+
+    Args:
+        text: Terraform HCL2 content (str, UTF-8 bytes or a bytes-like object)
+        projection: Optional sis.paths.Projection; resources of other kinds
+            get empty attributes, and only projected attributes are parsed
+
+    Yields:
+        Resource dicts with kind, name, attributes and line
+    """
+    return _resources(iter_blocks(text, projection))
+
+
+def _line_state(line: str, depth: int) -> Tuple[int, bool, Optional[str], bool]:
+    """
+    Bracket depth after one source line, and what the line leaves open.
+
+    Returns:
+        (depth, whether a bracket was opened, heredoc marker or None,
+        inside a /* comment)
+    """
+    opened = False
+    i = 0
+    while True:
+        m = _SPLIT_RE.search(line, i)
+        if m is None:
+            return depth, opened, None, False
+        stop = m.group()
+        i = m.end()
+        if stop == '"':
+            i = _scan_template(line, m.start(), _STR_SYNTAX)
+        elif stop in ('{', '[', '('):
+            depth += 1
+            opened = True
+        elif stop in ('}', ']', ')'):
+            depth -= 1
+        elif stop == '/*':
+            close = line.find('*/', i)
+            if close < 0:
+                return depth, opened, None, True
+            i = close + 2
+        elif stop[0] == '<':
+            return depth, opened, m.group(1), False
+        else:
+            # Line comment
+            return depth, opened, None, False
+
+
+def iter_block_sources(lines: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """
+    Split HCL source lines into top-level block sources.
+
+    Lines are consumed lazily, so at most one top-level block (plus any
+    attributes and comments preceding it) is held in memory. Heredocs,
+    block comments and brackets inside strings are taken into account.
+
+    Args:
+        lines: Source lines including their line endings (e.g. a text file)
+
+    Yields:
+        (source, line) pairs: the text of one or more complete top-level
+        constructs and the 1-based line number of its first line
+    """
+    chunk: List[str] = []
+    first = 1
+    number = 0
+    depth = 0
+    opened = False
+    heredoc: Optional[Any] = None
+    comment = False
+
+    for line in lines:
+        number += 1
+        chunk.append(line)
+        if heredoc is not None:
+            if heredoc.match(line):
+                heredoc = None
+            continue
+        if comment:
+            close = line.find('*/')
+            if close < 0:
+                continue
+            comment = False
+            line = line[close + 2:]
+        if _SPLIT_STATE_RE.search(line) is None:
+            continue
+
+        depth, line_opened, marker, comment = _line_state(line, depth)
+        opened = opened or line_opened
+        if marker is not None:
+            heredoc = _STR_SYNTAX.heredoc_end_re(marker)
+        elif depth <= 0 and opened and not comment:
+            # A top-level block just closed
+            yield ''.join(chunk), first
+            chunk = []
+            first = number + 1
+            depth = 0
+            opened = False
+
+    if chunk:
+        yield ''.join(chunk), first
+
+
+def iter_blocks_stream(lines: Iterable[str], projection: Any = None) -> Iterator[Block]:
+    """
+    Streaming iter_blocks(): parse top-level blocks one at a time.
+
+    Args:
+        lines: Source lines including their line endings (e.g. a text file)
+        projection: Optional sis.paths.Projection (see iter_blocks)
+
+    Yields:
+        Block tuples in source order, with lines relative to the whole input
+    """
+    offset = 0
+    for source, first in iter_block_sources(lines):
+        for block in iter_blocks(source, projection):
+            yield block._replace(line=block.line + first - 1, offset=block.offset + offset)
+        offset += len(source)
+
+
+def iter_resources_stream(lines: Iterable[str], projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming iter_resources(): parse one top-level block at a time.
+
+    Args:
+        lines: Terraform source lines including their line endings
+        projection: Optional sis.paths.Projection (see iter_resources)
+
+    Yields:
+        Resource dicts with kind, name, attributes and line
+    """
+    return _resources(iter_blocks_stream(lines, projection))
+
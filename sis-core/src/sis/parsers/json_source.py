@@ -0,0 +1,11 @@
+"""
+Source text helpers for the JSON and YAML template parsers
+"""
+from typing import Any
+
+
+def as_text(content: Any) -> str:
+    """JSON/YAML source as str (bytes and mmaps are decoded as UTF-8)."""
+    if isinstance(content, str):
+        return content
+    return bytes(content).decode('utf-8-sig')
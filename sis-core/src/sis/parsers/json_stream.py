@@ -0,0 +1,311 @@
+"""
+Incremental JSON reader for SIS
+
+Reads a JSON document from a file object in fixed-size chunks and lets the
+caller walk its structure: iter_object() and iter_array() step through
+containers member by member, value() decodes the value at the current
+position (with the json module's C decoder) and skip() steps over it
+without building anything. iter_items() combines iter_object() and
+value() for objects of many small members, optionally leaving some
+members to the caller. Only the unread part of the current chunk and
+the value being decoded are held in memory, whatever the document size.
+"""
+import codecs
+import json
+import re
+from typing import Any, Iterator, Optional, Tuple
+
+# Characters read from the stream at a time
+CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*+')
+
+# An object key without escapes, and the colon after it
+_KEY_RE = re.compile(r'[ \t\n\r]*+"([^"\\\x00-\x1f]*+)"[ \t\n\r]*+:[ \t\n\r]*+')
+
+# The delimiter after an object member
+_MEMBER_END_RE = re.compile(r'[ \t\n\r]*+([,}])')
+
+# Characters that may continue a number ('-1' in '-1.5e3')
+_NUMBER_TAIL_RE = re.compile(r'[0-9.eE+\-]*+')
+
+# Containers nested up to this many levels deep are skipped by one regex match
+SKIP_DEPTH = 4
+
+
+def _skip_pattern(depth: int) -> str:
+    """Text without unbalanced brackets, with containers nested up to depth levels."""
+    # Characters other than quotes and brackets, and complete strings
+    pattern = r'(?:[^"{}\[\]]++|"(?:[^"\\]++|\\.)*+"'
+    if depth:
+        inner = _skip_pattern(depth - 1)
+        pattern += r'|\{%s\}|\[%s\]' % (inner, inner)
+    return pattern + ')*+'
+
+
+_SKIP_RE = re.compile(_skip_pattern(SKIP_DEPTH), re.DOTALL)
+
+# One complete container nested up to SKIP_DEPTH + 1 levels deep
+_CONTAINER_RE = re.compile(r'\{%s\}|\[%s\]' % (_skip_pattern(SKIP_DEPTH), _skip_pattern(SKIP_DEPTH)), re.DOTALL)
+
+_DECODER = json.JSONDecoder()
+
+# Value yielded by iter_items() for members left to the caller
+DEFERRED = object()
+
+
+class JSONStream:
+    """
+    A JSON document read incrementally.
+
+    Args:
+        source: A file object (text or binary, read in chunks), str, bytes
+            or an mmap
+        chunk_size: Characters (or bytes) read at a time
+    """
+
+    def __init__(self, source: Any, chunk_size: int = CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._read = None
+        self._decoder = None
+        if isinstance(source, str):
+            self.buffer = source
+        elif isinstance(source, (bytes, bytearray)):
+            self.buffer = codecs.decode(source, 'utf-8-sig')
+        else:
+            self.buffer = ''
+            self._read = source.read
+            self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.pos = 0
+        # Newlines before self.buffer[0], and in self.buffer[:self._counted]
+        self._lines_before = 0
+        self._counted = 0
+        self._counted_lines = 0
+        self.eof = self._read is None
+
+    # Buffer management
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at end of input."""
+        if self.eof:
+            return False
+        while True:
+            raw = self._read(self.chunk_size)
+            data = raw
+            if self._decoder is not None and not isinstance(raw, str):
+                # Empty while a multi-byte character is incomplete
+                data = self._decoder.decode(raw, final=not raw)
+            if data or not raw:
+                break
+        if not data:
+            self.eof = True
+            return False
+        if self.pos:
+            self._lines_before += self._counted_lines + self.buffer.count('\n', self._counted, self.pos)
+            self._counted = self._counted_lines = 0
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += data
+        return True
+
+    def _peek(self) -> str:
+        """The next non-whitespace character ('' at end of input)."""
+        buffer, pos = self.buffer, self.pos
+        if pos < len(buffer) and buffer[pos] not in ' \t\n\r':
+            return buffer[pos]
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            self._error('Expecting %r' % char)
+        self.pos += 1
+
+    def _error(self, message: str) -> None:
+        raise json.JSONDecodeError(message, self.buffer, self.pos)
+
+    @property
+    def line(self) -> int:
+        """1-based line on which the next token starts."""
+        self._peek()
+        if self.pos > self._counted:
+            self._counted_lines += self.buffer.count('\n', self._counted, self.pos)
+            self._counted = self.pos
+        return self._lines_before + self._counted_lines + 1
+
+    # Structure
+
+    def _key(self) -> str:
+        """Read an object key and its colon (the general case of _KEY_RE)."""
+        key = self.value()
+        if not isinstance(key, str):
+            self._error('Expecting property name enclosed in double quotes')
+        self._expect(':')
+        return key
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Iterate over the object at the current position.
+
+        Yields each member's key; the caller consumes the member's value
+        (value(), skip(), iter_object() or iter_array()) before the next.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            match = _KEY_RE.match(self.buffer, self.pos)
+            if match is not None:
+                key = match.group(1)
+                self.pos = match.end()
+            else:
+                key = self._key()
+            yield key
+            match = _MEMBER_END_RE.match(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                if match.group(1) == '}':
+                    return
+                continue
+            char = self._peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                self.pos -= 1
+                self._error("Expecting ',' delimiter")
+
+    def iter_items(self, defer: Any = ()) -> Iterator[Tuple[str, int, Any]]:
+        """
+        Iterate over the object at the current position, decoding each value.
+
+        Args:
+            defer: Keys whose values are not decoded: they are yielded as
+                DEFERRED, and the caller consumes them (as for iter_object)
+                before the next member
+
+        Yields:
+            (key, line, value) for each member, line being the one on which
+            the value starts
+        """
+        if not self.eof:
+            for key in self.iter_object():
+                yield key, self.line, DEFERRED if key in defer else self.value()
+            return
+        # The rest of the document is in the buffer, so nothing is refilled
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            return
+        buffer = self.buffer
+        scan = _DECODER.scan_once
+        while True:
+            match = _KEY_RE.match(buffer, self.pos)
+            if match is None:
+                key = self._key()
+                self._peek()
+            else:
+                key = match.group(1)
+                self.pos = match.end()
+            # As self.line, without the whitespace check
+            self._counted_lines += buffer.count('\n', self._counted, self.pos)
+            self._counted = self.pos
+            line = self._lines_before + self._counted_lines + 1
+            if key in defer:
+                # Consumed by the caller (nothing is refilled at eof)
+                yield key, line, DEFERRED
+            else:
+                try:
+                    value, self.pos = scan(buffer, self.pos)
+                except StopIteration:
+                    self._error('Expecting value')
+                yield key, line, value
+            match = _MEMBER_END_RE.match(buffer, self.pos)
+            if match is None:
+                self._error("Expecting ',' delimiter")
+            self.pos = match.end()
+            if match.group(1) == '}':
+                return
+
+    def iter_array(self) -> Iterator[int]:
+        """Iterate over the array at the current position, yielding element indexes."""
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self._peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                self.pos -= 1
+                self._error("Expecting ',' delimiter")
+
+    def peek_type(self) -> Optional[type]:
+        """dict, list or None (any other value) for the value at the current position."""
+        char = self._peek()
+        return dict if char == '{' else list if char == '[' else None
+
+    # Values
+
+    def value(self) -> Any:
+        """Decode the value at the current position."""
+        if not self._peek():
+            self._error('Expecting value')
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            if (isinstance(value, (int, float)) and _NUMBER_TAIL_RE.match(self.buffer, end).end() == len(self.buffer)
+                    and self._fill()):
+                # The number may continue in the next chunk
+                continue
+            self.pos = end
+            return value
+
+    def skip(self) -> None:
+        """Step over the value at the current position without decoding it."""
+        char = self._peek()
+        if char not in ('{', '['):
+            self.value()
+            return
+        match = _CONTAINER_RE.match(self.buffer, self.pos)
+        if match is not None:
+            self.pos = match.end()
+            return
+        # Deeper nesting, or a container continuing in the next chunk
+        self.pos += 1
+        depth = 1
+        while True:
+            end = _SKIP_RE.match(self.buffer, self.pos).end()
+            if end == len(self.buffer):
+                self.pos = end
+                if not self._fill():
+                    self._error('Unterminated value')
+                continue
+            char = self.buffer[end]
+            if char == '"':
+                # A string continuing in the next chunk
+                self.pos = end
+                if not self._fill():
+                    self._error('Unterminated string')
+                continue
+            self.pos = end + 1
+            if char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
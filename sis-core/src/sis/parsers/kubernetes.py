@@ -1,8 +1,97 @@
-def parse_kubernetes(content, **kwargs):
+"""
+Kubernetes manifest parser for SIS
+
+Reads multi-document YAML (kubectl manifests, rendered Helm charts) one
+document at a time, with PyYAML's libyaml-backed safe loader when it is
+available (see sis.parsers.yaml_loader). Every document with a kind
+becomes one resource:
+
+    {'kind': 'ServiceAccount', 'name': <metadata.name>,
+     'attributes': <the whole document>, 'line': <first line>}
+
+so rule paths address the manifest directly ('metadata.namespace',
+'spec.template.spec.hostNetwork'). The items of List documents (kubectl get
+-o yaml) are resources of their own.
+"""
+from typing import Any, Dict, Iterator, List
+
+from .yaml_loader import SafeLoader, construct_mapping, node_get, node_line, node_scalar, require_yaml, yaml
+
+
+def _resources(loader: Any, node: Any, projection: Any) -> Iterator[Dict[str, Any]]:
+    """Resources of one document (or List item) node."""
+    kind = node_scalar(node_get(node, 'kind'))
+    if not kind:
+        return
+
+    if kind.endswith('List'):
+        items = node_get(node, 'items')
+        if isinstance(items, yaml.SequenceNode):
+            for item in items.value:
+                yield from _resources(loader, item, projection)
+            return
+
+    if projection is None:
+        attributes = construct_mapping(loader, node)
+    elif projection.keeps_kind(kind):
+        attributes = construct_mapping(loader, node, None if projection.attributes is None
+                                       else projection.keeps_attribute)
+    else:
+        attributes = {}
+    yield {
+        'kind': kind,
+        'name': node_scalar(node_get(node_get(node, 'metadata'), 'name')) or '',
+        'attributes': attributes,
+        'line': node_line(node),
+    }
+
+
+def iter_kubernetes(stream: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse Kubernetes manifests incrementally, one YAML document at a time.
+
+    Only the document being converted is held in memory, so rendered
+    output of thousands of documents can be scanned from an open file.
+
+    Args:
+        stream: YAML source: str, bytes or a file object opened for reading
+        projection: Optional sis.paths.Projection; documents of kinds
+            outside it get empty attributes, and only projected top-level
+            keys are constructed
+
+    Yields:
+        Normalized resources ({'kind', 'name', 'attributes', 'line'})
+    """
+    require_yaml()
+    loader = SafeLoader(stream)
+    try:
+        while loader.check_node():
+            node = loader.get_node()
+            if isinstance(node, yaml.MappingNode):
+                yield from _resources(loader, node, projection)
+    finally:
+        loader.dispose()
+
+
+def iter_kubernetes_file(path: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a Kubernetes manifest file incrementally (see iter_kubernetes).
+
+    The file is read in blocks by the YAML reader, never as a whole.
+    """
+    with open(path, 'rb') as f:
+        yield from iter_kubernetes(f, projection)
+
+
+def parse_kubernetes(content, projection=None, **kwargs) -> List[Dict[str, Any]]:
     """
     Parse kubernetes content and return normalized resources.
-    
-    For now, returns empty list as a placeholder.
+
+    Args:
+        content: Multi-document YAML (str, bytes or an mmap)
+        projection: Optional projection, as for iter_kubernetes
+
+    Returns:
+        List of resources, one per document with a kind
     """
-    # TODO: Implement actual parsing
-    return []
+    return list(iter_kubernetes(content, projection))
@@ -0,0 +1,190 @@
+"""
+Parser registry for SIS
+
+Parsers are registered by file type as 'module:function' specs and only
+imported when first used, so scanning Terraform never imports PyYAML or
+the other formats' modules. Besides the built-in parsers, installed
+packages can provide parsers through the 'sis.parsers' entry point group
+(name: file type, value: 'package.module:function'); entry points are
+only looked up for file types that are not built in. Large files of the
+types with an incremental parser (BUILTIN_STREAM_PARSERS) can be scanned
+without being read whole.
+
+sniff_file_type() picks the file type of a path from its name and, for
+generic extensions (.json, .yaml, ...), from the first few KiB of its
+content.
+"""
+import importlib
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Entry point group of third-party parsers
+ENTRY_POINT_GROUP = 'sis.parsers'
+
+# file type -> 'module:function' (modules relative to sis.parsers)
+BUILTIN_PARSERS = {
+    'terraform': '.terraform:parse_terraform',
+    'terraform_simple': '.terraform_simple:parse_terraform_simple',
+    'terraform_json': '.terraform_json:parse_terraform_json',
+    'terraform_plan': '.terraform_plan:parse_terraform_plan',
+    'kubernetes': '.kubernetes:parse_kubernetes',
+    'docker_compose': '.docker_compose:parse_docker_compose',
+    'cloudformation': '.cloudformation:parse_cloudformation',
+    'arm': '.arm:parse_arm',
+}
+
+# file type -> incremental parser, called as parser(path, projection) and
+# yielding resources one at a time while reading the file in blocks
+BUILTIN_STREAM_PARSERS = {
+    'terraform_simple': '.terraform_simple:iter_terraform_file',
+    'terraform_json': '.terraform_json:iter_terraform_json_file',
+    'terraform_plan': '.terraform_plan:iter_terraform_plan_file',
+    'kubernetes': '.kubernetes:iter_kubernetes_file',
+    'cloudformation': '.cloudformation:iter_cloudformation_file',
+}
+
+# Bytes of content read to sniff a file's type
+SNIFF_BYTES = 64 * 1024
+
+# Extensions whose content decides the file type
+JSON_EXTENSIONS = frozenset(['.json'])
+YAML_EXTENSIONS = frozenset(['.yaml', '.yml', '.template'])
+
+_COMPOSE_NAME_RE = re.compile(r'(?:docker-)?compose(?:\.[\w.-]+)?\.ya?ml$')
+
+# Content markers, tried in order
+_JSON_MARKERS = [
+    ('terraform_plan', re.compile(r'"(?:planned_values|terraform_version)"\s*:')),
+    ('arm', re.compile(r'"\$schema"\s*:\s*"[^"]*deploymentTemplate\.json')),
+    ('cloudformation', re.compile(r'"AWSTemplateFormatVersion"\s*:|"Type"\s*:\s*"AWS::')),
+    ('kubernetes', re.compile(r'"apiVersion"\s*:(?=.*"kind"\s*:)|"kind"\s*:(?=.*"apiVersion"\s*:)', re.S)),
+    ('terraform_json', re.compile(r'\A\s*\{\s*"(?:resource|module|variable|locals|provider|terraform|data)"\s*:')),
+]
+_YAML_MARKERS = [
+    ('cloudformation', re.compile(r'^AWSTemplateFormatVersion\s*:|^\s+Type\s*:\s*["\']?AWS::', re.M)),
+    ('kubernetes', re.compile(r'^apiVersion\s*:(?=.*^kind\s*:)|^kind\s*:(?=.*^apiVersion\s*:)', re.M | re.S)),
+    ('docker_compose', re.compile(r'^services\s*:', re.M)),
+]
+
+_SPECS: Dict[str, Union[str, Callable]] = dict(BUILTIN_PARSERS)
+_LOADED: Dict[str, Callable] = {}
+_ENTRY_POINTS_LOADED = False
+
+
+def register_parser(file_type: str, parser: Union[str, Callable]) -> None:
+    """
+    Register a parser for a file type, replacing any existing one.
+
+    Args:
+        file_type: File type name, as passed to parse_content()
+        parser: The parse function, or a 'package.module:function' spec
+            imported on first use; it is called as parser(content, **kwargs)
+            and returns a list of normalized resources
+    """
+    _SPECS[file_type] = parser
+    _LOADED.pop(file_type, None)
+
+
+def _load_entry_points() -> None:
+    """Add parsers from the 'sis.parsers' entry point group (once)."""
+    global _ENTRY_POINTS_LOADED
+    if _ENTRY_POINTS_LOADED:
+        return
+    _ENTRY_POINTS_LOADED = True
+    from importlib.metadata import entry_points
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # Built-in and explicitly registered parsers take precedence
+        _SPECS.setdefault(entry_point.name, entry_point.value)
+
+
+def _import(spec: str) -> Callable:
+    module_name, _, attribute = spec.partition(':')
+    module = importlib.import_module(module_name, __package__)
+    return getattr(module, attribute)
+
+
+def get_parser(file_type: str) -> Callable:
+    """
+    Return the parse function of a file type, importing it on first use.
+
+    Raises:
+        ValueError: No parser is registered for the file type
+    """
+    parser = _LOADED.get(file_type)
+    if parser is not None:
+        return parser
+    if file_type not in _SPECS:
+        _load_entry_points()
+    spec = _SPECS.get(file_type)
+    if spec is None:
+        raise ValueError(f"Unsupported file type: {file_type}")
+    parser = _LOADED[file_type] = _import(spec) if isinstance(spec, str) else spec
+    return parser
+
+
+def get_stream_parser(file_type: str) -> Optional[Callable]:
+    """
+    Return the incremental parser of a file type (see BUILTIN_STREAM_PARSERS),
+    importing it on first use, or None if the file type has none.
+    """
+    spec = BUILTIN_STREAM_PARSERS.get(file_type)
+    return _import(spec) if spec is not None else None
+
+
+def available_file_types() -> List[str]:
+    """File types with a registered parser (built-in, registered or from entry points)."""
+    _load_entry_points()
+    return sorted(_SPECS)
+
+
+def sniff_content(head: Any, extension: str = '') -> Optional[str]:
+    """
+    File type of JSON or YAML content from its beginning, or None.
+
+    Args:
+        head: The first bytes (or characters) of the content
+        extension: Lower-case file extension, if known ('.json', '.yaml')
+    """
+    if not isinstance(head, str):
+        head = bytes(head).decode('utf-8-sig', errors='replace')
+    json_like = head.lstrip()[:1] in ('{', '[') or extension in JSON_EXTENSIONS
+    for file_type, pattern in _JSON_MARKERS if json_like else _YAML_MARKERS:
+        if pattern.search(head):
+            return file_type
+    return None
+
+
+def sniff_file_type(path: Any, head: Any = None) -> Optional[str]:
+    """
+    Guess the file type of a file.
+
+    Terraform files (.tf, .tf.json) and compose files are recognized by
+    name; .json and YAML files by their first SNIFF_BYTES of content
+    (Terraform plans and states, ARM and CloudFormation templates,
+    Kubernetes manifests and compose files).
+
+    Args:
+        path: File path
+        head: Optional beginning of the content, read from path if needed
+
+    Returns:
+        A file type for parse_content(), or None if not recognized
+    """
+    name = Path(path).name.lower()
+    if name.endswith('.tf.json'):
+        return 'terraform_json'
+    if name.endswith('.tf'):
+        return 'terraform_simple'
+    if _COMPOSE_NAME_RE.match(name):
+        return 'docker_compose'
+    extension = Path(name).suffix
+    if extension not in JSON_EXTENSIONS and extension not in YAML_EXTENSIONS:
+        return None
+    if head is None:
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return None
+    return sniff_content(head, extension)
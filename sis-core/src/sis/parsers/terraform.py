@@ -1,23 +1,33 @@
 """
-Terraform parser for SIS - Uses improved simple parser
+Terraform parser for SIS - HCL2 native syntax and JSON syntax (.tf.json)
 """
 from typing import Dict, Any, List, Optional
 
-def parse_terraform(content: str, file_format: Optional[str] = None) -> List[Dict[str, Any]]:
+def parse_terraform(content: Any, file_format: Optional[str] = None, projection=None,
+                    **kwargs) -> List[Dict[str, Any]]:
     """
-    Parse Terraform files using our improved simple parser
-    
+    Parse Terraform files in either syntax
+
     Args:
-        content: Terraform HCL2 content
-        file_format: Optional format specifier
-    
+        content: Terraform HCL2 or JSON content (str, UTF-8 bytes or an mmap)
+        file_format: Optional format specifier, 'hcl' or 'json'; by default
+            content starting with '{' is read as JSON
+        projection: Optional sis.paths.Projection
+
     Returns:
         List of extracted resources with their configurations
     """
-    try:
-        # Try using our improved simple parser
-        from .terraform_simple_fixed import parse_terraform_simple
-        return parse_terraform_simple(content)
-    except Exception as e:
-        print(f"⚠️  Terraform parsing failed: {e}")
-        return []
+    if file_format is None:
+        file_format = 'json' if _looks_like_json(content) else 'hcl'
+    if file_format == 'json':
+        from .terraform_json import parse_terraform_json
+        return parse_terraform_json(content, projection)
+    from .terraform_simple import parse_terraform_simple
+    return parse_terraform_simple(content, projection)
+
+def _looks_like_json(content: Any) -> bool:
+    """True if the first non-whitespace character is '{' (no HCL body starts with one)."""
+    head = content[:4096]
+    if not isinstance(head, str):
+        head = bytes(head).decode('utf-8-sig', errors='replace')
+    return head.lstrip(' \t\r\n\ufeff')[:1] == '{'
@@ -0,0 +1,186 @@
+"""
+Terraform JSON syntax (.tf.json) parser for SIS
+
+Maps the `resource` objects of a .tf.json file straight into resources:
+
+    {"resource": {"aws_s3_bucket": {"logs": {"acl": "private", ...}}}}
+
+becomes
+
+    {'kind': 'aws_s3_bucket', 'name': 'logs', 'attributes': {'acl':
+     'private', ...}, 'line': <line of the resource body>}
+
+Nested blocks keep their JSON form: an object for one block, an array of
+objects for several (rule paths traverse both). Values are not
+interpreted, so "${...}" templates stay strings. As in the Terraform JSON
+syntax, any level of the resource tree may be an array of objects instead
+of an object, and "//" comment properties are dropped.
+
+The document is walked with sis.parsers.json_stream: each resource body
+is decoded in one call to the json module's C decoder, and sections
+other than resource (variable, locals, module, ...) and resources outside
+the projection are skipped without being decoded.
+"""
+from typing import Any, Dict, FrozenSet, Iterator, List
+
+from .hcl import Block
+from .json_stream import JSONStream
+
+# Property name of comments in the Terraform JSON syntax
+COMMENT_KEY = '//'
+
+# Number of labels of each top-level block type (others take one)
+BLOCK_LABELS = {'resource': 2, 'data': 2, 'locals': 0, 'terraform': 0}
+
+
+def _iter_members(reader: JSONStream) -> Iterator[str]:
+    """
+    Keys of the object at the reader's position, or of each object of an array.
+
+    The caller consumes each member's value before the next key; any other
+    value is skipped.
+    """
+    kind = reader.peek_type()
+    if kind is dict:
+        for key in reader.iter_object():
+            if key == COMMENT_KEY:
+                reader.skip()
+            else:
+                yield key
+    elif kind is list:
+        for _ in reader.iter_array():
+            yield from _iter_members(reader)
+    else:
+        reader.skip()
+
+
+def _attributes(body: Any, keeps: Any) -> Dict[str, Any]:
+    """Attributes of a decoded resource body."""
+    if not isinstance(body, dict):
+        return {}
+    if COMMENT_KEY in body or keeps is not None:
+        return {k: v for k, v in body.items() if k != COMMENT_KEY and (keeps is None or keeps(k))}
+    return body
+
+
+def _iter_names(reader: JSONStream, kind: str, projection: Any) -> Iterator[Dict[str, Any]]:
+    """Resources of the object (or array of objects) of one resource type."""
+    if reader.peek_type() is list:
+        for _ in reader.iter_array():
+            yield from _iter_names(reader, kind, projection)
+        return
+    if reader.peek_type() is not dict:
+        reader.skip()
+        return
+    if projection is not None and not projection.keeps_kind(kind):
+        # Bodies are stepped over without being decoded
+        for name in reader.iter_object():
+            if name == COMMENT_KEY:
+                reader.skip()
+                continue
+            for _ in reader.iter_array() if reader.peek_type() is list else (None,):
+                yield {'kind': kind, 'name': name, 'attributes': {}, 'line': reader.line}
+                reader.skip()
+        return
+    keeps = None if projection is None or projection.attributes is None else projection.keeps_attribute
+    for name, line, body in reader.iter_items():
+        if name == COMMENT_KEY:
+            continue
+        # An array holds several bodies for one name
+        for body in body if isinstance(body, list) else (body,):
+            yield {'kind': kind, 'name': name, 'attributes': _attributes(body, keeps), 'line': line}
+
+
+def iter_terraform_json(content: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a .tf.json file, yielding its managed resources.
+
+    Args:
+        content: Terraform JSON (str, bytes, an mmap or an open file)
+        projection: Optional sis.paths.Projection; resources of types
+            outside it get empty attributes (and are not decoded), and only
+            projected attributes are kept
+
+    Yields:
+        Normalized resources ({'kind', 'name', 'attributes', 'line'}), in
+        document order
+    """
+    reader = JSONStream(content)
+    if reader.peek_type() is not dict:
+        return
+    for section in reader.iter_object():
+        if section != 'resource':
+            reader.skip()
+            continue
+        for kind in _iter_members(reader):
+            yield from _iter_names(reader, kind, projection)
+
+
+def iter_terraform_json_file(path: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """Parse a .tf.json file incrementally (see iter_terraform_json)."""
+    with open(path, 'rb') as f:
+        yield from iter_terraform_json(f, projection)
+
+
+def _iter_labelled(reader: JSONStream, labels: int, prefix: tuple) -> Iterator[tuple]:
+    """(labels, body, line) for the blocks of a section's value, labels levels deep."""
+    if labels == 0:
+        if reader.peek_type() is list:
+            for _ in reader.iter_array():
+                yield from _iter_labelled(reader, 0, prefix)
+            return
+        line = reader.line
+        body = reader.value()
+        if isinstance(body, dict):
+            body.pop(COMMENT_KEY, None)
+            yield prefix, body, line
+        return
+    for label in _iter_members(reader):
+        yield from _iter_labelled(reader, labels - 1, prefix + (label,))
+
+
+def iter_blocks(content: Any, projection: Any = None, full: FrozenSet[str] = frozenset()) -> Iterator[Block]:
+    """
+    Parse a .tf.json file into top-level blocks, as sis.parsers.hcl.iter_blocks
+    does for the native syntax.
+
+    Block offsets are not tracked and are always 0.
+
+    Args:
+        content: Terraform JSON (str, bytes, an mmap or an open file)
+        projection: Optional sis.paths.Projection; resources are projected
+            as by iter_terraform_json, and sections other than resource
+            and those in full are skipped
+        full: Block types decoded whole even under a projection
+
+    Yields:
+        Block tuples in document order
+    """
+    reader = JSONStream(content)
+    if reader.peek_type() is not dict:
+        return
+    for section in reader.iter_object():
+        if section == 'resource':
+            for kind in _iter_members(reader):
+                for resource in _iter_names(reader, kind, projection):
+                    yield Block('resource', (kind, resource['name']), resource['attributes'],
+                                resource['line'], 0)
+        elif section == COMMENT_KEY or (projection is not None and section not in full):
+            reader.skip()
+        else:
+            for labels, body, line in _iter_labelled(reader, BLOCK_LABELS.get(section, 1), ()):
+                yield Block(section, labels, body, line, 0)
+
+
+def parse_terraform_json(content, projection=None, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Parse .tf.json content and return normalized resources.
+
+    Args:
+        content: Terraform JSON (str, bytes or an mmap)
+        projection: Optional projection, as for iter_terraform_json
+
+    Returns:
+        List of resources, one per resource body
+    """
+    return list(iter_terraform_json(content, projection))
@@ -0,0 +1,121 @@
+"""
+Terraform plan and state JSON parser for SIS
+
+Reads the output of `terraform show -json` for a plan (planned_values)
+or a state (values), walking root_module and its child_modules with an
+incremental JSON reader (sis.parsers.json_stream). Each managed resource
+instance is decoded on its own and yielded straight away:
+
+    {'kind': 'aws_s3_bucket', 'name': 'logs[0]', 'address':
+     'module.app.aws_s3_bucket.logs[0]', 'attributes': <values>, 'line': N}
+
+Unlike the HCL parser, attribute values are the ones Terraform computed
+(variables, locals and module inputs are resolved); values only known
+after apply are absent. Everything else in the document (resource_changes,
+prior_state, configuration) is stepped over without being decoded, so
+peak memory is bounded by one resource, not the plan.
+"""
+import json
+from typing import Any, Dict, Iterator, List
+
+from .json_stream import JSONStream
+
+# Top-level members holding the module tree: plan, state
+VALUES_KEYS = ('planned_values', 'values')
+
+
+def _instance_name(resource: Dict[str, Any]) -> str:
+    """Resource name with its count/for_each key, as in its address."""
+    name = str(resource.get('name', ''))
+    if 'index' in resource:
+        return '%s[%s]' % (name, json.dumps(resource['index']))
+    return name
+
+
+def _resource(resource: Any, line: int, projection: Any):
+    """Normalized resource for a decoded resource instance, or None if not managed."""
+    if not isinstance(resource, dict) or resource.get('mode', 'managed') != 'managed':
+        return None
+    kind = resource.get('type', '')
+    if projection is not None and not projection.keeps_kind(kind):
+        attributes = {}
+    else:
+        attributes = resource.get('values')
+        if not isinstance(attributes, dict):
+            attributes = {}
+        elif projection is not None and projection.attributes is not None:
+            attributes = {k: v for k, v in attributes.items() if projection.keeps_attribute(k)}
+    return {
+        'kind': kind,
+        'name': _instance_name(resource),
+        'address': resource.get('address', ''),
+        'attributes': attributes,
+        'line': line,
+    }
+
+
+def _iter_module(reader: JSONStream, projection: Any) -> Iterator[Dict[str, Any]]:
+    """Resources of the module object at the reader's position and its children."""
+    if reader.peek_type() is not dict:
+        reader.skip()
+        return
+    for key in reader.iter_object():
+        if key == 'resources' and reader.peek_type() is list:
+            for _ in reader.iter_array():
+                line = reader.line
+                resource = _resource(reader.value(), line, projection)
+                if resource is not None:
+                    yield resource
+        elif key == 'child_modules' and reader.peek_type() is list:
+            for _ in reader.iter_array():
+                yield from _iter_module(reader, projection)
+        else:
+            reader.skip()
+
+
+def iter_terraform_plan(source: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse `terraform show -json` output incrementally.
+
+    Args:
+        source: Plan or state JSON: a file object (read in chunks), str,
+            bytes or an mmap
+        projection: Optional sis.paths.Projection; resources of types
+            outside it get empty attributes, and only projected attributes
+            are kept
+
+    Yields:
+        Normalized managed resource instances, in document order
+    """
+    reader = JSONStream(source)
+    if reader.peek_type() is not dict:
+        return
+    for key in reader.iter_object():
+        if key not in VALUES_KEYS or reader.peek_type() is not dict:
+            reader.skip()
+            continue
+        for member in reader.iter_object():
+            if member == 'root_module':
+                yield from _iter_module(reader, projection)
+            else:
+                reader.skip()
+
+
+def iter_terraform_plan_file(path: Any, projection: Any = None) -> Iterator[Dict[str, Any]]:
+    """Parse a plan or state JSON file incrementally (see iter_terraform_plan)."""
+    with open(path, 'rb') as f:
+        yield from iter_terraform_plan(f, projection)
+
+
+def parse_terraform_plan(content, projection=None, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Parse `terraform show -json` output and return normalized resources.
+
+    Args:
+        content: Plan or state JSON (str, bytes or an mmap)
+        projection: Optional projection, as for iter_terraform_plan
+
+    Returns:
+        List of managed resource instances
+    """
+    return list(iter_terraform_plan(content, projection))
@@ -3,146 +3,106 @@ Simple Terraform parser that preserves nested block structure
 """
 import re
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List
 
-def parse_terraform_simple(content: str) -> List[Dict[str, Any]]:
+def parse_terraform_simple(content: str, projection=None) -> List[Dict[str, Any]]:
     """
     Parse Terraform HCL2 content, preserving nested block structure.
     
+    Uses the single-pass tokenizer and parser in sis.parsers.hcl.
+    
     Args:
         content: Terraform HCL2 content
+        projection: Optional sis.paths.Projection (e.g. from
+            CompiledRuleSet.projection); resources of kinds outside it get
+            empty attributes, and only projected attributes are parsed
     
     Returns:
         List of resources with their configurations
     """
-    resources = []
-    lines = content.split('\n')
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Look for resource definitions
-        resource_match = re.match(r'resource\s+"([^"]+)"\s+"([^"]+)"\s*{', line)
-        if resource_match:
-            resource_type = resource_match.group(1)
-            resource_name = resource_match.group(2)
-            
-            # Find the matching closing brace
-            brace_count = 1
-            j = i + 1
-            resource_lines = []
-            
-            while j < len(lines) and brace_count > 0:
-                resource_lines.append(lines[j])
-                if '{' in lines[j]:
-                    brace_count += 1
-                if '}' in lines[j]:
-                    brace_count -= 1
-                j += 1
-            
-            # Parse the resource block
-            resource_content = '\n'.join(resource_lines[:-1])  # Exclude the closing brace
-            attributes = parse_resource_block(resource_content)
-            
-            resources.append({
-                'kind': resource_type,
-                'name': resource_name,
-                'attributes': attributes,
-                'line': i + 1  # 1-based line number
-            })
-            
-            i = j - 1  # Skip to after the resource
-        
-        i += 1
-    
-    return resources
+    from .hcl import iter_resources
+    return list(iter_resources(content, projection))
 
-def parse_resource_block(content: str) -> Dict[str, Any]:
+def iter_terraform_stream(lines: Iterable[str], projection=None) -> Iterator[Dict[str, Any]]:
     """
-    Parse a resource block, handling nested structures.
-    """
-    attributes = {}
-    lines = content.strip().split('\n')
-    i = 0
+    Parse Terraform HCL2 source incrementally, one top-level block at a time.
+    
+    Peak memory is bounded by the largest top-level block rather than the
+    whole file.
     
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines and comments
-        if not line or line.startswith('#'):
-            i += 1
-            continue
-        
-        # Check for nested blocks (like lifecycle, provisioner, etc.)
-        block_match = re.match(r'([a-zA-Z_][a-zA-Z0-9_-]*)\s*{', line)
-        if block_match:
-            block_name = block_match.group(1)
-            
-            # Find the matching closing brace
-            brace_count = 1
-            j = i + 1
-            block_lines = []
-            
-            while j < len(lines) and brace_count > 0:
-                block_lines.append(lines[j])
-                if '{' in lines[j]:
-                    brace_count += 1
-                if '}' in lines[j]:
-                    brace_count -= 1
-                j += 1
-            
-            # Parse the nested block
-            block_content = '\n'.join(block_lines[:-1])
-            block_attrs = parse_block(block_content)
-            
-            # Store the nested block
-            if block_name in attributes:
-                # Convert to list if multiple blocks of same type
-                if isinstance(attributes[block_name], list):
-                    attributes[block_name].append(block_attrs)
-                else:
-                    attributes[block_name] = [attributes[block_name], block_attrs]
-            else:
-                attributes[block_name] = block_attrs
-            
-            i = j - 1
-        
-        else:
-            # Parse simple attribute assignments
-            attr_match = re.match(r'([a-zA-Z_][a-zA-Z0-9_-]*)\s*=\s*(.+)$', line)
-            if attr_match:
-                key = attr_match.group(1)
-                value = parse_value(attr_match.group(2).strip())
-                attributes[key] = value
-        
-        i += 1
+    Args:
+        lines: Source lines including their line endings, e.g. an open file
+        projection: Optional projection, as for parse_terraform_simple
     
-    return attributes
+    Yields:
+        Resources with their configurations, as parse_terraform_simple
+    """
+    from .hcl import iter_resources_stream
+    return iter_resources_stream(lines, projection)
+
+def iter_terraform_file(path, projection=None) -> Iterator[Dict[str, Any]]:
+    """Parse a Terraform file incrementally (see iter_terraform_stream)."""
+    with open(path, 'r') as f:
+        yield from iter_terraform_stream(f, projection)
+
+# First characters of parse_value's fast paths
+_IDENT_START = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+_NUMBER_START = frozenset('-0123456789')
+
+# Words that JSON, boolean or float conversion turn into non-strings
+_SPECIAL_WORDS = frozenset(['true', 'false', 'null', 'nan', 'inf', 'infinity'])
+
+# A leading quoted string that JSON decodes to its own contents
+_SIMPLE_STRING_RE = re.compile(r'"([^"\\\x00-\x1f]*)"')
 
-def parse_block(content: str) -> Dict[str, Any]:
+# JSON number syntax (json.loads and int()/float() agree on these)
+_INT_RE = re.compile(r'-?(?:0|[1-9][0-9]*)')
+_NUMBER_RE = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+
+def parse_value(value_str: str) -> Any:
     """
-    Parse a nested block (like lifecycle).
+    Parse a Terraform value string into a Python value.
+    
+    The first character selects the conversion: plain references and
+    expressions, simple quoted strings and JSON numbers are converted
+    directly, without raising. Anything else goes through
+    parse_value_generic(), with identical results.
     """
-    block_attrs = {}
-    lines = content.strip().split('\n')
+    # Remove trailing commas
+    value_str = value_str.rstrip(',')
+    if not value_str:
+        return value_str
+    
+    first = value_str[0]
+    if first in _IDENT_START:
+        # References, function calls, keywords
+        if len(value_str) <= 8 or value_str[-1].isspace():
+            if value_str.strip().lower() in _SPECIAL_WORDS:
+                return parse_value_generic(value_str)
+        return value_str
     
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
-        
-        attr_match = re.match(r'([a-zA-Z_][a-zA-Z0-9_-]*)\s*=\s*(.+)$', line)
-        if attr_match:
-            key = attr_match.group(1)
-            value = parse_value(attr_match.group(2).strip())
-            block_attrs[key] = value
+    if first == '"':
+        match = _SIMPLE_STRING_RE.match(value_str)
+        if match is not None:
+            rest = value_str[match.end():]
+            if not rest or not rest.strip(' \t\n\r'):
+                # Exactly one JSON string
+                return match.group(1)
+            # Trailing text (e.g. a comment or an operator): not JSON, so
+            # only the outer quotes would be removed
+            return value_str[1:-1] if value_str[-1] == '"' else value_str
+    elif first in _NUMBER_START and len(value_str) < 64:
+        if _INT_RE.fullmatch(value_str):
+            return int(value_str)
+        if _NUMBER_RE.fullmatch(value_str):
+            return float(value_str)
     
-    return block_attrs
+    return parse_value_generic(value_str)
 
-def parse_value(value_str: str) -> Any:
+def parse_value_generic(value_str: str) -> Any:
     """
-    Parse a Terraform value string into a Python value.
+    Convert a value string by trial: JSON, booleans, int, float, quoted
+    string, else the string itself.
     """
     # Remove trailing commas
     value_str = value_str.rstrip(',')
@@ -150,7 +110,7 @@ def parse_value(value_str: str) -> Any:
     # Try to parse as JSON (for complex values)
     try:
         return json.loads(value_str)
-    except:
+    except (ValueError, RecursionError):
         pass
     
     # Handle booleans
@@ -162,10 +122,10 @@ def parse_value(value_str: str) -> Any:
     # Handle numbers
     try:
         return int(value_str)
-    except:
+    except ValueError:
         try:
             return float(value_str)
-        except:
+        except ValueError:
             pass
     
     # Remove quotes from strings
@@ -0,0 +1,368 @@
+"""
+YAML loading shared by the SIS parsers
+
+PyYAML is optional: YAML_AVAILABLE tells whether it is installed, and
+LIBYAML_AVAILABLE whether documents are parsed by libyaml (C) rather than
+pure Python. SafeLoader is the fastest safe loader available, reading
+timestamps as strings: configuration formats treat them as text, and
+datetime objects are neither comparable with rule values nor marshallable
+into the parse cache.
+
+The node helpers let parsers inspect a composed document (kinds, names,
+line numbers) before deciding which parts to construct.
+"""
+from typing import Any, Optional
+
+try:
+    import yaml
+    try:
+        from yaml import CSafeLoader as _BaseLoader
+    except ImportError:
+        from yaml import SafeLoader as _BaseLoader
+    YAML_AVAILABLE = True
+except ImportError:
+    yaml = None
+    YAML_AVAILABLE = False
+
+if YAML_AVAILABLE:
+    class SafeLoader(_BaseLoader):
+        """Safe loader reading timestamps as strings."""
+
+    SafeLoader.add_constructor('tag:yaml.org,2002:timestamp', SafeLoader.construct_yaml_str)
+
+    LIBYAML_AVAILABLE = _BaseLoader.__name__.startswith('C')
+else:
+    SafeLoader = None
+    LIBYAML_AVAILABLE = False
+
+MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+
+def require_yaml() -> None:
+    """Raise RuntimeError if PyYAML is not installed."""
+    if not YAML_AVAILABLE:
+        raise RuntimeError("PyYAML not available")
+
+
+def node_get(node: Any, key: str) -> Any:
+    """Value node of a plain key in a mapping node, or None."""
+    if not isinstance(node, yaml.MappingNode):
+        return None
+    for key_node, value_node in node.value:
+        if isinstance(key_node, yaml.ScalarNode) and key_node.value == key:
+            return value_node
+    return None
+
+
+def node_scalar(node: Any) -> Optional[str]:
+    """Source text of a scalar node, or None."""
+    return node.value if isinstance(node, yaml.ScalarNode) else None
+
+
+def node_line(node: Any) -> int:
+    """1-based line on which a node starts."""
+    return node.start_mark.line + 1
+
+
+def construct_mapping(loader: Any, node: Any, keeps: Any = None) -> dict:
+    """
+    Construct a mapping node, optionally only the keys `keeps(key)` accepts.
+
+    Values of skipped keys are never constructed. Merge keys (<<) need the
+    whole mapping, so their mappings are constructed in full and filtered.
+
+    Args:
+        loader: The loader that composed the node
+        node: A MappingNode
+        keeps: Optional predicate on (constructed) keys
+    """
+    try:
+        if keeps is None or any(key_node.tag == MERGE_TAG for key_node, _ in node.value):
+            data = loader.construct_object(node, deep=True)
+            if keeps is not None:
+                data = {k: v for k, v in data.items() if keeps(k)}
+            return data
+
+        data = {}
+        for key_node, value_node in node.value:
+            if isinstance(key_node, yaml.ScalarNode) and not keeps(key_node.value):
+                continue
+            key = loader.construct_object(key_node, deep=True)
+            if keeps(key):
+                data[key] = loader.construct_object(value_node, deep=True)
+        return data
+    finally:
+        # As construct_document does between documents
+        loader.constructed_objects = {}
+        loader.recursive_objects = {}
+
+
+# Tags of untagged (resolved) nodes
+_STR_TAG = 'tag:yaml.org,2002:str'
+_NULL_TAG = 'tag:yaml.org,2002:null'
+_BOOL_TAG = 'tag:yaml.org,2002:bool'
+_MAP_TAGS = (None, '!', 'tag:yaml.org,2002:map')
+_SEQ_TAGS = (None, '!', 'tag:yaml.org,2002:seq')
+
+
+class _Merge:
+    """Key of a merge (<<) entry while its mapping is being built."""
+
+
+MERGE = _Merge()
+
+
+class EventBuilder:
+    """
+    Builds Python objects straight from a loader's parse events.
+
+    Equivalent to composing nodes and constructing them with the loader,
+    but no node tree is ever built: each object is created as its events
+    arrive, and skip() discards a subtree without creating anything (other
+    than anchored nodes, which later aliases may refer to). Callers walk
+    the top of a document with start_document() and iter_mapping() and
+    build or skip each value, so a large document is converted one entry
+    at a time.
+
+    Collections with explicit tags are composed into nodes and handed to
+    the loader's constructors; aliases inside them to anchors outside are
+    not supported.
+    """
+
+    def __init__(self, loader: Any):
+        self.loader = loader
+        self.anchors = {}
+        self._get = loader.get_event
+        self._peek = loader.peek_event
+        self._resolvers = loader.yaml_implicit_resolvers
+        # Node anchors of explicitly tagged collections
+        self._node_anchors = {}
+        # Values already built, returned by the next value() or skip() call
+        self._pending = []
+
+    # Documents and mappings
+
+    def start_document(self) -> bool:
+        """Move to the root node of the next document; False at the end of the stream."""
+        if isinstance(self._peek(), yaml.StreamStartEvent):
+            self._get()
+        if not isinstance(self._peek(), yaml.DocumentStartEvent):
+            return False
+        self._get()
+        self.anchors = {}
+        self._node_anchors = {}
+        return True
+
+    def end_document(self) -> None:
+        """Skip the rest of the current document."""
+        while not isinstance(self._peek(), (yaml.DocumentEndEvent, yaml.StreamEndEvent)):
+            self.skip()
+        if isinstance(self._peek(), yaml.DocumentEndEvent):
+            self._get()
+
+    def iter_mapping(self):
+        """
+        Iterate over the mapping at the current position.
+
+        Yields (key, line) for each entry; the caller consumes the value
+        with value() or skip() before the next entry. Merge entries are
+        skipped. If the current node is not a mapping it is skipped and
+        nothing is yielded.
+        """
+        event = self._peek()
+        if not isinstance(event, yaml.MappingStartEvent) or event.tag not in _MAP_TAGS:
+            self.skip()
+            return
+        self._get()
+        if event.anchor is not None:
+            # Later aliases refer to the whole mapping, so it is built first
+            line = event.start_mark.line + 1
+            for key, value in self._mapping(event, None).items():
+                self._pending.append(value)
+                yield key, line
+                del self._pending[:]
+            return
+        while not isinstance(self._peek(), yaml.MappingEndEvent):
+            line = self._peek().start_mark.line + 1
+            key = self.value()
+            if key is MERGE:
+                self.skip()
+                continue
+            yield key, line
+        self._get()
+
+    # Values
+
+    def skip(self) -> None:
+        """Consume the node at the current position without building it."""
+        if self._pending:
+            self._pending.pop()
+            return
+        depth = 0
+        while True:
+            event = self._peek()
+            if getattr(event, 'anchor', None) is not None and not isinstance(event, yaml.AliasEvent):
+                self.value()
+            else:
+                self._get()
+                if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                    depth += 1
+                elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                    depth -= 1
+            if depth == 0:
+                return
+
+    def value(self, keeps: Any = None) -> Any:
+        """
+        Build the node at the current position.
+
+        Args:
+            keeps: Optional predicate on keys; if the node is a mapping,
+                values of other keys are skipped (as in construct_mapping)
+        """
+        if self._pending:
+            value = self._pending.pop()
+            if keeps is not None and isinstance(value, dict):
+                value = {k: v for k, v in value.items() if keeps(k)}
+            return value
+        event = self._get()
+        cls = type(event)
+        if cls is yaml.ScalarEvent:
+            value = self._scalar(event)
+        elif cls is yaml.MappingStartEvent and event.tag in _MAP_TAGS:
+            return self._mapping(event, keeps)
+        elif cls is yaml.SequenceStartEvent and event.tag in _SEQ_TAGS:
+            return self._sequence(event)
+        elif cls is yaml.AliasEvent:
+            if event.anchor not in self.anchors:
+                raise yaml.composer.ComposerError(None, None, 'found undefined alias %r' % event.anchor,
+                                                  event.start_mark)
+            value = self.anchors[event.anchor]
+            if keeps is not None and isinstance(value, dict):
+                value = {k: v for k, v in value.items() if keeps(k)}
+            return value
+        else:
+            value = self._construct(self._node(event))
+        if event.anchor is not None:
+            self.anchors[event.anchor] = value
+        return value
+
+    def _scalar(self, event: Any) -> Any:
+        value = event.value
+        tag = event.tag
+        if tag is None or tag == '!':
+            if not event.implicit[0]:
+                return value
+            resolvers = self._resolvers.get(value[:1])
+            if resolvers is None:
+                return value
+            for tag, regexp in resolvers:
+                if regexp.match(value):
+                    break
+            else:
+                return value
+            if tag == MERGE_TAG:
+                return MERGE
+            if tag == _NULL_TAG:
+                return None
+            if tag == _BOOL_TAG:
+                return self.loader.bool_values[value.lower()]
+        elif tag == _STR_TAG:
+            return value
+        return self._construct(yaml.ScalarNode(tag, value, event.start_mark, event.end_mark, event.style))
+
+    def _mapping(self, event: Any, keeps: Any) -> dict:
+        if event.anchor is not None and keeps is not None:
+            # Aliases see the whole mapping
+            return {k: v for k, v in self._mapping(event, None).items() if keeps(k)}
+        data = {}
+        if event.anchor is not None:
+            self.anchors[event.anchor] = data
+        merges = []
+        get, peek = self._get, self._peek
+        while type(peek()) is not yaml.MappingEndEvent:
+            key_event = peek()
+            key = self.value()
+            if key is MERGE:
+                merged = self.value()
+                merges.extend(merged if isinstance(merged, list) else [merged])
+                continue
+            if keeps is not None and not keeps(key):
+                self.skip()
+                continue
+            try:
+                data[key] = self.value()
+            except TypeError:
+                raise yaml.constructor.ConstructorError(
+                    'while constructing a mapping', event.start_mark, 'found unhashable key',
+                    key_event.start_mark)
+        get()
+        if merges:
+            # As flatten_mapping: explicit keys win, then earlier merge sources
+            explicit = dict(data)
+            data.clear()
+            for source in reversed(merges):
+                if not isinstance(source, dict):
+                    raise yaml.constructor.ConstructorError(
+                        'while constructing a mapping', event.start_mark,
+                        'expected a mapping for merging', None)
+                data.update(source)
+            data.update(explicit)
+            if keeps is not None:
+                for key in [k for k in data if not keeps(k)]:
+                    del data[key]
+        return data
+
+    def _sequence(self, event: Any) -> list:
+        data = []
+        if event.anchor is not None:
+            self.anchors[event.anchor] = data
+        peek, value = self._peek, self.value
+        while type(peek()) is not yaml.SequenceEndEvent:
+            data.append(value())
+        self._get()
+        return data
+
+    # Explicitly tagged collections
+
+    def _node(self, event: Any) -> Any:
+        """Compose the node starting with event (already consumed)."""
+        cls = type(event)
+        if cls is yaml.AliasEvent:
+            if event.anchor not in self._node_anchors:
+                raise yaml.composer.ComposerError(None, None, 'found undefined alias %r' % event.anchor,
+                                                  event.start_mark)
+            return self._node_anchors[event.anchor]
+        if cls is yaml.ScalarEvent:
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = self.loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+            node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, event.style)
+        elif cls is yaml.SequenceStartEvent:
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = self.loader.resolve(yaml.SequenceNode, None, event.implicit)
+            node = yaml.SequenceNode(tag, [], event.start_mark, None, event.flow_style)
+            while not isinstance(self._peek(), yaml.SequenceEndEvent):
+                node.value.append(self._node(self._get()))
+            node.end_mark = self._get().end_mark
+        else:
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = self.loader.resolve(yaml.MappingNode, None, event.implicit)
+            node = yaml.MappingNode(tag, [], event.start_mark, None, event.flow_style)
+            while not isinstance(self._peek(), yaml.MappingEndEvent):
+                key = self._node(self._get())
+                node.value.append((key, self._node(self._get())))
+            node.end_mark = self._get().end_mark
+        if event.anchor is not None:
+            self._node_anchors[event.anchor] = node
+        return node
+
+    def _construct(self, node: Any) -> Any:
+        loader = self.loader
+        try:
+            return loader.construct_object(node, deep=True)
+        finally:
+            loader.constructed_objects = {}
+            loader.recursive_objects = {}
@@ -0,0 +1,192 @@
+"""
+Compiled attribute path accessors for SIS
+
+Condition paths are parsed once at rule-load time into accessors instead of
+being split on every lookup. Besides dotted keys, paths support list
+segments:
+
+    ingress[*].cidr_blocks     every ingress block
+    ingress[0].from_port       the first ingress block only
+    tags[*]                    every value of a map or list
+
+Repeated blocks (which the Terraform parser turns into lists) are traversed
+implicitly, so `lifecycle.prevent_destroy` also reaches a lifecycle block
+that was declared twice. A path that crosses a list yields a Fanout of all
+candidate values; conditions combine them with ANY (default) or ALL
+semantics via the condition's "quantifier" key.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+
+# Marker for a [*] segment
+WILDCARD = object()
+
+Segment = Union[str, int, object]
+
+_SEGMENT_RE = re.compile(r'([^.\[\]]*)((?:\[(?:\*|-?\d+)\])*)$')
+_INDEX_RE = re.compile(r'\[(\*|-?\d+)\]')
+
+
+class Fanout(list):
+    """Candidate values reached through list traversal (never empty)."""
+    __slots__ = ()
+
+
+def parse_path(path: Any) -> Tuple[Segment, ...]:
+    """
+    Parse a condition path into segments.
+
+    Args:
+        path: Dotted path, optionally with [*] or [N] list segments
+
+    Returns:
+        Tuple of key names (str), indexes (int) and WILDCARD markers
+    """
+    segments: List[Segment] = []
+    for part in str(path).split('.'):
+        match = _SEGMENT_RE.match(part)
+        if match is None:
+            # Not bracket syntax after all; treat the whole part as a key
+            segments.append(part)
+            continue
+        name, brackets = match.groups()
+        if name or not brackets:
+            segments.append(name)
+        for index in _INDEX_RE.findall(brackets):
+            segments.append(WILDCARD if index == '*' else int(index))
+    return tuple(segments)
+
+
+def path_keys(path: Any) -> Tuple[str, ...]:
+    """The key names of a path, without list segments."""
+    return tuple(s for s in parse_path(path) if isinstance(s, str))
+
+
+def top_level_key(path: Any) -> Optional[str]:
+    """The attribute a path starts from, or None if it starts with a list segment."""
+    segments = parse_path(path)
+    return segments[0] if segments and isinstance(segments[0], str) else None
+
+
+def is_simple_path(path: Any) -> bool:
+    """Whether a path is a single key that can be read with dict.get."""
+    segments = parse_path(path)
+    return len(segments) == 1 and isinstance(segments[0], str)
+
+
+def _walk(values: List[Any], segments: Tuple[Segment, ...], fanned: bool) -> Any:
+    """Generic traversal over a set of candidate values."""
+    for segment in segments:
+        following = []
+        if segment is WILDCARD:
+            fanned = True
+            for value in values:
+                if isinstance(value, list):
+                    following.extend(value)
+                elif isinstance(value, dict):
+                    following.extend(value.values())
+        elif isinstance(segment, int):
+            for value in values:
+                if isinstance(value, list) and -len(value) <= segment < len(value):
+                    following.append(value[segment])
+        else:
+            for value in values:
+                if isinstance(value, dict):
+                    if segment in value:
+                        following.append(value[segment])
+                elif isinstance(value, list):
+                    # Repeated blocks: look inside every element
+                    fanned = True
+                    for item in value:
+                        if isinstance(item, dict) and segment in item:
+                            following.append(item[segment])
+        values = following
+        if not values:
+            return None
+
+    if fanned:
+        return Fanout(values)
+    return values[0]
+
+
+def _make_getter(segments: Tuple[Segment, ...]) -> Callable[[Any], Any]:
+    keys_only = all(isinstance(s, str) for s in segments)
+
+    def get(obj: Any) -> Any:
+        if keys_only:
+            # Fast path: plain dictionaries all the way down
+            current = obj
+            for position, part in enumerate(segments):
+                if isinstance(current, dict):
+                    if part not in current:
+                        return None
+                    current = current[part]
+                elif isinstance(current, list):
+                    return _walk([current], segments[position:], False)
+                else:
+                    return None
+            return current
+        return _walk([obj], segments, False)
+
+    return get
+
+
+class PathAccessor:
+    """A parsed path with a specialised getter."""
+
+    __slots__ = ('path', 'segments', 'get')
+
+    def __init__(self, path: Any):
+        self.path = path
+        self.segments = parse_path(path)
+        self.get = _make_getter(self.segments)
+
+    def __call__(self, obj: Any) -> Any:
+        return self.get(obj)
+
+
+@lru_cache(maxsize=4096)
+def compile_path(path: str) -> PathAccessor:
+    """Return the (cached) accessor for a path."""
+    return PathAccessor(path)
+
+
+class PathMemo(dict):
+    """
+    Per-resource memo of path lookups, keyed by accessor id.
+
+    Missing entries are filled on first access, so rules sharing a path
+    walk the attribute dictionary once per resource. Use memo_class() to
+    bind a list of accessors; instances only carry the attributes.
+    """
+
+    __slots__ = ('attributes',)
+
+    accessors: List[Callable[[Any], Any]] = []
+
+    def __missing__(self, key: int) -> Any:
+        value = self[key] = self.accessors[key](self.attributes)
+        return value
+
+
+def memo_class(accessors: List[Callable[[Any], Any]]) -> type:
+    """Create a PathMemo subclass bound to a list of accessor getters."""
+    return type('PathMemo', (PathMemo,), {'__slots__': (), 'accessors': accessors})
+
+
+class Projection(NamedTuple):
+    """
+    The part of the parsed input a rule set can observe: the resource kinds
+    it targets and the top-level attributes its condition paths start from.
+    None means unrestricted. Parsers may skip converting anything outside
+    it (see CompiledRuleSet.projection).
+    """
+    kinds: Optional[FrozenSet[str]] = None
+    attributes: Optional[FrozenSet[str]] = None
+
+    def keeps_kind(self, kind: Any) -> bool:
+        return self.kinds is None or kind in self.kinds
+
+    def keeps_attribute(self, name: Any) -> bool:
+        return self.attributes is None or name in self.attributes
@@ -0,0 +1,163 @@
+"""
+Condition planner for SIS
+
+Orders the conditions of each rule so short-circuit evaluation does as
+little work as possible: cheap operators first, and among similar costs the
+condition most likely to decide the rule (fail for ALL, succeed for ANY).
+Selectivity is learned from sampled evaluations and, when the caller opts
+in, persisted between runs.
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .cache import get_cache_dir, atomic_write
+
+# Relative cost of evaluating one condition, by operator
+OPERATOR_COST = {
+    'EXISTS': 1.0,
+    'EQUALS': 2.0,
+    'GREATER_THAN': 3.0,
+    'CONTAINS': 3.0,
+    'REGEX': 5.0,
+}
+
+# Unknown operators compile to a constant False
+UNKNOWN_OPERATOR_COST = 0.0
+
+# Extra cost per additional path segment walked
+PATH_SEGMENT_COST = 0.25
+
+# Extra cost per list segment, which may fan out over many values
+LIST_SEGMENT_COST = 1.0
+
+
+def condition_key(condition: Dict[str, Any]) -> str:
+    """Stable identity of a condition across runs and rule sets."""
+    identity = [condition.get('path'), condition.get('operator'), condition.get('value')]
+    if 'quantifier' in condition:
+        identity.append(condition['quantifier'])
+    return json.dumps(identity, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def condition_cost(condition: Dict[str, Any]) -> float:
+    """Estimated cost of evaluating a condition once."""
+    operator = condition.get('operator')
+    cost = OPERATOR_COST.get(operator, UNKNOWN_OPERATOR_COST)
+    if operator in OPERATOR_COST:
+        path = str(condition.get('path'))
+        cost += PATH_SEGMENT_COST * path.count('.') + LIST_SEGMENT_COST * path.count('[')
+    return cost
+
+
+class SelectivityStats:
+    """
+    Observed match rates of conditions, persisted as JSON.
+
+    Counts are stored per condition key as [evaluated, matched]. Only the
+    counts recorded in this process are merged into the file on save, so
+    concurrent runs do not overwrite each other's observations.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.counts: Dict[str, List[int]] = {}
+        self._delta: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Optional[Path]) -> 'SelectivityStats':
+        """Load statistics from a file (missing or corrupt files are ignored)."""
+        stats = cls(path)
+        if path is not None:
+            stats.counts = _read_counts(path)
+        return stats
+
+    @staticmethod
+    def default_path(cache_dir: Any = None) -> Optional[Path]:
+        """
+        Statistics file under the SIS cache root (cache_dir, else
+        SIS_CACHE_DIR; see get_cache_dir), or None if caching is disabled.
+        """
+        directory = get_cache_dir('stats', cache_dir=cache_dir)
+        return directory / 'selectivity.json' if directory else None
+
+    @classmethod
+    def load_default(cls, cache_dir: Any = None) -> 'SelectivityStats':
+        """Load statistics from the SIS cache directory (see default_path)."""
+        return cls.load(cls.default_path(cache_dir))
+
+    def probability(self, condition: Dict[str, Any]) -> float:
+        """Estimated probability that a condition matches (Laplace-smoothed)."""
+        evaluated, matched = self.counts.get(condition_key(condition), (0, 0))
+        return (matched + 1.0) / (evaluated + 2.0)
+
+    def record(self, key: str, matched: bool) -> None:
+        """Record one observed evaluation of a condition."""
+        with self._lock:
+            for table in (self.counts, self._delta):
+                entry = table.get(key)
+                if entry is None:
+                    entry = table[key] = [0, 0]
+                entry[0] += 1
+                if matched:
+                    entry[1] += 1
+
+    def save(self) -> bool:
+        """Merge this process's observations into the statistics file."""
+        with self._lock:
+            if self.path is None or not self._delta:
+                return False
+            merged = _read_counts(self.path)
+            for key, (evaluated, matched) in self._delta.items():
+                entry = merged.setdefault(key, [0, 0])
+                entry[0] += evaluated
+                entry[1] += matched
+            data = json.dumps(merged, sort_keys=True, separators=(',', ':'))
+            if atomic_write(self.path, data.encode('utf-8')):
+                self._delta = {}
+                return True
+            return False
+
+
+def _read_counts(path: Path) -> Dict[str, List[int]]:
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        key: [int(value[0]), int(value[1])]
+        for key, value in data.items()
+        if isinstance(value, list) and len(value) == 2
+    }
+
+
+def plan_conditions(conditions: List[Dict[str, Any]], match_logic: str,
+                    selectivity: Optional[SelectivityStats] = None) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Order conditions for short-circuit evaluation.
+
+    For ALL, evaluation stops at the first failing condition, so conditions
+    are ranked by cost divided by their probability of failing; for ANY,
+    by cost divided by their probability of matching. Ties keep rule order.
+
+    Args:
+        conditions: The rule's conditions
+        match_logic: 'ALL' or 'ANY' (anything else behaves as ALL)
+        selectivity: Observed statistics; without them every condition is
+            assumed to match half the time and only cost matters
+
+    Returns:
+        List of (original position, condition) in evaluation order
+    """
+    def rank(item: Tuple[int, Dict[str, Any]]) -> float:
+        condition = item[1]
+        p_match = selectivity.probability(condition) if selectivity else 0.5
+        p_decide = p_match if match_logic == 'ANY' else 1.0 - p_match
+        return condition_cost(condition) / max(p_decide, 1e-6)
+
+    return sorted(enumerate(conditions), key=rank)
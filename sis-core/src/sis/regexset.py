@@ -0,0 +1,142 @@
+"""
+Multi-pattern regex matching for SIS
+
+When several REGEX conditions target the same attribute path, matching them
+one by one converts and scans the value once per pattern. A RegexSet merges
+the patterns into a single compiled expression, one zero-width lookahead
+per pattern, each wrapped in a named group:
+
+    (?:(?=(?P<r0>pattern0))|)(?:(?=(?P<r1>pattern1))|)...
+
+A single match() call at position 0 then reports, through the groups that
+participated, every pattern that re.match() would have matched. Patterns
+that cannot be embedded safely (backreferences, named groups, global
+inline flags, conditionals) are matched separately.
+"""
+import re
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from .paths import Fanout
+
+# Constructs whose meaning changes when a pattern is embedded in a larger one
+_UNMERGEABLE_RE = re.compile(
+    r'\\[1-9]'           # numbered backreference
+    r'|\(\?P[<=]'        # named group / named backreference
+    r'|\(\?\('           # conditional
+    r'|\(\?[aiLmsux]+\)'  # global inline flags
+)
+
+# Below this many patterns on one path, separate re.match calls are cheaper
+# than a merged scan (see benchmarks/bench_regex.py)
+MERGE_THRESHOLD = 4
+
+
+def is_mergeable(pattern: str) -> bool:
+    """Whether a pattern can be embedded in a merged alternation."""
+    return _UNMERGEABLE_RE.search(pattern) is None
+
+
+class RegexSet:
+    """
+    A set of patterns matched together against one value.
+
+    Pattern ids are positions in the list given to the constructor. scan()
+    returns a row with one entry per slot; pattern `pid` matched iff
+    row[slots[pid]] is not None.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        self._merged = None
+        self._merged_width = 0
+        # Matchers for patterns that are not part of the merged expression
+        self._separate: List[Any] = []
+        self.slots: List[int] = [0] * len(self.patterns)
+
+        mergeable = [(pid, p) for pid, p in enumerate(self.patterns) if is_mergeable(p)]
+        merged_ids = set()
+        if len(mergeable) > 1:
+            source = ''.join('(?:(?=(?P<r%d>%s))|)' % (pid, p) for pid, p in mergeable)
+            try:
+                merged = re.compile(source)
+            except re.error:
+                merged = None
+            if merged is not None:
+                self._merged = merged.match
+                self._merged_width = merged.groups
+                for pid, _ in mergeable:
+                    self.slots[pid] = merged.groupindex['r%d' % pid] - 1
+                    merged_ids.add(pid)
+
+        for pid, pattern in enumerate(self.patterns):
+            if pid not in merged_ids:
+                self.slots[pid] = self._merged_width + len(self._separate)
+                self._separate.append(re.compile(pattern).match)
+
+        self._no_match = (None,) * (self._merged_width + len(self._separate))
+
+    @property
+    def merged_count(self) -> int:
+        """Number of patterns handled by the merged expression."""
+        return len(self.patterns) - len(self._separate)
+
+    def scan(self, text: str) -> Tuple[Any, ...]:
+        """Match every pattern at the start of text; returns the slot row."""
+        row = self._merged(text).groups() if self._merged is not None else ()
+        if self._separate:
+            row += tuple([matcher(text) for matcher in self._separate])
+        return row
+
+    def scan_value(self, value: Any) -> Tuple[Any, ...]:
+        """Scan an attribute value; None never matches (REGEX semantics)."""
+        if value is None:
+            return self._no_match
+        return self.scan(str(value))
+
+    def matches(self, text: str) -> FrozenSet[int]:
+        """Return the ids of every pattern that matches at the start of text."""
+        row = self.scan(text)
+        return frozenset(pid for pid, slot in enumerate(self.slots) if row[slot] is not None)
+
+
+class RegexSetAccessor:
+    """
+    PathMemo entry for a RegexSet bound to an attribute path.
+
+    get() returns (any_row, all_row) slot rows: for a single value both are
+    its scan row; for a Fanout of candidates a slot is set in any_row if
+    some candidate matched, and in all_row if every candidate matched.
+    `scan` replaces RegexSet.scan, e.g. with a memoized version.
+    """
+
+    __slots__ = ('regex_set', 'path_get', 'scan')
+
+    def __init__(self, regex_set: RegexSet, path_get, scan=None):
+        self.regex_set = regex_set
+        self.path_get = path_get
+        self.scan = scan or regex_set.scan
+
+    def scan_value(self, value: Any) -> Tuple[Any, ...]:
+        if value is None:
+            return self.regex_set._no_match
+        return self.scan(str(value))
+
+    def get(self, attributes: Any) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+        value = self.path_get(attributes)
+        if value.__class__ is not Fanout:
+            row = self.scan_value(value)
+            return row, row
+
+        columns = list(zip(*[self.scan_value(v) for v in value]))
+        any_row = tuple(True if any(c is not None for c in col) else None for col in columns)
+        all_row = tuple(True if all(c is not None for c in col) else None for col in columns)
+        return any_row, all_row
+
+
+def compile_pattern(pattern: Any) -> Optional[str]:
+    """Return the pattern as a string if it compiles, else None."""
+    try:
+        re.compile(str(pattern))
+    except re.error:
+        return None
+    return str(pattern)
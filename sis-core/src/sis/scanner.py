@@ -1,58 +1,305 @@
-"""Terraform HCL2 scanner for irreversible patterns."""
+"""Infrastructure-as-code scanner for irreversible patterns (Terraform and the other parsed formats)."""
 
-from .parsers.terraform_simple import parse_terraform_simple
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from .cache import DiskCache, cache_key, file_digest, get_cache_dir
+from .compiler import COMPILER_VERSION, compile_rules, default_selectivity, normalize_file_type
+from .engine import iter_violations
+from .parsers import PARSER_VERSION, get_parse_cache, parse_content
+from .parsers.registry import get_stream_parser, sniff_file_type
+from .version import __version__
+
+# File type of the resources produced by the Terraform parser
+FILE_TYPE = 'terraform'
+
+# parse_content() parser used for Terraform files, and for files whose
+# type is not recognized (see sniff_file_type)
+PARSER = 'terraform_simple'
+
+# Files larger than this many bytes are parsed incrementally
+STREAM_THRESHOLD = 8 * 1024 * 1024
+
+# Files larger than this many bytes (up to STREAM_THRESHOLD) are tokenized
+# through a memory map instead of being read into a string
+MMAP_THRESHOLD = 1024 * 1024
+
+# Size bound of the on-disk result cache
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_RESULT_CACHES: Dict[Path, DiskCache] = {}
+
+
+def get_result_cache(cache_dir=None, use_cache=True) -> Optional[DiskCache]:
+    """
+    Return the on-disk scan result cache ('results' under the SIS cache
+    directory).
+    
+    Entries hold the violations of one file, keyed by its content hash, the
+    rule-set hash and the SIS version (see result_key). Entries are plain
+    files written atomically, so the directory can be shared between
+    concurrent jobs and restored as a CI artifact.
+    
+    Args:
+        cache_dir: Cache root, overriding SIS_CACHE_DIR (see get_cache_dir)
+        use_cache: False disables the cache
+    
+    Returns:
+        The cache, or None if on-disk caching is disabled
+    """
+    directory = get_cache_dir('results', cache_dir=cache_dir, use_cache=use_cache)
+    if directory is None:
+        return None
+    cache = _RESULT_CACHES.get(directory)
+    if cache is None:
+        cache = _RESULT_CACHES[directory] = DiskCache(directory, RESULT_CACHE_MAX_BYTES)
+    return cache
+
+
+def result_key(content_digest, rules_digest, parser=PARSER):
+    """
+    Cache key of the violations of a file.
+    
+    Args:
+        content_digest: SHA-256 of the file content (see file_digest)
+        rules_digest: Canonical hash of the rule set (see rule_set_hash)
+        parser: parse_content() parser the file is read with
+    """
+    return cache_key(content_digest, rules_digest, FILE_TYPE, parser, __version__, COMPILER_VERSION,
+                     PARSER_VERSION)
+
+
+def parser_for(file_path):
+    """
+    parse_content() parser for a file: sniffed from its name and content
+    (see sis.parsers.registry.sniff_file_type), HCL if not recognized.
+    """
+    return sniff_file_type(file_path) or PARSER
 
 
 class Scanner:
     """Scan Terraform files for irreversible infrastructure patterns."""
     
+    def __init__(self, stream_threshold=STREAM_THRESHOLD, mmap_threshold=MMAP_THRESHOLD,
+                 cache_dir=None, use_cache=True, persist_stats=None):
+        """
+        Args:
+            stream_threshold: File size in bytes above which files are
+                parsed one top-level block at a time instead of being read
+                whole; None never streams
+            mmap_threshold: File size in bytes above which (non-streamed)
+                files are tokenized as bytes through a memory map; None
+                never maps
+            cache_dir: Root of the on-disk result, parse and bytecode
+                caches; None uses SIS_CACHE_DIR or ~/.cache/sis (see
+                sis.cache.get_cache_dir)
+            use_cache: False scans without any on-disk cache
+            persist_stats: Load the condition selectivity statistics from
+                the cache directory, for flush() to save them back; by
+                default only when cache_dir is given. Otherwise they are
+                kept in memory
+        """
+        self.stream_threshold = stream_threshold
+        self.mmap_threshold = mmap_threshold
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        if persist_stats is None:
+            persist_stats = cache_dir is not None and use_cache
+        self.selectivity = default_selectivity(cache_dir, persist_stats)
+    
+    @property
+    def result_cache(self):
+        """The scanner's result cache (see get_result_cache), or None."""
+        return get_result_cache(self.cache_dir, self.use_cache)
+    
+    @property
+    def parse_cache(self):
+        """The scanner's parse cache (see sis.parsers.get_parse_cache), or None."""
+        return get_parse_cache(self.cache_dir, self.use_cache)
+    
+    def _compile(self, rules):
+        return compile_rules(rules, self.cache_dir, self.use_cache, self.selectivity)
+    
+    def flush(self):
+        """
+        Save the selectivity statistics observed by this scanner's scans, if
+        they are persisted (see persist_stats).
+        
+        Returns:
+            True if the statistics file was written
+        """
+        return self.selectivity.save()
+    
     def scan(self, file_path, rules):
         """Scan a Terraform file for irreversible patterns."""
-        findings = []
+        return list(self.iter_scan(file_path, rules))
+    
+    def iter_scan(self, file_path, rules):
+        """
+        Scan a file, yielding findings as they are produced.
+        
+        The file type is sniffed from the file name and, for .json and YAML
+        files, the beginning of the content (see parser_for); only the
+        parser of that type is imported.
+        
+        Every loaded rule is evaluated by the compiled engine
+        (sis.engine.iter_violations) in a single pass over the resources.
+        Only the resource kinds and attributes the rules reference are
+        parsed (see CompiledRuleSet.projection).
+        
+        Findings for a file whose content, rule set and SIS version match an
+        earlier scan are loaded from the result cache (see get_result_cache)
+        instead of being evaluated again.
+        """
+        cache = self.result_cache
+        content_digest = file_digest(file_path) if cache is not None else None
+        if content_digest is None:
+            yield from self._iter_scan_file(file_path, rules)
+            return
+        
+        try:
+            key = result_key(content_digest, self._compile(rules).digest, parser_for(file_path))
+        except Exception as e:
+            # Invalid rules are reported by the uncached scan
+            yield from self._iter_scan_file(file_path, rules)
+            return
+        
+        violations = cache.get(key)
+        if violations is not None:
+            for violation in violations:
+                violation['file_path'] = str(file_path)
+                yield violation
+            return
+        
+        # Cached without the path, which is not part of the key
+        violations = []
+        scan = self._iter_scan_file(file_path, rules)
+        while True:
+            try:
+                violation = next(scan)
+            except StopIteration as stop:
+                completed = stop.value
+                break
+            violations.append({k: v for k, v in violation.items() if k != 'file_path'})
+            yield violation
+        if completed:
+            cache.put(key, violations)
+    
+    def _iter_scan_file(self, file_path, rules):
+        """
+        Parse and evaluate a file, yielding its findings.
+        
+        Returns:
+            True if the whole file was evaluated, False if an error cut the
+            scan short
+        """
+        parser = parser_for(file_path)
+        file_type = normalize_file_type(parser)
+        size = self._file_size(file_path)
+        if self._exceeds(size, self.stream_threshold):
+            iterate = get_stream_parser(parser)
+            if iterate is not None:
+                return (yield from self._iter_scan_stream(file_path, rules, iterate, file_type))
         
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            # Parse Terraform content
-            resources = parse_terraform_simple(content)
-            
-            # Check each resource against each rule
-            for resource in resources:
-                resource_type = resource.get('kind', '')
-                resource_name = resource.get('name', '')
-                config = resource.get('attributes', {})
+            compiled = self._compile(rules)
+            projection = compiled.projection(file_type)
+            if self._exceeds(size, self.mmap_threshold):
+                # Parsed as bytes, straight from the page cache
+                with open(file_path, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        resources = parse_content(mapped, parser, self.cache_dir, self.use_cache,
+                                                  projection=projection)
+            else:
+                with open(file_path, 'r') as f:
+                    content = f.read()
                 
-                for rule in rules:
-                    if self._check_rule(rule, config):
-                        findings.append({
-                            "rule_id": rule.get("rule_id", "UNKNOWN"),
-                            "message": rule.get("message", ""),
-                            "severity": rule.get("severity", "MEDIUM"),
-                            "resource_type": resource_type,
-                            "resource_name": resource_name,
-                            "file_path": str(file_path),
-                            "line": resource.get('line', 1)
-                        })
-            
+                # Parse the content (cached on disk by content hash)
+                resources = parse_content(content, parser, self.cache_dir, self.use_cache,
+                                          projection=projection)
         except Exception as e:
             # Don't crash on parse errors
-            pass
+            return False
+        
+        for resource in resources:
+            resource['file_path'] = str(file_path)
+        
+        try:
+            yield from iter_violations(resources, compiled, file_type=file_type)
+        except Exception as e:
+            # Don't crash on malformed resources
+            return False
+        return True
+    
+    def iter_scan_workspace(self, directory, rules):
+        """
+        Scan a Terraform root module directory with its references resolved.
+        
+        Variables, locals and the outputs of local modules are resolved
+        across the directory's files and the modules it calls (see
+        sis.workspace), so rules see the values references stand for.
+        Findings carry the file and line declaring the resource and its
+        address ('module.db.aws_rds_cluster.this'). Rules run once per
+        distinct configuration of counted resources and shared module
+        instances; the findings are expanded to every instance address.
+        
+        Results are not cached: a module's findings depend on its callers.
+        
+        Files that cannot be read or parsed are reported on stderr and left
+        out (see Workspace.module); any other error is raised to the caller
+        rather than ending the scan as if nothing had been found.
+        """
+        # Imported here so single-file scans never load the HCL and JSON
+        # block parsers unless their file type needs them
+        from .workspace import Workspace, expand_violations
         
-        return findings
+        compiled = self._compile(rules)
+        projection = compiled.projection(FILE_TYPE)
+        resources = Workspace(directory, projection).iter_resources()
+        yield from expand_violations(iter_violations(resources, compiled, file_type=FILE_TYPE))
     
-    def _check_rule(self, rule, config):
-        """Check if a rule matches the configuration."""
-        rule_id = rule.get("rule_id")
+    @staticmethod
+    def _file_size(file_path):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _exceeds(size, threshold):
+        return size is not None and threshold is not None and size > threshold
+    
+    def _iter_scan_stream(self, file_path, rules, iterate, file_type):
+        """
+        Scan a large file with an incremental parser, so only one top-level
+        block (one resource of a .tf.json file or plan, one manifest) and its
+        resources are held in memory at a time.
         
-        # IRR-DEC-01: deletion_protection = true
-        if rule_id == "IRR-DEC-01":
-            return config.get("deletion_protection") == True
+        A parse error ends the scan of the file; findings for the resources
+        before it have already been yielded.
         
-        # IRR-DEC-02: lifecycle.prevent_destroy = true
-        if rule_id == "IRR-DEC-02":
-            lifecycle = config.get("lifecycle", [{}])[0] if isinstance(config.get("lifecycle"), list) else config.get("lifecycle", {})
-            return lifecycle.get("prevent_destroy") == True
+        Args:
+            file_path: File to scan
+            rules: Rule set
+            iterate: Incremental parser (see get_stream_parser), reading the
+                file itself
+            file_type: Rule file type of the resources
         
-        # Add more rule checks here as needed
-        return False
+        Returns:
+            True if the whole file was evaluated
+        """
+        def resources(projection):
+            for resource in iterate(file_path, projection):
+                resource['file_path'] = str(file_path)
+                yield resource
+        
+        try:
+            compiled = self._compile(rules)
+            projection = compiled.projection(file_type)
+            yield from iter_violations(resources(projection), compiled, file_type=file_type)
+        except Exception as e:
+            # Don't crash on unreadable files, parse errors or malformed resources
+            return False
+        return True
@@ -0,0 +1,7 @@
+"""
+Version of SIS
+"""
+
+# Release version (see CHANGELOG.md); bump with every release, since cached
+# scan results are keyed by it
+__version__ = '1.1.0'
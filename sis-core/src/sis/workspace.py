@@ -0,0 +1,557 @@
+"""
+Terraform workspace resolution for SIS
+
+A Terraform configuration is a directory of .tf and .tf.json files (the
+root module) plus the local modules it calls. Rules compare attribute
+values, but configurations mostly set them through references, which the
+parsers keep as written ('var.protect', '${local.tier}'). Workspace
+resolves the references that have a value before apply:
+
+    var.NAME            module inputs, terraform.tfvars / *.auto.tfvars
+                        (root module) and variable defaults
+    local.NAME          locals, evaluated on demand in dependency order
+    module.NAME.OUTPUT  outputs of local child modules (source = "./...")
+    count.index         in resources and module calls with count
+    each.key/each.value in resources and module calls with for_each
+
+with attribute and index traversal (var.settings.tier, local.zones[0]).
+An attribute that is exactly one reference, or a "${...}" template of
+one, takes the referenced value with its type; templates mixing text and
+references are rendered when every reference has a scalar value.
+Anything else (function calls, conditionals, data sources, attributes of
+other resources, references without a value) stays as the parser wrote it.
+
+Each module directory is parsed once, and each module is evaluated once
+per distinct set of input values: a module called 300 times with the
+same inputs is resolved once. Every expression of an evaluation is
+resolved at most once (once per instance where it uses count.index or
+each), so resolution is linear in the size of the configuration.
+
+Instances are kept symbolic. A resource with count or for_each is
+resolved once per distinct configuration, and every resource of a module
+evaluation is yielded once however many calls share it; such a resource
+lists the addresses of all the instances it stands for in 'instances'.
+Rules therefore run once per distinct configuration, and
+expand_violations() turns each finding back into one per instance.
+"""
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .parsers import hcl, terraform_json
+from .paths import Projection
+
+TF_SUFFIX = '.tf'
+TF_JSON_SUFFIX = '.tf.json'
+
+# Root module variable files, lowest precedence first; *.auto.tfvars
+# files follow in name order
+TFVARS_FILES = ('terraform.tfvars', 'terraform.tfvars.json')
+AUTO_TFVARS_SUFFIXES = ('.auto.tfvars', '.auto.tfvars.json')
+
+# Block types the resolver reads, parsed whole even under a projection
+RESOLVED_BLOCKS = frozenset(['variable', 'locals', 'module', 'output'])
+
+# Resource and module arguments that repeat the block
+REPEAT_ARGUMENTS = frozenset(['count', 'for_each'])
+
+# module block arguments that are not inputs of the called module
+MODULE_META_ARGUMENTS = frozenset(['source', 'version', 'providers', 'depends_on']) | REPEAT_ARGUMENTS
+
+_NAME = r'[A-Za-z_][A-Za-z0-9_-]*'
+_REFERENCE_RE = re.compile(r'(var|local|module|count|each)\.(%s)((?:\.%s|\[[0-9]+\]|\["[^"\\]*"\])*)'
+                           % (_NAME, _NAME))
+_STEP_RE = re.compile(r'\.(%s)|\[([0-9]+)\]|\["([^"\\]*)"\]' % _NAME)
+_INTERPOLATION_RE = re.compile(r'\$\{\s*([^${}]*?)\s*\}')
+_REFERENCE_PREFIXES = ('var.', 'local.', 'module.', 'count.', 'each.')
+# Set conversions applied to for_each collections
+_SET_FUNCTION_RE = re.compile(r'toset\((.*)\)', re.DOTALL)
+
+
+class _Unknown:
+    """Value of a reference that cannot be resolved before apply."""
+
+    def __repr__(self) -> str:
+        return '<unknown>'
+
+
+UNKNOWN = _Unknown()
+
+
+class _Expression(NamedTuple):
+    """A value as parsed, and whether bare references are expressions (native syntax)."""
+    value: Any
+    native: bool
+
+
+class _Instance(NamedTuple):
+    """count.index or each.key/each.value of one instance, and its address suffix."""
+    key: Any
+    value: Any
+    suffix: str
+
+
+class _Call(NamedTuple):
+    """A module block: the called directory (None if not local), inputs and count/for_each."""
+    directory: Optional[Path]
+    inputs: Dict[str, _Expression]
+    repeat: Dict[str, _Expression]
+
+
+class _Module:
+    """The blocks of one module directory, parsed once."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.variables: Dict[str, Any] = {}
+        self.locals: Dict[str, _Expression] = {}
+        self.outputs: Dict[str, _Expression] = {}
+        self.calls: Dict[str, _Call] = {}
+        # (resource, native syntax)
+        self.resources: List[Tuple[Dict[str, Any], bool]] = []
+
+    def add(self, block: hcl.Block, path: Path, native: bool) -> None:
+        kind, labels, body = block.type, block.labels, block.body
+        if kind == 'resource' and len(labels) == 2:
+            self.resources.append(({
+                'kind': labels[0],
+                'name': labels[1],
+                'attributes': body,
+                'line': block.line,
+                'file_path': str(path),
+            }, native))
+        elif kind == 'variable' and len(labels) == 1:
+            self.variables[labels[0]] = body.get('default', UNKNOWN)
+        elif kind == 'locals':
+            for name, value in body.items():
+                self.locals[name] = _Expression(value, native)
+        elif kind == 'output' and len(labels) == 1 and 'value' in body:
+            self.outputs[labels[0]] = _Expression(body['value'], native)
+        elif kind == 'module' and len(labels) == 1:
+            source = body.get('source')
+            directory = None
+            if isinstance(source, str) and source.startswith(('./', '../')):
+                directory = (self.directory / source).resolve()
+            inputs = {k: _Expression(v, native) for k, v in body.items() if k not in MODULE_META_ARGUMENTS}
+            repeat = {k: _Expression(v, native) for k, v in body.items() if k in REPEAT_ARGUMENTS}
+            self.calls[labels[0]] = _Call(directory, inputs, repeat)
+
+
+class _Evaluation(NamedTuple):
+    """A module resolved for one set of inputs."""
+    # (resource, address suffixes of its instances: [''] if not repeated)
+    resources: List[Tuple[Dict[str, Any], List[str]]]
+    outputs: Dict[str, Any]
+    # (module call name, [(instance address suffix, evaluation or None)])
+    calls: List[Tuple[str, List[Tuple[str, Optional['_Evaluation']]]]]
+
+
+# The single instance of a block without count or for_each
+_SINGLE = [_Instance(None, None, '')]
+
+
+class InstanceAddresses:
+    """
+    Addresses of the instances a resource stands for, built on iteration.
+
+    Every combination of a module instance prefix ('module.app[0].') and a
+    resource instance suffix ('["a"]') around the resource's own address.
+    """
+    __slots__ = ('prefixes', 'address', 'suffixes')
+
+    def __init__(self, prefixes: List[str], address: str, suffixes: List[str]):
+        self.prefixes = prefixes
+        self.address = address
+        self.suffixes = suffixes
+
+    def __len__(self) -> int:
+        return len(self.prefixes) * len(self.suffixes)
+
+    def __iter__(self) -> Iterator[str]:
+        for prefix in self.prefixes:
+            for suffix in self.suffixes:
+                yield prefix + self.address + suffix
+
+
+def _traverse(value: Any, steps: str) -> Any:
+    """Follow .name / [index] / ["key"] steps into a value."""
+    for name, index, key in _STEP_RE.findall(steps):
+        if value is UNKNOWN:
+            return UNKNOWN
+        if index:
+            if not isinstance(value, list) or int(index) >= len(value):
+                return UNKNOWN
+            value = value[int(index)]
+        else:
+            if not isinstance(value, dict):
+                return UNKNOWN
+            value = value.get(name or key, UNKNOWN)
+    return value
+
+
+def _render(value: Any) -> Optional[str]:
+    """Text of a scalar interpolated into a template, or None."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None
+
+
+def _uses_instance(value: Any) -> bool:
+    """True if a parsed value mentions count.index or each."""
+    if isinstance(value, str):
+        return 'count.' in value or 'each.' in value
+    if isinstance(value, dict):
+        return any(_uses_instance(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_uses_instance(v) for v in value)
+    return False
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=repr)
+
+
+class _Scope:
+    """Resolution of the expressions of one module evaluation."""
+
+    def __init__(self, workspace: 'Workspace', module: _Module, variables: Dict[str, Any]):
+        self.workspace = workspace
+        self.module = module
+        self.variables = variables
+        self._locals: Dict[str, Any] = {}
+        self._calls: Dict[str, Tuple[List[_Instance], List[Tuple[str, Optional[_Evaluation]]]]] = {}
+
+    def resolve(self, value: Any, native: bool, instance: Optional[_Instance] = None) -> Any:
+        """value with every resolvable reference replaced."""
+        if isinstance(value, str):
+            if '${' in value:
+                return self._template(value, instance)
+            if native and value.startswith(_REFERENCE_PREFIXES):
+                resolved = self.reference(value, instance)
+                return value if resolved is UNKNOWN else resolved
+            return value
+        if isinstance(value, dict):
+            return {k: self.resolve(v, native, instance) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(v, native, instance) for v in value]
+        return value
+
+    def _template(self, text: str, instance: Optional[_Instance]) -> Any:
+        match = _INTERPOLATION_RE.fullmatch(text)
+        if match is not None:
+            resolved = self.reference(match.group(1), instance)
+            return text if resolved is UNKNOWN else resolved
+        parts = []
+        end = 0
+        for match in _INTERPOLATION_RE.finditer(text):
+            rendered = _render(self.reference(match.group(1), instance))
+            if rendered is None:
+                return text
+            parts.append(text[end:match.start()])
+            parts.append(rendered)
+            end = match.end()
+        if not parts:
+            return text
+        parts.append(text[end:])
+        return ''.join(parts)
+
+    def reference(self, text: str, instance: Optional[_Instance] = None) -> Any:
+        """Value of a var/local/module/count/each reference, or UNKNOWN."""
+        match = _REFERENCE_RE.fullmatch(text)
+        if match is None:
+            return UNKNOWN
+        kind, name, steps = match.groups()
+        if kind == 'var':
+            value = self.variables.get(name, UNKNOWN)
+        elif kind == 'local':
+            value = self.local(name)
+        elif kind == 'module':
+            value = self.outputs(name)
+        elif instance is None or instance.suffix == '':
+            return UNKNOWN
+        elif kind == 'count':
+            value = instance.key if name == 'index' and isinstance(instance.key, int) else UNKNOWN
+        else:
+            value = {'key': instance.key, 'value': instance.value}.get(name, UNKNOWN)
+        return _traverse(value, steps)
+
+    def local(self, name: str) -> Any:
+        if name in self._locals:
+            return self._locals[name]
+        expression = self.module.locals.get(name)
+        if expression is None:
+            return UNKNOWN
+        # Guards against cycles: a local referring to itself is unknown
+        self._locals[name] = UNKNOWN
+        value = self._locals[name] = self.resolve(expression.value, expression.native)
+        return value
+
+    def instances(self, repeat: Dict[str, _Expression]) -> Optional[List[_Instance]]:
+        """
+        Instances of a block from its count / for_each arguments.
+
+        Returns:
+            One instance per key ([_SINGLE] without count or for_each), or
+            None if the keys are not known before apply
+        """
+        if 'count' in repeat:
+            count = self.resolve(repeat['count'].value, repeat['count'].native)
+            if isinstance(count, bool) or not isinstance(count, (int, float)) or count != int(count):
+                return None
+            return [_Instance(i, None, '[%d]' % i) for i in range(int(count))]
+        if 'for_each' in repeat:
+            expression = repeat['for_each']
+            collection = self._collection(expression.value, expression.native)
+            if isinstance(collection, dict):
+                return [_Instance(k, v, '[%s]' % json.dumps(k)) for k, v in collection.items()]
+            if isinstance(collection, list) and all(isinstance(k, str) for k in collection):
+                return [_Instance(k, k, '[%s]' % json.dumps(k)) for k in dict.fromkeys(collection)]
+            return None
+        return _SINGLE
+
+    def _collection(self, value: Any, native: bool) -> Any:
+        """The map or set of a for_each argument (toset() of a list is the list)."""
+        value = self.resolve(value, native)
+        if isinstance(value, str):
+            match = _SET_FUNCTION_RE.fullmatch(value.strip())
+            if match is not None:
+                argument = match.group(1).strip()
+                try:
+                    value = json.loads(argument)
+                except ValueError:
+                    value = self.resolve(argument, native)
+        return value
+
+    def call(self, name: str) -> List[Tuple[str, Optional[_Evaluation]]]:
+        """(address suffix, evaluation) of each instance of a module call (local sources only)."""
+        return self._call(name)[1]
+
+    def _call(self, name: str) -> Tuple[List[_Instance], List[Tuple[str, Optional[_Evaluation]]]]:
+        if name in self._calls:
+            return self._calls[name]
+        self._calls[name] = ([], [])
+        call = self.module.calls.get(name)
+        if call is None or call.directory is None:
+            return self._calls[name]
+        instances = self.instances(call.repeat)
+        if instances is None:
+            # Keys unknown before apply: evaluated once, symbolically
+            instances = _SINGLE
+        evaluations = []
+        for instance in instances:
+            inputs = {k: self.resolve(e.value, e.native, instance) for k, e in call.inputs.items()}
+            evaluations.append((instance.suffix, self.workspace.evaluate(call.directory, inputs)))
+        self._calls[name] = (instances, evaluations)
+        return self._calls[name]
+
+    def outputs(self, name: str) -> Any:
+        """Value of module.NAME: its outputs, a list or map of them if repeated."""
+        instances, evaluations = self._call(name)
+        if not evaluations or any(evaluation is None for _, evaluation in evaluations):
+            return UNKNOWN
+        repeat = self.module.calls[name].repeat
+        if not repeat:
+            return evaluations[0][1].outputs
+        if not instances[0].suffix:
+            # Repeated, with keys unknown before apply
+            return UNKNOWN
+        if 'count' in repeat:
+            return [evaluation.outputs for _, evaluation in evaluations]
+        return {instance.key: evaluation.outputs for instance, (_, evaluation) in zip(instances, evaluations)}
+
+    def resource(self, resource: Dict[str, Any], native: bool) -> List[Tuple[Dict[str, Any], List[str]]]:
+        """
+        A resource's distinct configurations, with the instances sharing each.
+
+        Returns:
+            [(resource with resolved attributes, address suffixes)]; empty
+            for count = 0
+        """
+        attributes = resource['attributes']
+        repeat = {k: _Expression(attributes[k], native) for k in REPEAT_ARGUMENTS if k in attributes}
+        instances = self.instances(repeat)
+        if instances is None:
+            # Keys unknown before apply: one symbolic instance
+            instances = _SINGLE
+        if len(instances) <= 1 or not _uses_instance(attributes):
+            resolved = self.resolve(attributes, native, instances[0] if len(instances) == 1 else None)
+            suffixes = [instance.suffix for instance in instances]
+            return [(dict(resource, attributes=resolved), suffixes)] if suffixes else []
+        configurations: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+        for instance in instances:
+            resolved = self.resolve(attributes, native, instance)
+            key = _canonical(resolved)
+            if key not in configurations:
+                configurations[key] = (dict(resource, attributes=resolved), [])
+            configurations[key][1].append(instance.suffix)
+        return list(configurations.values())
+
+
+def _load_tfvars(path: Path) -> Dict[str, Any]:
+    text = path.read_text()
+    if path.name.endswith('.json'):
+        values = json.loads(text)
+        return values if isinstance(values, dict) else {}
+    return hcl.parse_body(text)
+
+
+class Workspace:
+    """
+    A Terraform root module and the local modules it calls.
+
+    Args:
+        directory: Root module directory
+        projection: Optional sis.paths.Projection for resources; variable,
+            locals, module and output blocks are always parsed whole, as
+            are count and for_each
+        variables: Optional root variable values, taking precedence over
+            tfvars files and defaults
+    """
+
+    def __init__(self, directory: Any, projection: Any = None, variables: Optional[Dict[str, Any]] = None):
+        self.directory = Path(directory).resolve()
+        if projection is not None and projection.attributes is not None:
+            projection = Projection(projection.kinds, projection.attributes | REPEAT_ARGUMENTS)
+        self.projection = projection
+        self.variables = dict(variables or {})
+        self._modules: Dict[Path, _Module] = {}
+        self._evaluations: Dict[Tuple[Path, str], Optional[_Evaluation]] = {}
+        self.stats = {'modules': 0, 'evaluations': 0, 'reused': 0}
+
+    def module(self, directory: Path) -> _Module:
+        """The parsed blocks of a module directory (parsed on first use)."""
+        module = self._modules.get(directory)
+        if module is not None:
+            return module
+        module = self._modules[directory] = _Module(directory)
+        self.stats['modules'] += 1
+        paths = sorted(directory.iterdir()) if directory.is_dir() else []
+        for path in paths:
+            try:
+                if path.name.endswith(TF_JSON_SUFFIX):
+                    blocks = list(terraform_json.iter_blocks(path.read_bytes(), self.projection, RESOLVED_BLOCKS))
+                    native = False
+                elif path.name.endswith(TF_SUFFIX):
+                    blocks = list(hcl.iter_blocks(path.read_text(), self.projection, RESOLVED_BLOCKS))
+                    native = True
+                else:
+                    continue
+            except (OSError, ValueError) as e:
+                # Unreadable, non-UTF-8 or malformed: only this file is left out
+                print(f"⚠️  Skipping {path}: {e}", file=sys.stderr)
+                continue
+            for block in blocks:
+                module.add(block, path, native)
+        return module
+
+    def root_variables(self) -> Dict[str, Any]:
+        """Values of the root module's variables: defaults, then tfvars files, then self.variables."""
+        module = self.module(self.directory)
+        values = dict(module.variables)
+        paths = [self.directory / name for name in TFVARS_FILES]
+        paths.extend(sorted(p for p in self.directory.iterdir() if p.name.endswith(AUTO_TFVARS_SUFFIXES)))
+        for path in paths:
+            if not path.is_file():
+                continue
+            try:
+                values.update(_load_tfvars(path))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping {path}: {e}", file=sys.stderr)
+        values.update(self.variables)
+        return values
+
+    def evaluate(self, directory: Path, inputs: Dict[str, Any]) -> Optional[_Evaluation]:
+        """
+        Resolve a module for a set of input values, once per distinct set.
+
+        Returns:
+            The evaluation, or None for a module that (indirectly) calls itself
+        """
+        key = (directory, _canonical(inputs))
+        if key in self._evaluations:
+            self.stats['reused'] += 1
+            return self._evaluations[key]
+        # None while in progress, so recursive module calls resolve to nothing
+        self._evaluations[key] = None
+        self.stats['evaluations'] += 1
+
+        module = self.module(directory)
+        variables = {name: inputs.get(name, default) for name, default in module.variables.items()}
+        scope = _Scope(self, module, variables)
+        resources = [configuration for resource, native in module.resources
+                     for configuration in scope.resource(resource, native)]
+        outputs = {name: scope.resolve(e.value, e.native) for name, e in module.outputs.items()}
+        calls = [(name, scope.call(name)) for name in module.calls]
+        evaluation = self._evaluations[key] = _Evaluation(resources, outputs, calls)
+        return evaluation
+
+    def iter_resources(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the resources of the root module and of every module instance.
+
+        Resources carry resolved attributes, the file and line declaring
+        them and their 'address' ('module.app.aws_s3_bucket.logs'). A
+        resource standing for several instances (count, for_each, or
+        module calls sharing an evaluation) is yielded once, with the
+        addresses of all of them in 'instances' (an InstanceAddresses;
+        'address' is the first).
+        """
+        module = self.module(self.directory)
+        root = self.evaluate(module.directory, self.root_variables())
+        # Module instance address prefixes of each evaluation, in call order
+        prefixes: Dict[int, Tuple[_Evaluation, List[str]]] = {}
+
+        def visit(evaluation: Optional[_Evaluation], prefix: str) -> None:
+            if evaluation is None:
+                return
+            prefixes.setdefault(id(evaluation), (evaluation, []))[1].append(prefix)
+            for name, instances in evaluation.calls:
+                for suffix, child in instances:
+                    visit(child, '%smodule.%s%s.' % (prefix, name, suffix))
+
+        visit(root, '')
+        for evaluation, paths in prefixes.values():
+            for resource, suffixes in evaluation.resources:
+                local = '%s.%s' % (resource['kind'], resource['name'])
+                address = paths[0] + local + suffixes[0]
+                if len(paths) == 1 and len(suffixes) == 1:
+                    yield dict(resource, address=address)
+                else:
+                    yield dict(resource, address=address, instances=InstanceAddresses(paths, local, suffixes))
+
+
+def expand_violations(violations: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Expand findings for resources standing for several instances.
+
+    A violation with 'resource_instances' (see sis.engine.build_violation)
+    becomes one violation per instance address, in 'resource_address'.
+    """
+    for violation in violations:
+        instances = violation.pop('resource_instances', None)
+        if not instances:
+            yield violation
+            continue
+        for address in instances:
+            yield dict(violation, resource_address=address)
+
+
+def iter_workspace_resources(directory: Any, projection: Any = None,
+                             variables: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the resolved resources of a Terraform root module directory.
+
+    Args:
+        directory: Root module directory
+        projection: Optional sis.paths.Projection (see Workspace)
+        variables: Optional root variable values (see Workspace)
+
+    Yields:
+        Resources with resolved attributes and addresses (see
+        Workspace.iter_resources)
+    """
+    return Workspace(directory, projection, variables).iter_resources()
@@ -0,0 +1,18 @@
+"""
+Test setup: import sis from sis-core/src, as the sis-scan wrapper does.
+"""
+import os
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, 'sis-core', 'src'))
+
+
+@pytest.fixture
+def bundled_rules(monkeypatch):
+    """The canonical rule pack, loaded from the repository root as the CLI does."""
+    from sis.rules import load_rules
+    monkeypatch.chdir(REPO)
+    return load_rules()
@@ -0,0 +1,232 @@
+"""
+Rules and resources shared by the evaluator equivalence tests.
+
+The rules cover every operator, both match_logic values, wildcard and
+kind-specific rules, file type filters, list paths with both quantifiers
+and conditions repeated across rules; the resources hit and miss each of
+them, including missing and malformed attributes.
+
+GOLDEN_RESOURCES are written from the repository's example Terraform
+(plus cases for ANY rules and list values), and GOLDEN_VIOLATIONS are the
+findings of the bundled rules on them as the original interpreter (the
+rule-by-rule engine.validate_resources) reported them, in resource order,
+except where noted.
+"""
+import random
+
+RULES = [
+    {
+        'rule_id': 'T-PROTECT',
+        'applies_to': {'file_types': ['terraform'], 'resource_kinds': ['aws_rds_cluster', 'aws_db_instance']},
+        'detection': {'match_logic': 'ALL', 'conditions': [
+            {'path': 'deletion_protection', 'operator': 'EQUALS', 'value': False},
+        ]},
+        'message': 'Deletion protection disabled',
+    },
+    {
+        'rule_id': 'T-SNAPSHOT',
+        'applies_to': {'file_types': ['terraform'], 'resource_kinds': ['aws_rds_cluster', 'aws_db_instance']},
+        'detection': {'match_logic': 'ANY', 'conditions': [
+            {'path': 'skip_final_snapshot', 'operator': 'EQUALS', 'value': 'true'},
+            {'path': 'deletion_protection', 'operator': 'EQUALS', 'value': False},
+        ]},
+    },
+    {
+        'rule_id': 'T-RETENTION',
+        'applies_to': {'resource_kinds': ['aws_rds_cluster']},
+        'detection': {'match_logic': 'ALL', 'conditions': [
+            {'path': 'backup_retention_period', 'operator': 'GREATER_THAN', 'value': 7},
+            {'path': 'engine', 'operator': 'REGEX', 'value': 'aurora-(mysql|postgresql)'},
+        ]},
+    },
+    {
+        'rule_id': 'T-NAME',
+        'applies_to': {'resource_kinds': ['*']},
+        'detection': {'match_logic': 'ANY', 'conditions': [
+            {'path': 'tags.Environment', 'operator': 'CONTAINS', 'value': 'prod'},
+            {'path': 'name', 'operator': 'REGEX', 'value': '.*-legacy$'},
+        ]},
+    },
+    {
+        'rule_id': 'T-LIFECYCLE',
+        'applies_to': {'file_types': ['terraform'], 'resource_kinds': ['*']},
+        'detection': {'match_logic': 'ALL', 'conditions': [
+            {'path': 'lifecycle.prevent_destroy', 'operator': 'EXISTS'},
+        ]},
+    },
+    {
+        'rule_id': 'T-INGRESS-ANY',
+        'applies_to': {'resource_kinds': ['aws_security_group']},
+        'detection': {'match_logic': 'ALL', 'conditions': [
+            {'path': 'ingress[*].cidr_blocks[*]', 'operator': 'EQUALS', 'value': '0.0.0.0/0'},
+        ]},
+    },
+    {
+        'rule_id': 'T-INGRESS-ALL',
+        'applies_to': {'resource_kinds': ['aws_security_group']},
+        'detection': {'match_logic': 'ALL', 'conditions': [
+            {'path': 'ingress[*].from_port', 'operator': 'GREATER_THAN', 'value': 1000, 'quantifier': 'ALL'},
+            {'path': 'ingress[0].protocol', 'operator': 'EQUALS', 'value': 'tcp'},
+        ]},
+    },
+    {
+        'rule_id': 'T-K8S',
+        'applies_to': {'file_types': ['kubernetes'], 'resource_kinds': ['Deployment']},
+        'detection': {'match_logic': 'ALL', 'conditions': [
+            {'path': 'spec.replicas', 'operator': 'GREATER_THAN', 'value': '1'},
+        ]},
+    },
+    {
+        'rule_id': 'T-EMPTY',
+        'applies_to': {'resource_kinds': ['aws_s3_bucket']},
+        'detection': {'match_logic': 'ALL', 'conditions': []},
+    },
+    {
+        'rule_id': 'T-BAD-REGEX',
+        'applies_to': {'resource_kinds': ['aws_s3_bucket']},
+        'detection': {'match_logic': 'ANY', 'conditions': [
+            {'path': 'bucket', 'operator': 'REGEX', 'value': '(unclosed'},
+            {'path': 'force_destroy', 'operator': 'EQUALS', 'value': True},
+        ]},
+    },
+]
+
+_KINDS = ['aws_rds_cluster', 'aws_db_instance', 'aws_security_group', 'aws_s3_bucket', 'Deployment', 'other']
+_VALUES = [None, True, False, 'true', 'false', 0, 3, 8, '14', 'x', [], {}]
+
+
+def _attributes(rng: random.Random, kind: str) -> dict:
+    attributes = {}
+    for key in ('deletion_protection', 'skip_final_snapshot', 'backup_retention_period', 'force_destroy'):
+        value = rng.choice(_VALUES)
+        if value is not None:
+            attributes[key] = value
+    if rng.random() < 0.7:
+        attributes['engine'] = rng.choice(['aurora-mysql', 'aurora-postgresql', 'mysql', 7])
+    if rng.random() < 0.5:
+        attributes['tags'] = rng.choice([{'Environment': 'production'}, {'Environment': 'dev'}, 'prod', {}])
+    if rng.random() < 0.3:
+        attributes['lifecycle'] = rng.choice([{'prevent_destroy': True}, [{'prevent_destroy': False}], {}])
+    if kind == 'aws_security_group' or rng.random() < 0.1:
+        attributes['ingress'] = [
+            {
+                'from_port': rng.choice([22, 443, 1024, 8080, '9000', None]),
+                'protocol': rng.choice(['tcp', 'udp', '-1']),
+                'cidr_blocks': rng.sample(['10.0.0.0/8', '0.0.0.0/0', '192.168.0.0/16'], rng.randint(0, 2)),
+            }
+            for _ in range(rng.randint(0, 3))
+        ]
+    if kind == 'Deployment':
+        attributes['spec'] = {'replicas': rng.choice([1, 2, '3', None])}
+    if kind == 'aws_s3_bucket':
+        attributes['bucket'] = rng.choice(['logs', 'data-legacy', 'unclosed'])
+    return attributes
+
+
+def make_resources(count: int = 400, seed: int = 7) -> list:
+    """Deterministic mix of resources of the fixture kinds."""
+    rng = random.Random(seed)
+    resources = []
+    for i in range(count):
+        kind = rng.choice(_KINDS)
+        resource = {
+            'kind': kind,
+            'name': rng.choice(['main', 'db-legacy', 'r%d' % i]),
+            'attributes': _attributes(rng, kind),
+            'line': i + 1,
+        }
+        if rng.random() < 0.3:
+            resource['file_type'] = rng.choice(['terraform', 'kubernetes', 'cloudformation'])
+        resources.append(resource)
+    # Malformed resources
+    resources.append({'kind': 'aws_rds_cluster', 'name': 'no-attributes', 'line': 0})
+    resources.append({'kind': 'aws_rds_cluster', 'name': 'bad-attributes', 'attributes': 'x', 'line': 0})
+    resources.append({'kind': ['unhashable'], 'name': 'odd-kind', 'attributes': {'name': 'a-legacy'}, 'line': 0})
+    return resources
+
+
+_POLICY_ADMIN = '{"Version": "2012-10-17", "Statement": [{"Effect": "Allow", "Action": "*", "Resource": "*"}]}'
+_POLICY_EC2 = '{"Version": "2012-10-17", "Statement": [{"Effect": "Allow", "Action": "ec2:*", "Resource": "*"}]}'
+_POLICY_DENY = '{"Version": "2012-10-17", "Statement": [{"Effect": "Deny", "Action": "s3:*", "Resource": "*"}]}'
+
+GOLDEN_RESOURCES = [
+    # test_canonical_irr_dec_01.tf
+    {'kind': 'aws_rds_cluster', 'name': 'production', 'line': 5, 'attributes': {
+        'cluster_identifier': 'prod-cluster', 'engine': 'aurora', 'deletion_protection': True}},
+    {'kind': 'aws_rds_cluster', 'name': 'staging', 'line': 12, 'attributes': {
+        'cluster_identifier': 'staging-cluster', 'engine': 'aurora', 'deletion_protection': False}},
+    {'kind': 'aws_rds_cluster', 'name': 'development', 'line': 19, 'attributes': {
+        'cluster_identifier': 'dev-cluster', 'engine': 'aurora'}},
+    # Not reported: IRR-DEC-01 is limited to RDS resources
+    {'kind': 'aws_instance', 'name': 'web', 'line': 25, 'attributes': {
+        'ami': 'ami-12345678', 'instance_type': 't2.micro', 'deletion_protection': True}},
+    # real-world-example.tf
+    {'kind': 'aws_s3_bucket', 'name': 'customer_data', 'line': 2, 'attributes': {
+        'bucket': 'prod-customer-data-2024', 'acl': 'private',
+        'server_side_encryption_configuration': {'rule': {
+            'apply_server_side_encryption_by_default': {'sse_algorithm': 'AES256'}}},
+        'lifecycle': {'prevent_destroy': True}}},
+    {'kind': 'aws_s3_bucket', 'name': 'public_assets', 'line': 19, 'attributes': {
+        'bucket': 'prod-assets-public', 'acl': 'public-read'}},
+    {'kind': 'aws_security_group', 'name': 'web_sg', 'line': 45, 'attributes': {
+        'name': 'web-security-group', 'description': 'Web server access',
+        'ingress': [
+            {'from_port': 80, 'to_port': 80, 'protocol': 'tcp', 'cidr_blocks': ['0.0.0.0/0']},
+            {'from_port': 443, 'to_port': 443, 'protocol': 'tcp', 'cidr_blocks': ['0.0.0.0/0']},
+        ]}},
+    {'kind': 'aws_iam_policy', 'name': 'ec2_full_access', 'line': 64, 'attributes': {
+        'name': 'EC2FullAccess', 'policy': _POLICY_EC2}},
+    {'kind': 'aws_iam_policy', 'name': 'admin_policy', 'line': 79, 'attributes': {
+        'name': 'AdministratorAccess', 'policy': _POLICY_ADMIN}},
+    {'kind': 'aws_db_instance', 'name': 'postgres', 'line': 100, 'attributes': {
+        'identifier': 'prod-postgres', 'engine': 'postgres', 'storage_encrypted': True}},
+    # Beyond the examples: ANY rules, list values and repeated blocks
+    {'kind': 'aws_iam_policy', 'name': 'deny', 'line': 1, 'attributes': {'policy': _POLICY_DENY}},
+    {'kind': 'aws_route53_record', 'name': 'pinned', 'line': 1, 'attributes': {'ttl': '0'}},
+    {'kind': 'aws_route53_record', 'name': 'forever', 'line': 2, 'attributes': {'ttl': 99999999}},
+    {'kind': 'aws_route53_record', 'name': 'normal', 'line': 3, 'attributes': {'ttl': 300}},
+    {'kind': 'aws_iam_role', 'name': 'app', 'line': 1, 'attributes': {
+        'assume_role_policy': _POLICY_ADMIN, 'managed_policy_arns': ['arn:aws:iam::aws:policy/ReadOnlyAccess']}},
+    {'kind': 'aws_iam_role', 'name': 'no_arns', 'line': 2, 'attributes': {'assume_role_policy': _POLICY_ADMIN}},
+    {'kind': 'google_storage_bucket', 'name': 'archive', 'line': 1, 'attributes': {
+        'retention_policy': {'is_locked': 'true', 'retention_period': '31536000'},
+        'versioning': {'enabled': True}}},
+    {'kind': 'google_storage_bucket', 'name': 'blocks', 'line': 2, 'attributes': {
+        # Repeated blocks, which the parsers turn into lists
+        'retention_policy': [{'is_locked': True, 'retention_period': '31536000'}],
+        'lifecycle': [{'prevent_destroy': True}, {'prevent_destroy': False}]}},
+    {'kind': 'aws_autoscaling_group', 'name': 'workers', 'line': 1, 'attributes': {'min_size': '2'}},
+    {'kind': 'aws_autoscaling_group', 'name': 'idle', 'line': 2, 'attributes': {'min_size': 0}},
+    {'kind': 'ServiceAccount', 'name': 'gke', 'line': 1, 'attributes': {
+        'automountServiceAccountToken': True,
+        'metadata': {'name': 'gke', 'namespace': 'kube-system',
+                     'annotations': {'iam.gke.io/gcp-service-account': 'sa@p.iam.gserviceaccount.com'}}}},
+]
+
+# (rule_id, resource_type, resource_name, line)
+GOLDEN_VIOLATIONS = [
+    ('IRR-DEC-01', 'aws_rds_cluster', 'production', 5),
+    ('IRR-DEC-02', 'aws_s3_bucket', 'customer_data', 2),
+    ('ADMIN-02', 'aws_iam_policy', 'ec2_full_access', 64),
+    ('ADMIN-02', 'aws_iam_policy', 'admin_policy', 79),
+    ('IRR-DEC-07', 'aws_route53_record', 'pinned', 1),
+    ('IRR-DEC-07', 'aws_route53_record', 'forever', 2),
+    ('IRR-IDENT-04', 'aws_iam_role', 'app', 1),
+    ('IRR-DEC-03', 'google_storage_bucket', 'archive', 1),
+    ('IRR-DEC-04', 'google_storage_bucket', 'archive', 1),
+    ('IRR-DEC-10', 'google_storage_bucket', 'archive', 1),
+    # Repeated blocks are traversed (sis.paths); the original interpreter
+    # stopped at the list and reported nothing for this resource
+    ('IRR-DEC-02', 'google_storage_bucket', 'blocks', 2),
+    ('IRR-DEC-03', 'google_storage_bucket', 'blocks', 2),
+    ('IRR-DEC-04', 'google_storage_bucket', 'blocks', 2),
+    ('IRR-DEC-08', 'aws_autoscaling_group', 'workers', 1),
+    ('IRR-IDENT-03', 'ServiceAccount', 'gke', 1),
+    ('IRR-IDENT-05', 'ServiceAccount', 'gke', 1),
+    ('ADMIN-03', 'ServiceAccount', 'gke', 1),
+]
+
+
+def summarize(violations: list) -> list:
+    """Violations as (rule_id, resource_type, resource_name, line), in order."""
+    return [(v['rule_id'], v['resource_type'], v['resource_name'], v['line']) for v in violations]
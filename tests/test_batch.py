@@ -0,0 +1,49 @@
+"""
+The columnar evaluator (sis.batch) must return exactly the violations of
+sis.engine.validate_resources, in the same order, and both must match the
+original interpreter's findings on the golden cases.
+"""
+import pytest
+
+from rule_fixtures import GOLDEN_RESOURCES, GOLDEN_VIOLATIONS, RULES, make_resources, summarize
+from sis.batch import NUMPY_AVAILABLE, validate_resources_batch
+from sis.engine import validate_resources
+
+USE_NUMPY = [False] + ([True] if NUMPY_AVAILABLE else [])
+
+
+def test_validate_resources_golden(bundled_rules):
+    assert summarize(validate_resources(GOLDEN_RESOURCES, bundled_rules)) == GOLDEN_VIOLATIONS
+
+
+@pytest.mark.parametrize('use_numpy', USE_NUMPY)
+def test_batch_golden(bundled_rules, use_numpy):
+    violations = validate_resources_batch(GOLDEN_RESOURCES, bundled_rules, use_numpy=use_numpy)
+    assert summarize(violations) == GOLDEN_VIOLATIONS
+
+
+@pytest.mark.parametrize('use_numpy', USE_NUMPY)
+@pytest.mark.parametrize('file_type', [None, 'terraform', 'kubernetes'])
+def test_batch_matches_validate_resources(file_type, use_numpy):
+    resources = make_resources()
+    expected = validate_resources(resources, RULES, file_type)
+    assert expected
+    assert validate_resources_batch(resources, RULES, file_type, use_numpy=use_numpy) == expected
+
+
+@pytest.mark.parametrize('use_numpy', USE_NUMPY)
+def test_batch_single_kind_inventory(use_numpy):
+    resources = [r for r in make_resources(2000, seed=11) if r['kind'] == 'aws_rds_cluster']
+    expected = validate_resources(resources, RULES, 'terraform')
+    assert validate_resources_batch(resources, RULES, 'terraform', use_numpy=use_numpy) == expected
+
+
+def test_columnar_flag():
+    resources = make_resources(seed=3)
+    assert validate_resources(resources, RULES, columnar=True) == validate_resources(resources, RULES)
+
+
+@pytest.mark.parametrize('use_numpy', USE_NUMPY)
+def test_batch_empty_inputs(use_numpy):
+    assert validate_resources_batch([], RULES, use_numpy=use_numpy) == []
+    assert validate_resources_batch(make_resources(20), [], use_numpy=use_numpy) == []
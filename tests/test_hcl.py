@@ -0,0 +1,101 @@
+"""
+Edge cases of the HCL tokenizer and parser (sis.parsers.hcl): heredocs,
+nested interpolation and comments, which the legacy line parser got
+wrong. Text, UTF-8 bytes and the streaming block splitter must agree.
+"""
+import pytest
+
+from sis.parsers import hcl
+
+HEREDOCS = '''\
+resource "aws_iam_policy" "p" {
+  policy = <<EOF
+{
+  "Statement": [{"Effect": "Allow", "Resource": "${aws_s3_bucket.b.arn}/*"}]
+}
+EOF
+  description = <<-DESC
+    indented
+      more
+    DESC
+  name = "after"
+}
+'''
+
+INTERPOLATION = '''\
+resource "aws_s3_bucket" "b" {
+  bucket = "logs-${var.env}-${lookup(var.names, "x", "}")}"
+  tags = {
+    Name = "x-${join("-", [for s in var.list : "${s}}"])}"
+    Env  = "prod"
+  }
+  escaped = "$${not.interpolated} %%{also}"
+}
+'''
+
+COMMENTS = '''\
+# leading comment with { brace
+// another }
+resource "aws_rds_cluster" "db" { # trailing {
+  deletion_protection = false // trailing }
+  /* block comment
+     resource "fake" "x" { } */
+  tags = {
+    # comment inside object }
+    Env = "prod" # trailing
+  }
+  url = "http://example.com/#anchor" // not a comment inside the string
+}
+/* resource "commented" "out" {
+} */
+'''
+
+SOURCES = {'heredocs': HEREDOCS, 'interpolation': INTERPOLATION, 'comments': COMMENTS}
+
+
+def _resources(text):
+    return list(hcl.iter_resources(text))
+
+
+def test_heredocs():
+    (resource,) = _resources(HEREDOCS)
+    attributes = resource['attributes']
+    assert attributes['policy'] == (
+        '{\n  "Statement": [{"Effect": "Allow", "Resource": "${aws_s3_bucket.b.arn}/*"}]\n}\n')
+    # <<- strips the common indentation
+    assert attributes['description'] == 'indented\n  more\n'
+    assert attributes['name'] == 'after'
+
+
+def test_nested_interpolation():
+    (resource,) = _resources(INTERPOLATION)
+    attributes = resource['attributes']
+    assert attributes['bucket'] == 'logs-${var.env}-${lookup(var.names, "x", "}")}'
+    assert attributes['tags'] == {'Name': 'x-${join("-", [for s in var.list : "${s}}"])}', 'Env': 'prod'}
+    assert attributes['escaped'] == '$${not.interpolated} %%{also}'
+
+
+def test_comments():
+    resources = _resources(COMMENTS)
+    assert [(r['kind'], r['name']) for r in resources] == [('aws_rds_cluster', 'db')]
+    attributes = resources[0]['attributes']
+    assert attributes['deletion_protection'] is False
+    assert attributes['tags'] == {'Env': 'prod'}
+    assert attributes['url'] == 'http://example.com/#anchor'
+    assert resources[0]['line'] == 3
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_bytes_and_stream_agree(name):
+    text = SOURCES[name]
+    expected = _resources(text)
+    assert list(hcl.iter_resources(text.encode())) == expected
+    assert list(hcl.iter_resources_stream(text.splitlines(True))) == expected
+
+
+def test_block_after_heredoc_with_braces():
+    text = HEREDOCS + COMMENTS
+    resources = _resources(text)
+    assert [r['name'] for r in resources] == ['p', 'db']
+    assert resources[1]['line'] == HEREDOCS.count('\n') + 3
+    assert list(hcl.iter_resources_stream(text.splitlines(True))) == resources
@@ -0,0 +1,35 @@
+"""
+The shared-condition network (sis.engine.ConditionNetwork) must return
+exactly the violations of validate_resources, in the same order, and the
+original interpreter's findings on the golden cases.
+"""
+import pytest
+
+from rule_fixtures import GOLDEN_RESOURCES, GOLDEN_VIOLATIONS, RULES, make_resources, summarize
+from sis.engine import ConditionNetwork, validate_resources, validate_resources_network
+
+
+@pytest.mark.parametrize('file_type', [None, 'terraform', 'kubernetes'])
+def test_network_matches_validate_resources(file_type):
+    resources = make_resources()
+    expected = validate_resources(resources, RULES, file_type)
+    assert expected
+    assert validate_resources_network(resources, RULES, file_type) == expected
+
+
+def test_network_golden(bundled_rules):
+    assert summarize(validate_resources_network(GOLDEN_RESOURCES, bundled_rules)) == GOLDEN_VIOLATIONS
+
+
+def test_network_shares_repeated_conditions():
+    network = ConditionNetwork(RULES)
+    network.evaluate(make_resources(50))
+    # deletion_protection == false is tested by two rules but is one node
+    keys = [key for key in network.nodes if 'deletion_protection' in key]
+    assert len(keys) == 1
+
+
+def test_network_reused_across_calls():
+    resources = make_resources(seed=5)
+    first = validate_resources_network(resources, RULES)
+    assert validate_resources_network(resources, RULES) == first == validate_resources(resources, RULES)
@@ -0,0 +1,157 @@
+"""
+The incremental plan reader (sis.parsers.terraform_plan) must yield what
+walking the json.load()ed document yields, whatever the input type and
+however reads split the text.
+"""
+import io
+import json
+
+import pytest
+
+from sis.parsers.terraform_plan import iter_terraform_plan, iter_terraform_plan_file, parse_terraform_plan
+from sis.paths import Projection
+
+
+def _instance(address, kind, name, values, index=None, mode='managed'):
+    instance = {'address': address, 'mode': mode, 'type': kind, 'name': name, 'provider_name': 'aws'}
+    if index is not None:
+        instance['index'] = index
+    instance['values'] = values
+    return instance
+
+
+PLAN = {
+    'format_version': '1.2',
+    'terraform_version': '1.6.0',
+    'variables': {'env': {'value': 'prod'}},
+    'planned_values': {
+        'outputs': {'arn': {'sensitive': False}},
+        'root_module': {
+            'resources': [
+                _instance('aws_s3_bucket.logs[0]', 'aws_s3_bucket', 'logs', {'bucket': 'logs-0', 'tags': {'Env': 'prod'}}, 0),
+                _instance('aws_s3_bucket.logs[1]', 'aws_s3_bucket', 'logs', {'bucket': 'lögs-1 "quoted" \\'}, 1),
+                _instance('data.aws_iam_policy_document.p', 'aws_iam_policy_document', 'p', {'json': '{}'}, mode='data'),
+            ],
+            'child_modules': [
+                {
+                    'address': 'module.db',
+                    'resources': [
+                        _instance('module.db.aws_rds_cluster.this["a"]', 'aws_rds_cluster', 'this',
+                                  {'deletion_protection': False, 'engine': 'aurora-mysql', 'port': 3306}, 'a'),
+                        _instance('module.db.aws_rds_cluster.this["b"]', 'aws_rds_cluster', 'this',
+                                  {'deletion_protection': True, 'engine': None, 'port': 3306.5}, 'b'),
+                    ],
+                    'child_modules': [
+                        {
+                            'address': 'module.db.module.inner',
+                            'resources': [
+                                _instance('module.db.module.inner.aws_db_instance.replica', 'aws_db_instance',
+                                          'replica', {'skip_final_snapshot': True, 'ingress': [{'from_port': 1}]}),
+                            ],
+                        },
+                    ],
+                },
+            ],
+        },
+    },
+    'resource_changes': [
+        {'address': 'aws_s3_bucket.logs[0]', 'change': {'actions': ['create'], 'after': {'bucket': 'logs-0'}}},
+    ],
+    'prior_state': {'values': {'root_module': {'resources': [
+        _instance('aws_s3_bucket.old', 'aws_s3_bucket', 'old', {'bucket': 'old'}),
+    ]}}},
+}
+
+STATE = {
+    'format_version': '1.0',
+    'values': {'root_module': {'resources': [
+        _instance('aws_s3_bucket.state', 'aws_s3_bucket', 'state', {'bucket': 'from-state'}),
+    ]}},
+}
+
+
+def _reference(document, projection=None):
+    """The resources of a decoded document, walked in memory."""
+    def walk(module):
+        for resource in module.get('resources', []):
+            if resource.get('mode', 'managed') != 'managed':
+                continue
+            kind = resource.get('type', '')
+            attributes = dict(resource.get('values') or {})
+            if projection is not None and not projection.keeps_kind(kind):
+                attributes = {}
+            elif projection is not None and projection.attributes is not None:
+                attributes = {k: v for k, v in attributes.items() if projection.keeps_attribute(k)}
+            name = resource['name'] + ('[%s]' % json.dumps(resource['index']) if 'index' in resource else '')
+            yield {'kind': kind, 'name': name, 'address': resource['address'], 'attributes': attributes}
+        for child in module.get('child_modules', []):
+            yield from walk(child)
+
+    for key in ('planned_values', 'values'):
+        if key in document:
+            yield from walk(document[key]['root_module'])
+
+
+class _Trickle(io.RawIOBase):
+    """Binary file returning at most `size` bytes per read."""
+
+    def __init__(self, data, size):
+        self.data = data
+        self.pos = 0
+        self.size = size
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        chunk = self.data[self.pos:self.pos + min(self.size, n if n >= 0 else self.size)]
+        self.pos += len(chunk)
+        return chunk
+
+
+def _without_lines(resources):
+    return [{k: v for k, v in r.items() if k != 'line'} for r in resources]
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+@pytest.mark.parametrize('document', [PLAN, STATE], ids=['plan', 'state'])
+def test_stream_matches_json_load(document, indent):
+    text = json.dumps(document, indent=indent)
+    expected = list(_reference(json.loads(text)))
+    assert expected
+    for source in (text, text.encode(), io.StringIO(text), io.BytesIO(text.encode('utf-8-sig'))):
+        assert _without_lines(iter_terraform_plan(source)) == expected
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 64])
+def test_stream_chunk_boundaries(size):
+    text = json.dumps(PLAN, indent=2, ensure_ascii=False)
+    resources = list(iter_terraform_plan(_Trickle(text.encode(), size)))
+    assert resources == parse_terraform_plan(text)
+    assert _without_lines(resources) == list(_reference(PLAN))
+
+
+@pytest.mark.parametrize('projection', [
+    Projection(kinds=frozenset(['aws_rds_cluster'])),
+    Projection(attributes=frozenset(['bucket', 'deletion_protection'])),
+    Projection(kinds=frozenset(['aws_s3_bucket']), attributes=frozenset(['tags'])),
+])
+def test_stream_projection(projection):
+    text = json.dumps(PLAN)
+    assert _without_lines(iter_terraform_plan(text, projection)) == list(_reference(PLAN, projection))
+
+
+def test_lines_point_at_resource_objects(tmp_path):
+    text = json.dumps(PLAN, indent=2)
+    path = tmp_path / 'plan.json'
+    path.write_text(text)
+    lines = text.splitlines()
+    for resource in iter_terraform_plan_file(path):
+        # With indent=2, the object opens on the line before its address
+        assert lines[resource['line'] - 1].strip() == '{'
+        assert lines[resource['line']].strip() == '"address": %s,' % json.dumps(resource['address'])
+
+
+def test_not_a_plan():
+    assert list(iter_terraform_plan('[]')) == []
+    assert list(iter_terraform_plan('{"resource_changes": []}')) == []
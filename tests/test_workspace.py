@@ -0,0 +1,189 @@
+"""
+Workspace resolution (sis.workspace) on a configuration using count,
+for_each and local modules: findings must be expanded to the address of
+every instance, and only of the instances that actually match.
+"""
+import pytest
+
+from sis.scanner import Scanner
+from sis.workspace import Workspace, expand_violations
+
+ROOT = '''\
+variable "protect" {
+  default = false
+}
+
+locals {
+  zones = {
+    a = true
+    b = false
+  }
+}
+
+resource "aws_rds_cluster" "counted" {
+  count               = 2
+  cluster_identifier  = "counted-${count.index}"
+  deletion_protection = var.protect
+}
+
+resource "aws_rds_cluster" "each" {
+  for_each            = local.zones
+  cluster_identifier  = "each-${each.key}"
+  deletion_protection = each.value
+}
+
+resource "aws_rds_cluster" "single" {
+  deletion_protection = true
+}
+
+module "db" {
+  source  = "./modules/db"
+  count   = 2
+  protect = var.protect
+}
+
+module "app" {
+  source   = "./modules/db"
+  for_each = {
+    web = false
+    api = true
+  }
+  protect = each.value
+}
+
+module "safe" {
+  source  = "./modules/db"
+  protect = true
+}
+'''
+
+MODULE = '''\
+variable "protect" {}
+
+resource "aws_rds_cluster" "this" {
+  deletion_protection = var.protect
+}
+
+module "inner" {
+  source  = "../inner"
+  protect = var.protect
+}
+'''
+
+INNER = '''\
+variable "protect" {}
+
+resource "aws_db_instance" "replica" {
+  count               = 2
+  deletion_protection = var.protect
+}
+'''
+
+RULES = [
+    {
+        'rule_id': 'T-PROTECT',
+        'applies_to': {'file_types': ['terraform'], 'resource_kinds': ['aws_rds_cluster', 'aws_db_instance']},
+        'detection': {'match_logic': 'ALL', 'conditions': [
+            {'path': 'deletion_protection', 'operator': 'EQUALS', 'value': False},
+        ]},
+        'message': 'Deletion protection disabled',
+    },
+]
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / 'main.tf').write_text(ROOT)
+    for name, text in (('db', MODULE), ('inner', INNER)):
+        (tmp_path / 'modules' / name).mkdir(parents=True)
+        (tmp_path / 'modules' / name / 'main.tf').write_text(text)
+    return tmp_path
+
+
+def _addresses(resources):
+    addresses = []
+    for resource in resources:
+        addresses.extend(resource.get('instances') or [resource['address']])
+    return addresses
+
+
+def test_instance_addresses(workspace):
+    addresses = _addresses(Workspace(workspace).iter_resources())
+    assert sorted(addresses) == sorted([
+        'aws_rds_cluster.counted[0]',
+        'aws_rds_cluster.counted[1]',
+        'aws_rds_cluster.each["a"]',
+        'aws_rds_cluster.each["b"]',
+        'aws_rds_cluster.single',
+        'module.db[0].aws_rds_cluster.this',
+        'module.db[1].aws_rds_cluster.this',
+        'module.db[0].module.inner.aws_db_instance.replica[0]',
+        'module.db[0].module.inner.aws_db_instance.replica[1]',
+        'module.db[1].module.inner.aws_db_instance.replica[0]',
+        'module.db[1].module.inner.aws_db_instance.replica[1]',
+        'module.app["web"].aws_rds_cluster.this',
+        'module.app["api"].aws_rds_cluster.this',
+        'module.app["web"].module.inner.aws_db_instance.replica[0]',
+        'module.app["web"].module.inner.aws_db_instance.replica[1]',
+        'module.app["api"].module.inner.aws_db_instance.replica[0]',
+        'module.app["api"].module.inner.aws_db_instance.replica[1]',
+        'module.safe.aws_rds_cluster.this',
+        'module.safe.module.inner.aws_db_instance.replica[0]',
+        'module.safe.module.inner.aws_db_instance.replica[1]',
+    ])
+
+
+def test_shared_evaluations(workspace):
+    ws = Workspace(workspace)
+    resources = list(ws.iter_resources())
+    # module.db[0], module.db[1] and module.app["web"] share protect = false
+    shared = [r for r in resources if r['address'] == 'module.db[0].aws_rds_cluster.this']
+    assert len(shared) == 1
+    assert list(shared[0]['instances']) == [
+        'module.db[0].aws_rds_cluster.this',
+        'module.db[1].aws_rds_cluster.this',
+        'module.app["web"].aws_rds_cluster.this',
+    ]
+    assert ws.stats['reused'] > 0
+
+
+FINDINGS = [
+    'aws_rds_cluster.counted[0]',
+    'aws_rds_cluster.counted[1]',
+    'aws_rds_cluster.each["b"]',
+    'module.db[0].aws_rds_cluster.this',
+    'module.db[1].aws_rds_cluster.this',
+    'module.db[0].module.inner.aws_db_instance.replica[0]',
+    'module.db[0].module.inner.aws_db_instance.replica[1]',
+    'module.db[1].module.inner.aws_db_instance.replica[0]',
+    'module.db[1].module.inner.aws_db_instance.replica[1]',
+    'module.app["web"].aws_rds_cluster.this',
+    'module.app["web"].module.inner.aws_db_instance.replica[0]',
+    'module.app["web"].module.inner.aws_db_instance.replica[1]',
+]
+
+
+def test_scan_expands_findings(workspace):
+    findings = list(Scanner().iter_scan_workspace(workspace, RULES))
+    assert sorted(f['resource_address'] for f in findings) == sorted(FINDINGS)
+    assert all('resource_instances' not in f for f in findings)
+    # Findings point at the declaring file and line
+    this = next(f for f in findings if f['resource_address'] == 'module.db[1].aws_rds_cluster.this')
+    assert this['file_path'].endswith('modules/db/main.tf')
+    assert this['line'] == 3
+
+
+def test_unreadable_files_skipped(workspace, capsys):
+    # Only the broken files are left out, not the rest of the workspace
+    (workspace / 'bad.tf.json').write_text('{ "resource": ')
+    (workspace / 'terraform.tfvars').write_bytes(b'protect = "\xff"\n')
+    findings = list(Scanner().iter_scan_workspace(workspace, RULES))
+    assert sorted(f['resource_address'] for f in findings) == sorted(FINDINGS)
+    stderr = capsys.readouterr().err
+    assert 'bad.tf.json' in stderr
+    assert 'terraform.tfvars' in stderr
+
+
+def test_expand_violations_single_instance():
+    violation = {'rule_id': 'X', 'resource_address': 'aws_s3_bucket.b'}
+    assert list(expand_violations([dict(violation)])) == [violation]